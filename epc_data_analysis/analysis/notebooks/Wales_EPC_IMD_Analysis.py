@@ -79,12 +79,12 @@ import matplotlib.pyplot as plt
 from ipywidgets import interact
 import re
 
-from epc_data_analysis.getters import epc_data, util_data
+from epc_data_analysis.getters import epc_data
 from epc_data_analysis.pipeline import (
     feature_engineering,
     easy_plotting,
     epc_analysis,
-    data_cleaning,
+    enrichment,
 )
 from epc_data_analysis.analysis.notebooks.notebook_utils import my_widgets
 
@@ -133,15 +133,8 @@ epc_df.head()
 # Load IMP data and merge datasets using the POSTCODE feature.
 
 # %%
-# Load Wales IMD data
-wimd_df = util_data.get_WIMD_data()
-
-# Reformat POSTCODE
-epc_df = data_cleaning.reformat_postcode(epc_df)
-wimd_df = data_cleaning.reformat_postcode(wimd_df)
-
-# Merge datasets
-epc_wimd_df = pd.merge(epc_df, wimd_df, on=["POSTCODE"])
+# Add Wales IMD data (only keep samples with IMD data)
+epc_wimd_df = enrichment.enrich(epc_df, with_location=False, how="inner")
 epc_wimd_df.head()
 
 # %% [markdown]
@@ -32,7 +32,7 @@ from keplergl import KeplerGl
 
 from epc_data_analysis import get_yaml_config, Path, PROJECT_DIR
 from epc_data_analysis.getters import epc_data, util_data
-from epc_data_analysis.pipeline import feature_engineering, data_cleaning
+from epc_data_analysis.pipeline import feature_engineering, enrichment
 from epc_data_analysis.analysis.notebooks.notebook_utils import Kepler_configs
 
 # %% [markdown]
@@ -60,7 +60,6 @@ features_of_interest = [
 epc_df = epc_data.load_epc_data(
     subset="Wales", usecols=features_of_interest, low_memory=False
 )
-location_df = util_data.get_location_data()
 
 # %% [markdown]
 # ### Load Location Data and additional EPC features
@@ -70,12 +69,8 @@ location_df = util_data.get_location_data()
 # Remove samples with invalid CURRENT_ENERGY_RATING.
 
 # %%
-# Reformat POSTCODE
-epc_df = data_cleaning.reformat_postcode(epc_df)
-wimd_df = data_cleaning.reformat_postcode(location_df)
-
-# Merge with location data
-epc_df = pd.merge(epc_df, location_df, on=["POSTCODE"])
+# Add location data (only keep samples with location)
+epc_df = enrichment.enrich(epc_df, with_wimd=False, how="inner")
 
 # Get additional features
 epc_df = feature_engineering.get_new_EPC_rating_features(epc_df)
@@ -1,16 +1,30 @@
 # File: getters/epc_data.py
-""""
+""" "
 Created May 2021
 @author: Julia Suter
-Last updated on 26/07/2021
+Last updated on 17/10/2026
 """
 
 # ---------------------------------------------------------------------------------
 
 import pandas as pd
+import numpy as np
+import operator
 import os
+import queue
+import threading
+import time
+import zipfile
 
-from epc_data_analysis import get_yaml_config, Path, PROJECT_DIR
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial, reduce
+
+import pyarrow.parquet as pq
+
+from epc_data_analysis import get_yaml_config, Path, PROJECT_DIR, logger
+from epc_data_analysis.getters import epc_schema
+from epc_data_analysis.utils import caching, instrumentation
 
 # ---------------------------------------------------------------------------------
 
@@ -19,17 +33,193 @@ epc_data_config = get_yaml_config(
     Path(str(PROJECT_DIR) + "/epc_data_analysis/config/base.yaml")
 )
 
-# Get path
+# Get paths
 epc_data_path = str(PROJECT_DIR) + epc_data_config["EPC_DATASET_PATH"]
+EPC_ZIP_PATH = str(PROJECT_DIR) + epc_data_config["EPC_ZIP_PATH"]
+EPC_CACHE_PATH = str(PROJECT_DIR) + epc_data_config["EPC_CACHE_PATH"]
+EPC_MANIFEST_PATH = str(PROJECT_DIR) + epc_data_config["EPC_MANIFEST_PATH"]
 
+# Operators for row filters
+FILTER_OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": lambda column, values: column.isin(values),
+    "not in": lambda column, values: ~column.isin(values),
+}
 
-def load_epc_data(subset="all", usecols=None, low_memory=False):
-    """Load and return EPC dataset, or specific subset, as pandas dataframe.
+# Number of rows per chunk when filtering during the read
+FILTER_CHUNKSIZE = 100000
+
+# Increase when the content of the certificates cache changes, invalidates caches
+CACHE_VERSION = 2
+
+# Operators comparing order, see compare_categorical()
+ORDER_OPERATORS = ["<", "<=", ">", ">="]
+
+# Can a directory with LODGEMENT_DATE range [min, max] hold rows passing the filter?
+DATE_RANGE_CHECKS = {
+    "==": lambda min_date, max_date, value: (min_date <= value) & (max_date >= value),
+    "<": lambda min_date, max_date, value: min_date < value,
+    "<=": lambda min_date, max_date, value: min_date <= value,
+    ">": lambda min_date, max_date, value: max_date > value,
+    ">=": lambda min_date, max_date, value: max_date >= value,
+    "in": lambda min_date, max_date, values: reduce(
+        operator.or_, [(min_date <= value) & (max_date >= value) for value in values]
+    ),
+}
+
+# Region by first letter of local authority code
+REGIONS = {"E": "England", "W": "Wales"}
+
+MANIFEST_COLUMNS = [
+    "DIRECTORY",
+    "LOCAL_AUTHORITY",
+    "LOCAL_AUTHORITY_LABEL",
+    "REGION",
+    "N_ROWS",
+    "N_BYTES",
+    "MTIME",
+    "COLUMNS",
+    "MIN_LODGEMENT_DATE",
+    "MAX_LODGEMENT_DATE",
+]
+
+
+def get_filter_columns(filters):
+    """Get the columns required for applying given row filters.
 
     Parameters
     ----------
-    subset : {'all', 'Wales', 'England'}, default='all'
-        EPC certificate area subset.
+    filters : list, None
+        List of filters as (column, operator, value) tuples.
+
+    Return
+    ---------
+    filter_columns : list
+        Columns used in filters."""
+
+    if filters is None:
+        return []
+
+    return list(dict.fromkeys(column for column, _, _ in filters))
+
+
+def compare_categorical(series, operator_str, value):
+    """Compare categorical with value, by comparing its categories only.
+
+    Ordered categoricals (e.g. CURRENT_ENERGY_RATING) are compared by the order
+    of their categories, unordered ones by their values, as strings would be.
+
+    Parameters
+    ----------
+    series : pandas.Series
+        Categorical column.
+
+    operator_str : {'<', '<=', '>', '>='}
+        Comparison operator.
+
+    value : str
+        Value to compare with. For ordered categoricals, one of the categories.
+
+    Return
+    ---------
+    mask : numpy.ndarray
+        True for rows passing the comparison, False for missing values."""
+
+    categories = series.cat.categories
+
+    if series.cat.ordered:
+        if value not in categories:
+            raise IOError(
+                "'{}' is not a category of ordered column '{}'. "
+                "Please choose one of {}.".format(value, series.name, list(categories))
+            )
+        category_mask = FILTER_OPERATORS[operator_str](
+            np.arange(len(categories)), categories.get_loc(value)
+        )
+    else:
+        category_mask = FILTER_OPERATORS[operator_str](
+            categories.to_series(), value
+        ).to_numpy(dtype=bool)
+
+    # Code -1 (missing) points to the last entry
+    return np.append(category_mask, False)[series.cat.codes.to_numpy()]
+
+
+def apply_filters(df, filters):
+    """Only keep rows that pass all given filters.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Dataframe to filter.
+
+    filters : list, None
+        List of filters as (column, operator, value) tuples, e.g.
+        [("TENURE", "!=", "NO DATA!"), ("LODGEMENT_DATE", ">=", "2015-01-01"),
+        ("CURRENT_ENERGY_RATING", "in", ["A", "B", "C"])].
+        Operators: '==', '!=', '<', '<=', '>', '>=', 'in' and 'not in'.
+        Dates (LODGEMENT_DATE, INSPECTION_DATE) are given as 'YYYY-MM-DD' strings.
+        Ratings are compared in order A to G, also with compact dtypes.
+
+    Return
+    ---------
+    df : pandas.DataFrame
+        Dataframe with rows passing all filters."""
+
+    if not filters:
+        return df
+
+    mask = np.ones(len(df), dtype=bool)
+
+    for column, operator_str, value in filters:
+
+        if operator_str not in FILTER_OPERATORS:
+            raise IOError(
+                "'{}' is not a valid filter operator. Please choose one of {}.".format(
+                    operator_str, list(FILTER_OPERATORS)
+                )
+            )
+
+        if operator_str in ORDER_OPERATORS and isinstance(
+            df[column].dtype, pd.CategoricalDtype
+        ):
+            mask &= compare_categorical(df[column], operator_str, value)
+            continue
+
+        mask &= FILTER_OPERATORS[operator_str](df[column], value).to_numpy(dtype=bool)
+
+    # Avoid copy if all rows pass
+    if mask.all():
+        return df
+
+    return df[mask]
+
+
+def read_certificates(
+    directory,
+    usecols=None,
+    low_memory=False,
+    use_cache=True,
+    filters=None,
+    compact_dtypes=False,
+    from_zip=False,
+    zip_members=None,
+):
+    """Load EPC certificates for a single local authority directory.
+
+    If use_cache is True, the certificates are read from a columnar (Parquet)
+    cache, which is built on the first read. The cache is rebuilt whenever size
+    or modification time of the source certificates.csv change.
+
+    Parameters
+    ----------
+    directory : str
+        Local authority directory, e.g. 'domestic-W06000015-Cardiff'.
 
     usecols : list, default=None
         List of features/columns to load from EPC dataset.
@@ -37,14 +227,452 @@ def load_epc_data(subset="all", usecols=None, low_memory=False):
     low_memory : bool, default=False
         Internally process the file in chunks, resulting in lower memory use while parsing,
         but possibly mixed type inference.
-        To ensure no mixed types either set False, or specify the type with the dtype parameter.
+        Ignored when building the cache, which is always parsed with low_memory=False.
+
+    use_cache : bool, default=True
+        Read from (and if necessary build) the columnar cache.
+
+    filters : list, default=None
+        List of row filters as (column, operator, value) tuples, see apply_filters().
+        Filters are applied chunk by chunk while reading,
+        so rejected rows are never collected.
+
+    compact_dtypes : bool, default=False
+        Parse columns with the compact dtypes from epc_schema
+        (categoricals, float32, int16) instead of the pandas defaults.
+
+    from_zip : bool, default=False
+        Read certificates.csv straight from the EPC bulk download ZIP at EPC_ZIP_PATH.
+
+    zip_members : dict, default=None
+        ZIP members by directory, see read_zip_members().
+        If None and from_zip is True, read them from the ZIP.
+
+    Return
+    ---------
+    epc_certs : pandas.DateFrame
+        EPC certificate data for given local authority."""
+
+    if from_zip and zip_members is None:
+        zip_members = read_zip_members()
+
+    if use_cache:
+        cache_path = get_cache_path(directory, from_zip=from_zip)
+        signature = get_cache_signature(
+            directory, from_zip=from_zip, zip_members=zip_members
+        )
+
+        if not caching.is_cache_valid(cache_path, signature):
+            build_cache(
+                directory,
+                cache_path,
+                signature,
+                from_zip=from_zip,
+                zip_members=zip_members,
+            )
+
+        # Only load columns of interest from cache
+        if not filters:
+            if not compact_dtypes:
+                return epc_schema.restore_dtypes(
+                    caching.read_cache(cache_path, columns=usecols),
+                    caching.read_cache_metadata(cache_path).get("dtypes", {}),
+                )
+
+            epc_certs = caching.read_cache(
+                cache_path,
+                columns=usecols,
+                dictionary_columns=epc_schema.get_categorical_columns(usecols),
+            )
+            return epc_schema.apply_schema(epc_certs)
+
+    elif not filters:
+        with open_certificates(
+            directory, from_zip=from_zip, zip_members=zip_members
+        ) as certificates:
+            if not compact_dtypes:
+                return pd.read_csv(certificates, low_memory=low_memory, usecols=usecols)
+
+            epc_certs = pd.read_csv(
+                certificates,
+                low_memory=low_memory,
+                usecols=usecols,
+                dtype=epc_schema.get_dtypes(usecols),
+            )
+        return epc_schema.apply_schema(epc_certs)
+
+    # Load columns needed for filtering as well
+    filter_columns = get_filter_columns(filters)
+    read_columns = usecols
+    if usecols is not None:
+        read_columns = list(usecols) + [
+            col for col in filter_columns if col not in usecols
+        ]
+
+    # Filter chunk by chunk
+    epc_certs = concat_epc_frames(
+        [
+            apply_filters(chunk, filters)
+            for chunk in read_certificate_chunks(
+                directory,
+                usecols=read_columns,
+                chunksize=FILTER_CHUNKSIZE,
+                use_cache=use_cache,
+                compact_dtypes=compact_dtypes,
+                from_zip=from_zip,
+                zip_members=zip_members,
+            )
+        ],
+        columns=read_columns,
+    )
+
+    # Drop columns only used for filtering
+    if usecols is not None:
+        extra_columns = [col for col in filter_columns if col not in usecols]
+        epc_certs = epc_certs.drop(columns=extra_columns)
+
+    return epc_certs
+
+
+def get_cache_signature(directory, from_zip=False, zip_members=None):
+    """Get signature for the certificates cache of directory.
+
+    Parameters
+    ----------
+    directory : str
+        Local authority directory, e.g. 'domestic-W06000015-Cardiff'.
+
+    from_zip : bool, default=False
+        Get signature for certificates read from the EPC bulk download ZIP.
+
+    zip_members : dict, default=None
+        ZIP members by directory, see read_zip_members().
+
+    Return
+    ---------
+    signature : dict
+        Signature of certificates.csv and CACHE_VERSION."""
+
+    signature = get_certificates_signature(
+        directory, from_zip=from_zip, zip_members=zip_members
+    )
+    signature["cache_version"] = CACHE_VERSION
+
+    return signature
+
+
+def build_cache(directory, cache_path, signature, from_zip=False, zip_members=None):
+    """Build columnar cache with all columns of certificates.csv.
+
+    All columns are cached, so the cache serves any later column selection.
+    Categorical schema columns are cached as the text in the CSV, even if pandas
+    parses them as numbers (e.g. FLOOR_LEVEL in some local authorities),
+    so their categories are the same for every local authority and source.
+    The parsed dtypes are stored with the cache and restored for default dtypes.
+
+    Parameters
+    ----------
+    directory : str
+        Local authority directory, e.g. 'domestic-W06000015-Cardiff'.
+
+    cache_path : str
+        Path to cache file.
+
+    signature : dict
+        Signature of cache, see get_cache_signature().
+
+    from_zip : bool, default=False
+        Read certificates.csv straight from the EPC bulk download ZIP at EPC_ZIP_PATH.
+
+    zip_members : dict, default=None
+        ZIP members by directory, see read_zip_members().
+
+    Return
+    ---------
+    None"""
+
+    with open_certificates(
+        directory, from_zip=from_zip, zip_members=zip_members
+    ) as certificates:
+        epc_certs = pd.read_csv(certificates, low_memory=False)
+
+    # Parse categorical columns read as numbers again, as text
+    parsed_dtypes = epc_schema.get_text_columns(epc_certs)
+
+    if parsed_dtypes:
+        with open_certificates(
+            directory, from_zip=from_zip, zip_members=zip_members
+        ) as certificates:
+            text_columns = pd.read_csv(
+                certificates, usecols=list(parsed_dtypes), dtype=str, low_memory=False
+            )
+
+        for col in parsed_dtypes:
+            epc_certs[col] = text_columns[col]
+
+    caching.write_cache(epc_certs, cache_path, signature, dtypes=parsed_dtypes)
+
+
+def read_certificates_with_stats(directory, from_zip=False, zip_members=None, **kwargs):
+    """Load EPC certificates for a single directory and record the load.
+
+    Parameters
+    ----------
+    directory : str
+        Local authority directory, e.g. 'domestic-W06000015-Cardiff'.
+
+    from_zip : bool, default=False
+        Read certificates.csv straight from the EPC bulk download ZIP at EPC_ZIP_PATH.
+
+    zip_members : dict, default=None
+        ZIP members by directory, see read_zip_members().
+
+    kwargs
+        Further arguments for read_certificates().
 
     Return
     ---------
     epc_certs : pandas.DateFrame
-        EPC certificate data for given area and features."""
+        EPC certificate data for given local authority.
+
+    load_record : dict
+        Load record for parsing, see instrumentation.get_load_record().
+        Throughput refers to the size of the source certificates.csv."""
+
+    load_records = []
+    n_bytes = get_certificates_signature(
+        directory, from_zip=from_zip, zip_members=zip_members
+    )["size"]
+
+    with instrumentation.timed_step(
+        load_records, "parse", directory, n_bytes=n_bytes
+    ) as step_info:
+        epc_certs = read_certificates(
+            directory, from_zip=from_zip, zip_members=zip_members, **kwargs
+        )
+        step_info["N_ROWS"] = len(epc_certs)
+
+    return epc_certs, load_records[0]
+
+
+def get_local_authority_code(directory):
+    """Get local authority code from directory name.
+
+    Parameters
+    ----------
+    directory : str
+        Local authority directory, e.g. 'domestic-W06000015-Cardiff'.
+
+    Return
+    ---------
+    local_authority_code : str
+        Local authority code, e.g. 'W06000015'."""
+
+    return directory.split("-")[1]
+
+
+def get_cache_path(directory, from_zip=False):
+    """Get path of columnar cache for certificates of directory.
+
+    Certificates read from the ZIP and from the extracted files have
+    different signatures, so they are cached separately.
+
+    Parameters
+    ----------
+    directory : str
+        Local authority directory, e.g. 'domestic-W06000015-Cardiff'.
+
+    from_zip : bool, default=False
+        Get path of cache for certificates read from the EPC bulk download ZIP.
+
+    Return
+    ---------
+    cache_path : str
+        Path to Parquet cache."""
+
+    return EPC_CACHE_PATH + directory + (".zip" if from_zip else "") + ".parquet"
+
+
+def get_manifest_path(from_zip=False):
+    """Get path of dataset manifest.
+
+    Parameters
+    ----------
+    from_zip : bool, default=False
+        Get path of manifest for the EPC bulk download ZIP.
+
+    Return
+    ---------
+    manifest_path : str
+        Path to manifest, e.g. EPC_manifest.zip.csv for the ZIP."""
+
+    if not from_zip:
+        return EPC_MANIFEST_PATH
+
+    root, extension = os.path.splitext(EPC_MANIFEST_PATH)
+
+    return root + ".zip" + extension
+
+
+def get_zip_members(zip_file, file_name="certificates.csv"):
+    """Get certificates.csv members of EPC bulk download ZIP by directory.
+
+    Parameters
+    ----------
+    zip_file : zipfile.ZipFile
+        Opened EPC bulk download ZIP.
+
+    file_name : {'certificates.csv', 'recommendations.csv'}, default='certificates.csv'
+        File to get members for.
+
+    Return
+    ---------
+    zip_members : dict
+        Member info (zipfile.ZipInfo) of file for every local authority directory."""
+
+    return {
+        zip_info.filename.split("/")[-2]: zip_info
+        for zip_info in zip_file.infolist()
+        if zip_info.filename.endswith("/" + file_name)
+    }
+
+
+def read_zip_members(file_name="certificates.csv"):
+    """Read members of the EPC bulk download ZIP at EPC_ZIP_PATH by directory.
+
+    Read them once per load and pass them on,
+    so the central directory of the ZIP is not parsed for every directory.
+
+    Parameters
+    ----------
+    file_name : {'certificates.csv', 'recommendations.csv'}, default='certificates.csv'
+        File to get members for.
+
+    Return
+    ---------
+    zip_members : dict
+        Member info (zipfile.ZipInfo) of file for every local authority directory."""
+
+    with zipfile.ZipFile(EPC_ZIP_PATH) as zip_file:
+        return get_zip_members(zip_file, file_name)
+
+
+def get_certificates_signature(
+    directory, from_zip=False, file_name="certificates.csv", zip_members=None
+):
+    """Get signature (size and modification time) of certificates.csv.
+
+    Parameters
+    ----------
+    directory : str
+        Local authority directory, e.g. 'domestic-W06000015-Cardiff'.
+
+    from_zip : bool, default=False
+        Get signature of member in the EPC bulk download ZIP at EPC_ZIP_PATH.
+
+    file_name : {'certificates.csv', 'recommendations.csv'}, default='certificates.csv'
+        File in local authority directory.
+
+    zip_members : dict, default=None
+        ZIP members of file by directory, see read_zip_members().
+        If None and from_zip is True, read them from the ZIP.
+
+    Return
+    ---------
+    signature : dict
+        File size in bytes and modification time in nanoseconds."""
+
+    if not from_zip:
+        return caching.get_file_signature(epc_data_path + directory + "/" + file_name)
+
+    if zip_members is None:
+        zip_members = read_zip_members(file_name)
+
+    zip_info = zip_members[directory]
+
+    signature = {
+        "size": zip_info.file_size,
+        "mtime": int(time.mktime(zip_info.date_time + (0, 0, -1))) * 10**9,
+    }
+
+    return signature
+
+
+@contextmanager
+def open_certificates(
+    directory, from_zip=False, file_name="certificates.csv", zip_members=None
+):
+    """Open certificates.csv for reading with pandas.read_csv().
+
+    Members of the ZIP are decompressed as a stream, without extracting them.
+    Every call opens the ZIP separately, so different members can be
+    decompressed in parallel processes.
+
+    Parameters
+    ----------
+    directory : str
+        Local authority directory, e.g. 'domestic-W06000015-Cardiff'.
+
+    from_zip : bool, default=False
+        Open member in the EPC bulk download ZIP at EPC_ZIP_PATH.
+
+    file_name : {'certificates.csv', 'recommendations.csv'}, default='certificates.csv'
+        File in local authority directory.
+
+    zip_members : dict, default=None
+        ZIP members of file by directory, see read_zip_members().
+        If None and from_zip is True, read them from the ZIP.
+
+    Return
+    ---------
+    certificates : str, file object
+        Path to file or stream of ZIP member."""
+
+    if not from_zip:
+        yield epc_data_path + directory + "/" + file_name
+        return
+
+    with zipfile.ZipFile(EPC_ZIP_PATH) as zip_file:
+        if zip_members is None:
+            zip_members = get_zip_members(zip_file, file_name)
+        member = zip_members[directory]
+
+        with zip_file.open(member) as certificates:
+            yield certificates
+
+
+def get_epc_directories(
+    subset="all", local_authorities=None, from_zip=False, zip_members=None
+):
+    """Get local authority directories for given subset, in sorted order.
+
+    Parameters
+    ----------
+    subset : {'all', 'Wales', 'England'}, default='all'
+        EPC certificate area subset.
+
+    local_authorities : list, default=None
+        Only return directories for these local authority codes, e.g. ['W06000015'].
+        If None, return all directories for subset.
+
+    from_zip : bool, default=False
+        Get directories in the EPC bulk download ZIP at EPC_ZIP_PATH.
+
+    zip_members : dict, default=None
+        ZIP members by directory, see read_zip_members().
+        If None and from_zip is True, read them from the ZIP.
+
+    Return
+    ---------
+    directories : list
+        Sorted list of local authority directories."""
 
-    all_directories = os.listdir(epc_data_path)
+    if from_zip:
+        if zip_members is None:
+            zip_members = read_zip_members()
+        all_directories = list(zip_members)
+    else:
+        all_directories = os.listdir(epc_data_path)
     start_with_dict = {"Wales": "domestic-W", "England": "domestic-E"}
 
     # Get directories for given subset
@@ -64,23 +692,821 @@ def load_epc_data(subset="all", usecols=None, low_memory=False):
                 "'{}' is not a valid subset of the EPC dataset.".format(subset)
             )
 
-    # Load EPC certificates for given subset
-    # Only load columns of interest (if given)
-    epc_certs = [
-        pd.read_csv(
-            epc_data_path + directory + "/certificates.csv",
-            low_memory=low_memory,
-            usecols=usecols,
+    # Only keep directories for given local authorities
+    if local_authorities is not None:
+        local_authorities = set(local_authorities)
+        directories = [
+            directory
+            for directory in directories
+            if get_local_authority_code(directory) in local_authorities
+        ]
+
+    # Sort for deterministic order (os.listdir order is arbitrary)
+    return sorted(directories)
+
+
+def get_empty_epc_frame(usecols=None, compact_dtypes=False):
+    """Get EPC dataframe without rows, e.g. if no certificates match the filters.
+
+    Parameters
+    ----------
+    usecols : list, default=None
+        Columns of dataframe. If None, all columns of the EPC schema.
+
+    compact_dtypes : bool, default=False
+        Use the compact dtypes from epc_schema.
+
+    Return
+    ---------
+    epc_certs : pandas.DataFrame
+        Empty EPC dataframe."""
+
+    columns = epc_schema.get_columns() if usecols is None else list(usecols)
+    epc_certs = pd.DataFrame(columns=columns)
+
+    if compact_dtypes:
+        epc_certs = epc_schema.apply_schema(epc_certs)
+
+    return epc_certs
+
+
+def union_categorical_columns(columns):
+    """Concatenate categorical columns, unifying their categories.
+
+    Categories of different dtypes (e.g. numbers and strings) are unified as strings.
+    Ordered categoricals stay ordered, with the categories of the first column first.
+
+    Parameters
+    ----------
+    columns : list
+        Categorical columns (pandas.Series).
+
+    Return
+    ---------
+    union : pandas.Categorical
+        Concatenated column."""
+
+    if len({column.cat.categories.dtype for column in columns}) > 1:
+        columns = [
+            column.cat.rename_categories(column.cat.categories.astype(str))
+            for column in columns
+        ]
+
+    if not any(column.cat.ordered for column in columns):
+        return pd.api.types.union_categoricals(columns)
+
+    union = pd.api.types.union_categoricals(columns, ignore_order=True)
+
+    return union.as_ordered()
+
+
+def concat_epc_frames(frames, columns=None):
+    """Concatenate EPC dataframes column by column.
+
+    Unlike pd.concat, every column is released from the single dataframes
+    as soon as it has been concatenated, so peak memory stays close to
+    the size of the final dataframe instead of twice that.
+    Categorical columns keep their categorical dtype (with unified categories).
+    Note that the given dataframes are emptied in the process.
+
+    Parameters
+    ----------
+    frames : list
+        List of pandas.DataFrames to concatenate.
+
+    columns : list, default=None
+        Columns of the empty dataframe returned if there are no frames.
+
+    Return
+    ---------
+    df : pandas.DataFrame
+        Concatenated dataframe."""
+
+    if not frames:
+        return pd.DataFrame(columns=columns)
+
+    # Fall back to pd.concat if columns differ between dataframes
+    columns = list(frames[0].columns)
+    if any(list(frame.columns) != columns for frame in frames):
+        return pd.concat(frames, axis=0)
+
+    index = frames[0].index.append([frame.index for frame in frames[1:]])
+    concat_columns = {}
+
+    for col in columns:
+
+        if all(isinstance(frame[col].dtype, pd.CategoricalDtype) for frame in frames):
+            concat_columns[col] = pd.Series(
+                union_categorical_columns([frame[col] for frame in frames]),
+                index=index,
+            )
+        else:
+            # Same dtype as pd.concat, e.g. object for text and all-empty columns
+            concat_columns[col] = pd.concat([frame[col] for frame in frames])
+            concat_columns[col].index = index
+
+        # Free column in single dataframes
+        for frame in frames:
+            del frame[col]
+
+    # Columns share the index, so they are not aligned
+    return pd.DataFrame(concat_columns, columns=columns)
+
+
+def map_directories(function, directories, n_jobs=1):
+    """Apply function to every directory, optionally in a process pool.
+
+    Parameters
+    ----------
+    function : callable
+        Function taking a local authority directory.
+
+    directories : list
+        Local authority directories.
+
+    n_jobs : int, default=1
+        Number of processes. If -1, use all CPUs.
+
+    Return
+    ---------
+    results : list
+        Function results, in order of directories."""
+
+    if n_jobs == -1:
+        n_jobs = os.cpu_count()
+
+    if n_jobs > 1 and len(directories) > 1:
+        # Executor.map returns results in order of directories
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            return list(executor.map(function, directories))
+
+    return [function(directory) for directory in directories]
+
+
+def scan_directory(directory, from_zip=False, zip_members=None):
+    """Scan certificates of a local authority directory for the dataset manifest.
+
+    Only the LODGEMENT_DATE column is read (from the cache if it is up to date).
+
+    Parameters
+    ----------
+    directory : str
+        Local authority directory, e.g. 'domestic-W06000015-Cardiff'.
+
+    from_zip : bool, default=False
+        Scan member in the EPC bulk download ZIP at EPC_ZIP_PATH.
+
+    zip_members : dict, default=None
+        ZIP members by directory, see read_zip_members().
+
+    Return
+    ---------
+    manifest_entry : dict
+        Local authority code and name, region, number of rows, file size and
+        modification time, column header and min/max LODGEMENT_DATE."""
+
+    if from_zip and zip_members is None:
+        zip_members = read_zip_members()
+
+    signature = get_certificates_signature(
+        directory, from_zip=from_zip, zip_members=zip_members
+    )
+    with open_certificates(
+        directory, from_zip=from_zip, zip_members=zip_members
+    ) as certificates:
+        header = list(pd.read_csv(certificates, nrows=0).columns)
+
+    # Count rows and get date range chunk by chunk
+    date_column = "LODGEMENT_DATE" if "LODGEMENT_DATE" in header else header[0]
+    n_rows = 0
+    min_dates = []
+    max_dates = []
+
+    for chunk in read_certificate_chunks(
+        directory,
+        usecols=[date_column],
+        chunksize=1000000,
+        from_zip=from_zip,
+        zip_members=zip_members,
+    ):
+        n_rows += len(chunk)
+        dates = chunk[date_column].dropna()
+
+        if date_column == "LODGEMENT_DATE" and len(dates) > 0:
+            min_dates.append(dates.min())
+            max_dates.append(dates.max())
+
+    local_authority_code = get_local_authority_code(directory)
+
+    manifest_entry = {
+        "DIRECTORY": directory,
+        "LOCAL_AUTHORITY": local_authority_code,
+        "LOCAL_AUTHORITY_LABEL": "-".join(directory.split("-")[2:]),
+        "REGION": REGIONS.get(local_authority_code[0], "unknown"),
+        "N_ROWS": n_rows,
+        "N_BYTES": signature["size"],
+        "MTIME": signature["mtime"],
+        "COLUMNS": "|".join(header),
+        "MIN_LODGEMENT_DATE": min(min_dates) if min_dates else np.nan,
+        "MAX_LODGEMENT_DATE": max(max_dates) if max_dates else np.nan,
+    }
+
+    return manifest_entry
+
+
+def get_epc_manifest(
+    subset="all", local_authorities=None, n_jobs=1, from_zip=False, zip_members=None
+):
+    """Get dataset manifest with statistics for every local authority directory.
+
+    The manifest is stored under EPC_MANIFEST_PATH (with a .zip suffix for the ZIP,
+    see get_manifest_path()). Directories that are new
+    or whose certificates changed (size or modification time) are rescanned,
+    all others are taken from the stored manifest without touching their files.
+
+    Parameters
+    ----------
+    subset : {'all', 'Wales', 'England'}, default='all'
+        EPC certificate area subset.
+
+    local_authorities : list, default=None
+        Only return manifest for these local authority codes.
+
+    n_jobs : int, default=1
+        Number of processes for scanning directories. If -1, use all CPUs.
+
+    from_zip : bool, default=False
+        Scan members of the EPC bulk download ZIP at EPC_ZIP_PATH.
+
+    zip_members : dict, default=None
+        ZIP members by directory, see read_zip_members().
+        If None and from_zip is True, read them from the ZIP.
+
+    Return
+    ---------
+    manifest : pandas.DataFrame
+        One row per directory: DIRECTORY, LOCAL_AUTHORITY, LOCAL_AUTHORITY_LABEL,
+        REGION, N_ROWS, N_BYTES, MTIME, COLUMNS ('|'-separated header),
+        MIN_LODGEMENT_DATE and MAX_LODGEMENT_DATE."""
+
+    if from_zip and zip_members is None:
+        zip_members = read_zip_members()
+
+    directories = get_epc_directories(
+        subset,
+        local_authorities=local_authorities,
+        from_zip=from_zip,
+        zip_members=zip_members,
+    )
+    manifest_path = get_manifest_path(from_zip=from_zip)
+
+    if os.path.exists(manifest_path):
+        manifest = pd.read_csv(manifest_path, index_col="DIRECTORY")
+    else:
+        manifest = pd.DataFrame(columns=MANIFEST_COLUMNS[1:])
+
+    # Find directories that are new or have changed since last scan
+    outdated_directories = []
+
+    for directory in directories:
+        signature = get_certificates_signature(
+            directory, from_zip=from_zip, zip_members=zip_members
         )
-        for directory in directories
+
+        if directory not in manifest.index or (
+            manifest.at[directory, "N_BYTES"] != signature["size"]
+            or manifest.at[directory, "MTIME"] != signature["mtime"]
+        ):
+            outdated_directories.append(directory)
+
+    # Rescan and store updated manifest
+    if outdated_directories:
+        logger.info(
+            "Scanning {} directories for EPC manifest".format(len(outdated_directories))
+        )
+
+        entries = pd.DataFrame(
+            map_directories(
+                partial(scan_directory, from_zip=from_zip, zip_members=zip_members),
+                outdated_directories,
+                n_jobs=n_jobs,
+            ),
+            columns=MANIFEST_COLUMNS,
+        ).set_index("DIRECTORY")
+
+        manifest = (
+            pd.concat(
+                [manifest.drop(index=outdated_directories, errors="ignore"), entries]
+            )
+            .rename_axis("DIRECTORY")
+            .sort_index()
+        )
+
+        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+        manifest.to_csv(manifest_path + ".tmp", index_label="DIRECTORY")
+        os.replace(manifest_path + ".tmp", manifest_path)
+
+    return manifest.loc[directories].reset_index()
+
+
+def plan_epc_load(
+    subset="all",
+    filters=None,
+    local_authorities=None,
+    n_jobs=1,
+    from_zip=False,
+    zip_members=None,
+):
+    """Get the directories that need to be read for given subset and filters.
+
+    Directories whose LODGEMENT_DATE range (from the manifest)
+    cannot satisfy the date filters are skipped without being read.
+
+    Parameters
+    ----------
+    subset : {'all', 'Wales', 'England'}, default='all'
+        EPC certificate area subset.
+
+    filters : list, default=None
+        List of row filters as (column, operator, value) tuples, see apply_filters().
+
+    local_authorities : list, default=None
+        Only plan for these local authority codes.
+
+    n_jobs : int, default=1
+        Number of processes for scanning directories missing from the manifest.
+
+    from_zip : bool, default=False
+        Plan for reading from the EPC bulk download ZIP at EPC_ZIP_PATH.
+
+    zip_members : dict, default=None
+        ZIP members by directory, see read_zip_members().
+
+    Return
+    ---------
+    directories : list
+        Local authority directories to read."""
+
+    date_filters = [
+        (column, operator_str, value)
+        for column, operator_str, value in (filters or [])
+        if column == "LODGEMENT_DATE" and operator_str in DATE_RANGE_CHECKS
     ]
 
+    # Without date filters, there is nothing to plan
+    if not date_filters:
+        return get_epc_directories(
+            subset,
+            local_authorities=local_authorities,
+            from_zip=from_zip,
+            zip_members=zip_members,
+        )
+
+    manifest = get_epc_manifest(
+        subset,
+        local_authorities=local_authorities,
+        n_jobs=n_jobs,
+        from_zip=from_zip,
+        zip_members=zip_members,
+    )
+
+    keep = np.ones(len(manifest), dtype=bool)
+    min_dates = manifest["MIN_LODGEMENT_DATE"]
+    max_dates = manifest["MAX_LODGEMENT_DATE"]
+
+    for _, operator_str, value in date_filters:
+        keep &= DATE_RANGE_CHECKS[operator_str](min_dates, max_dates, value).to_numpy(
+            dtype=bool
+        )
+
+    logger.info(
+        "Reading {} of {} directories ({} of {} rows before filtering)".format(
+            keep.sum(),
+            len(manifest),
+            manifest["N_ROWS"][keep].sum(),
+            manifest["N_ROWS"].sum(),
+        )
+    )
+
+    return list(manifest["DIRECTORY"][keep])
+
+
+def load_epc_data(
+    subset="all",
+    usecols=None,
+    low_memory=False,
+    use_cache=True,
+    n_jobs=1,
+    filters=None,
+    local_authorities=None,
+    compact_dtypes=False,
+    use_manifest=True,
+    from_zip=False,
+    return_stats=False,
+):
+    """Load and return EPC dataset, or specific subset, as pandas dataframe.
+
+    Parameters
+    ----------
+    subset : {'all', 'Wales', 'England'}, default='all'
+        EPC certificate area subset.
+
+    usecols : list, default=None
+        List of features/columns to load from EPC dataset.
+
+    low_memory : bool, default=False
+        Internally process the file in chunks, resulting in lower memory use while parsing,
+        but possibly mixed type inference.
+        To ensure no mixed types either set False, or specify the type with the dtype parameter.
+
+    use_cache : bool, default=True
+        Read certificates from the columnar cache under EPC_CACHE_PATH,
+        building it on first read. Later loads only read the requested columns.
+
+    n_jobs : int, default=1
+        Number of processes for loading local authority directories in parallel.
+        Every process parses one directory at a time, so memory per process is
+        bounded by the largest single directory. If -1, use all CPUs.
+
+    filters : list, default=None
+        List of row filters as (column, operator, value) tuples, e.g.
+        [("TENURE", "!=", "NO DATA!"), ("LODGEMENT_DATE", ">=", "2015-01-01")].
+        See apply_filters() for valid operators.
+        Filters are applied chunk by chunk during the read,
+        so rejected rows never reach the final dataframe.
+
+    local_authorities : list, default=None
+        Only load certificates for these local authority codes, e.g. ['W06000015'].
+        Directories of other local authorities are not read at all.
+
+    compact_dtypes : bool, default=False
+        Parse columns with the compact dtypes from epc_schema
+        (categoricals, float32, int16) instead of the pandas defaults.
+        Use epc_schema.get_memory_report() for the bytes saved per column.
+
+    use_manifest : bool, default=True
+        Use the dataset manifest to skip directories whose LODGEMENT_DATE range
+        does not match the date filters, see plan_epc_load().
+
+    from_zip : bool, default=False
+        Read certificates.csv files straight from the EPC bulk download ZIP
+        at EPC_ZIP_PATH, without extracting it. With n_jobs > 1,
+        different members are decompressed in parallel.
+        The members are read from the ZIP once per load.
+
+    return_stats : bool, default=False
+        Also return load stats: rows/s and MB/s for parsing every directory,
+        concat time and peak RSS. Summary and records are logged either way.
+
+    Return
+    ---------
+    epc_certs : pandas.DateFrame
+        EPC certificate data for given area and features.
+
+    load_stats : pandas.DataFrame
+        One row per load step, see instrumentation.get_load_stats().
+        Only returned if return_stats is True."""
+
+    zip_members = read_zip_members() if from_zip else None
+
+    if use_manifest:
+        directories = plan_epc_load(
+            subset,
+            filters=filters,
+            local_authorities=local_authorities,
+            n_jobs=n_jobs,
+            from_zip=from_zip,
+            zip_members=zip_members,
+        )
+    else:
+        directories = get_epc_directories(
+            subset,
+            local_authorities=local_authorities,
+            from_zip=from_zip,
+            zip_members=zip_members,
+        )
+
+    # No directory holds certificates matching the filters
+    if not directories:
+        epc_certs = get_empty_epc_frame(usecols, compact_dtypes=compact_dtypes)
+        if return_stats:
+            return epc_certs, instrumentation.get_load_stats("load_epc_data", [])
+        return epc_certs
+
+    # Load EPC certificates for given subset
+    # Only load columns and rows of interest (if given)
+    read_directory = partial(
+        read_certificates_with_stats,
+        usecols=usecols,
+        low_memory=low_memory,
+        use_cache=use_cache,
+        filters=filters,
+        compact_dtypes=compact_dtypes,
+        from_zip=from_zip,
+        zip_members=zip_members,
+    )
+
+    results = map_directories(read_directory, directories, n_jobs=n_jobs)
+    epc_certs = [epc_df for epc_df, _ in results]
+    load_records = [load_record for _, load_record in results]
+    del results
+
     # Concatenate single dataframes into dataframe
-    epc_certs = pd.concat(epc_certs, axis=0)
+    with instrumentation.timed_step(load_records, "concat", subset) as step_info:
+        epc_certs = concat_epc_frames(epc_certs)
+        step_info["N_ROWS"] = len(epc_certs)
+
+    load_stats = instrumentation.get_load_stats("load_epc_data", load_records)
+
+    if compact_dtypes:
+        memory_report = epc_schema.get_memory_report(epc_certs)
+        logger.info(
+            "Compact dtypes: {:.1f} MB instead of {:.1f} MB".format(
+                memory_report["compact bytes"].sum() / 1e6,
+                memory_report["default bytes"].sum() / 1e6,
+            )
+        )
+
+    if return_stats:
+        return epc_certs, load_stats
 
     return epc_certs
 
 
+def read_certificate_chunks(
+    directory,
+    usecols=None,
+    chunksize=100000,
+    use_cache=True,
+    compact_dtypes=False,
+    from_zip=False,
+    zip_members=None,
+):
+    """Iterate over EPC certificates for a single local authority in chunks.
+
+    If a valid columnar cache exists, chunks are read from the cache.
+    Otherwise the certificates.csv is parsed in chunks. The cache is not built here,
+    as this would require the whole file to be loaded at once.
+
+    Parameters
+    ----------
+    directory : str
+        Local authority directory, e.g. 'domestic-W06000015-Cardiff'.
+
+    usecols : list, default=None
+        List of features/columns to load from EPC dataset.
+
+    chunksize : int, default=100000
+        Maximum number of rows per chunk.
+
+    use_cache : bool, default=True
+        Read from columnar cache if it exists and is up to date.
+
+    compact_dtypes : bool, default=False
+        Parse columns with the compact dtypes from epc_schema.
+
+    from_zip : bool, default=False
+        Read certificates.csv straight from the EPC bulk download ZIP at EPC_ZIP_PATH.
+
+    zip_members : dict, default=None
+        ZIP members by directory, see read_zip_members().
+        If None and from_zip is True, read them from the ZIP.
+
+    Return
+    ---------
+    chunks : generator
+        Generator yielding pandas.DataFrames with at most chunksize rows."""
+
+    if from_zip and zip_members is None:
+        zip_members = read_zip_members()
+
+    cache_path = get_cache_path(directory, from_zip=from_zip)
+
+    if use_cache and caching.is_cache_valid(
+        cache_path,
+        get_cache_signature(directory, from_zip=from_zip, zip_members=zip_members),
+    ):
+
+        # Keep column order of source file
+        metadata = caching.read_cache_metadata(cache_path)
+        columns = metadata["columns"]
+        if usecols is not None:
+            columns = [col for col in columns if col in usecols]
+
+        # Read categoricals directly from dictionary encoding
+        dictionary_columns = None
+        if compact_dtypes:
+            dictionary_columns = epc_schema.get_categorical_columns(columns)
+
+        parquet_file = pq.ParquetFile(cache_path, read_dictionary=dictionary_columns)
+
+        # Empty cache yields no batches, but the CSV yields one empty chunk
+        if parquet_file.metadata.num_rows == 0:
+            chunk = caching.read_cache(
+                cache_path,
+                columns=usecols and columns,
+                dictionary_columns=dictionary_columns,
+            )
+            if compact_dtypes:
+                yield epc_schema.apply_schema(chunk)
+            else:
+                yield epc_schema.restore_dtypes(chunk, metadata.get("dtypes", {}))
+            return
+
+        # Continue index across chunks, as when reading the CSV
+        n_rows_read = 0
+
+        for batch in parquet_file.iter_batches(
+            batch_size=chunksize, columns=usecols and columns
+        ):
+            chunk = batch.to_pandas()
+            chunk.index = pd.RangeIndex(n_rows_read, n_rows_read + len(chunk))
+            n_rows_read += len(chunk)
+
+            if compact_dtypes:
+                chunk = epc_schema.apply_schema(chunk)
+            else:
+                chunk = epc_schema.restore_dtypes(chunk, metadata.get("dtypes", {}))
+
+            yield chunk
+
+    else:
+        dtypes = epc_schema.get_dtypes(usecols) if compact_dtypes else None
+
+        with open_certificates(
+            directory, from_zip=from_zip, zip_members=zip_members
+        ) as certificates:
+            for chunk in pd.read_csv(
+                certificates, usecols=usecols, chunksize=chunksize, dtype=dtypes
+            ):
+                if compact_dtypes:
+                    chunk = epc_schema.apply_schema(chunk)
+
+                yield chunk
+
+
+def iter_with_read_ahead(iterator, n_ahead=1):
+    """Iterate while the next item(s) are produced in a background thread.
+
+    Reading and parsing release the GIL for most of their work, so reading
+    the next chunk overlaps with processing of the current one.
+
+    Parameters
+    ----------
+    iterator : iterable
+        Iterable to read ahead from.
+
+    n_ahead : int, default=1
+        Number of items to read ahead.
+        Bounds the number of items held in memory in addition to the current one.
+
+    Return
+    ---------
+    items : generator
+        Generator yielding the items of the iterator in the same order."""
+
+    item_queue = queue.Queue(maxsize=n_ahead)
+    stop_event = threading.Event()
+    end_of_iteration = object()
+
+    def put(item):
+        """Put item in queue, unless consumer has stopped iterating."""
+
+        while not stop_event.is_set():
+            try:
+                item_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        """Produce items in background."""
+
+        try:
+            for item in iterator:
+                if not put((item, None)):
+                    return
+            put((end_of_iteration, None))
+        except Exception as error:
+            put((None, error))
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+
+    try:
+        while True:
+            item, error = item_queue.get()
+
+            if error is not None:
+                raise error
+            if item is end_of_iteration:
+                return
+
+            yield item
+
+    finally:
+        # Stop producer if consumer stops early
+        stop_event.set()
+
+
+def iter_epc_data(
+    subset="all",
+    usecols=None,
+    chunksize=100000,
+    use_cache=True,
+    read_ahead=True,
+    filters=None,
+    local_authorities=None,
+    compact_dtypes=False,
+    from_zip=False,
+):
+    """Iterate over EPC dataset, or specific subset, in chunks of bounded size.
+
+    This allows processing the dataset for England (or all) in constant memory,
+    instead of loading the entire dataframe at once with load_epc_data().
+
+    Parameters
+    ----------
+    subset : {'all', 'Wales', 'England'}, default='all'
+        EPC certificate area subset.
+
+    usecols : list, default=None
+        List of features/columns to load from EPC dataset.
+
+    chunksize : int, default=100000
+        Maximum number of rows per chunk.
+
+    use_cache : bool, default=True
+        Read from columnar cache if it exists and is up to date.
+
+    read_ahead : bool, default=True
+        Read the next chunk in the background while the current one is processed.
+
+    filters : list, default=None
+        List of row filters as (column, operator, value) tuples, see apply_filters().
+        Chunks only hold rows passing all filters, so they may be smaller than chunksize.
+
+    local_authorities : list, default=None
+        Only iterate over certificates for these local authority codes.
+
+    compact_dtypes : bool, default=False
+        Parse columns with the compact dtypes from epc_schema.
+
+    from_zip : bool, default=False
+        Read certificates.csv files straight from the EPC bulk download ZIP
+        at EPC_ZIP_PATH, without extracting it.
+
+    Return
+    ---------
+    chunks : generator
+        Generator yielding tuples (directory, chunk), with the local authority directory
+        and a pandas.DataFrame holding at most chunksize certificates from it."""
+
+    zip_members = read_zip_members() if from_zip else None
+
+    directories = get_epc_directories(
+        subset,
+        local_authorities=local_authorities,
+        from_zip=from_zip,
+        zip_members=zip_members,
+    )
+
+    # Load columns needed for filtering as well
+    filter_columns = get_filter_columns(filters)
+    extra_columns = []
+    read_columns = usecols
+    if usecols is not None:
+        extra_columns = [col for col in filter_columns if col not in usecols]
+        read_columns = list(usecols) + extra_columns
+
+    chunks = (
+        (directory, chunk)
+        for directory in directories
+        for chunk in read_certificate_chunks(
+            directory,
+            usecols=read_columns,
+            chunksize=chunksize,
+            use_cache=use_cache,
+            compact_dtypes=compact_dtypes,
+            from_zip=from_zip,
+            zip_members=zip_members,
+        )
+    )
+
+    if read_ahead:
+        chunks = iter_with_read_ahead(chunks)
+
+    for directory, chunk in chunks:
+
+        if filters:
+            chunk = apply_filters(chunk, filters)
+            if extra_columns:
+                chunk = chunk.drop(columns=extra_columns)
+
+        yield directory, chunk
+
+
 # ---------------------------------------------------------------------------------
 
 
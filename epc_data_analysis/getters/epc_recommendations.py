@@ -0,0 +1,382 @@
+# File: getters/epc_recommendations.py
+"""Load EPC recommendations and look them up by LMK_KEY.
+
+Every local authority directory ships a recommendations.csv with
+the improvements recommended for its certificates (several rows per LMK_KEY).
+On first read, the recommendations are stored sorted by LMK_KEY in the
+columnar cache, together with an index mapping every LMK_KEY to its row range.
+Getting the recommendations for given certificates is then an indexed lookup
+instead of a merge of two very large tables.
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from epc_data_analysis.getters import epc_data, epc_schema
+from epc_data_analysis.utils import caching
+
+# ---------------------------------------------------------------------------------
+
+# Rows per row group of the sorted recommendations,
+# so lookups only read the row groups holding the requested certificates
+RECOMMENDATIONS_ROW_GROUP_SIZE = 50000
+
+
+def get_recommendations_cache_paths(directory, from_zip=False):
+    """Get cache paths for sorted recommendations and LMK_KEY index.
+
+    Parameters
+    ----------
+    directory : str
+        Local authority directory, e.g. 'domestic-W06000015-Cardiff'.
+
+    from_zip : bool, default=False
+        Get paths of cache for recommendations read from the EPC bulk download ZIP.
+
+    Return
+    ---------
+    recommendations_path : str
+        Path to recommendations sorted by LMK_KEY.
+
+    index_path : str
+        Path to LMK_KEY index."""
+
+    cache_prefix = epc_data.EPC_CACHE_PATH + directory + (".zip" if from_zip else "")
+
+    recommendations_path = cache_prefix + ".recommendations.parquet"
+    index_path = cache_prefix + ".recommendations_index.parquet"
+
+    return recommendations_path, index_path
+
+
+def build_lmk_key_index(lmk_keys):
+    """Build index mapping every LMK_KEY to its row range.
+
+    Parameters
+    ----------
+    lmk_keys : numpy.ndarray
+        LMK_KEY of every row, sorted (or at least grouped) by LMK_KEY.
+
+    Return
+    ---------
+    lmk_key_index : pandas.DataFrame
+        LMK_KEY with START (inclusive) and STOP (exclusive) row position."""
+
+    n_rows = len(lmk_keys)
+
+    # Position where a new LMK_KEY starts
+    is_start = np.ones(n_rows, dtype=bool)
+    is_start[1:] = lmk_keys[1:] != lmk_keys[:-1]
+    starts = np.flatnonzero(is_start)
+    stops = np.append(starts[1:], n_rows)
+
+    lmk_key_index = pd.DataFrame(
+        {
+            "LMK_KEY": lmk_keys[starts],
+            "START": starts.astype(np.int64),
+            "STOP": stops.astype(np.int64),
+        }
+    )
+
+    return lmk_key_index
+
+
+def update_recommendations_cache(directory, from_zip=False, zip_members=None):
+    """Build sorted recommendations and LMK_KEY index for directory, if outdated.
+
+    Parameters
+    ----------
+    directory : str
+        Local authority directory, e.g. 'domestic-W06000015-Cardiff'.
+
+    from_zip : bool, default=False
+        Read recommendations.csv from the EPC bulk download ZIP.
+
+    zip_members : dict, default=None
+        ZIP members of recommendations.csv by directory,
+        see epc_data.read_zip_members(). If None and from_zip is True, read them.
+
+    Return
+    ---------
+    recommendations_path : str
+        Path to recommendations sorted by LMK_KEY.
+
+    index_path : str
+        Path to LMK_KEY index."""
+
+    if from_zip and zip_members is None:
+        zip_members = epc_data.read_zip_members("recommendations.csv")
+
+    recommendations_path, index_path = get_recommendations_cache_paths(
+        directory, from_zip=from_zip
+    )
+    signature = epc_data.get_certificates_signature(
+        directory,
+        from_zip=from_zip,
+        file_name="recommendations.csv",
+        zip_members=zip_members,
+    )
+
+    if caching.is_cache_valid(recommendations_path, signature) and (
+        caching.is_cache_valid(index_path, signature)
+    ):
+        return recommendations_path, index_path
+
+    with epc_data.open_certificates(
+        directory,
+        from_zip=from_zip,
+        file_name="recommendations.csv",
+        zip_members=zip_members,
+    ) as recommendations_file:
+        recommendations = pd.read_csv(
+            recommendations_file,
+            low_memory=False,
+            dtype=epc_schema.get_dtypes(schema=epc_schema.RECOMMENDATIONS_SCHEMA),
+        )
+
+    recommendations = epc_schema.apply_schema(
+        recommendations, schema=epc_schema.RECOMMENDATIONS_SCHEMA
+    )
+
+    # Stable sort keeps improvement order within every certificate
+    recommendations = recommendations.sort_values(
+        "LMK_KEY", kind="mergesort"
+    ).reset_index(drop=True)
+
+    lmk_key_index = build_lmk_key_index(recommendations["LMK_KEY"].to_numpy())
+
+    caching.write_cache(
+        recommendations,
+        recommendations_path,
+        signature,
+        row_group_size=RECOMMENDATIONS_ROW_GROUP_SIZE,
+    )
+    caching.write_cache(lmk_key_index, index_path, signature)
+
+    return recommendations_path, index_path
+
+
+def load_recommendations_index(
+    subset="all", local_authorities=None, n_jobs=1, from_zip=False
+):
+    """Load LMK_KEY index for recommendations, building it where necessary.
+
+    Parameters
+    ----------
+    subset : {'all', 'Wales', 'England'}, default='all'
+        EPC certificate area subset.
+
+    local_authorities : list, default=None
+        Only load index for these local authority codes.
+
+    n_jobs : int, default=1
+        Number of processes for building outdated indices. If -1, use all CPUs.
+
+    from_zip : bool, default=False
+        Read recommendations.csv files from the EPC bulk download ZIP.
+
+    Return
+    ---------
+    recommendations_index : pandas.DataFrame
+        LMK_KEY with DIRECTORY (categorical) and START/STOP row positions
+        in the sorted recommendations of that directory."""
+
+    zip_members = epc_data.read_zip_members("recommendations.csv") if from_zip else None
+
+    directories = epc_data.get_epc_directories(
+        subset,
+        local_authorities=local_authorities,
+        from_zip=from_zip,
+        zip_members=zip_members,
+    )
+
+    cache_paths = epc_data.map_directories(
+        partial(
+            update_recommendations_cache, from_zip=from_zip, zip_members=zip_members
+        ),
+        directories,
+        n_jobs=n_jobs,
+    )
+
+    index_frames = []
+
+    for directory, (_, index_path) in zip(directories, cache_paths):
+        lmk_key_index = caching.read_cache(index_path)
+        lmk_key_index["DIRECTORY"] = pd.Categorical(
+            np.repeat(directory, len(lmk_key_index)), categories=directories
+        )
+        index_frames.append(lmk_key_index)
+
+    return epc_data.concat_epc_frames(index_frames).reset_index(drop=True)
+
+
+def load_epc_recommendations(
+    subset="all", usecols=None, local_authorities=None, n_jobs=1, from_zip=False
+):
+    """Load EPC recommendations with compact dtypes, sorted by LMK_KEY per directory.
+
+    Parameters
+    ----------
+    subset : {'all', 'Wales', 'England'}, default='all'
+        EPC certificate area subset.
+
+    usecols : list, default=None
+        List of columns to load from recommendations.
+
+    local_authorities : list, default=None
+        Only load recommendations for these local authority codes.
+
+    n_jobs : int, default=1
+        Number of processes for building outdated caches. If -1, use all CPUs.
+
+    from_zip : bool, default=False
+        Read recommendations.csv files from the EPC bulk download ZIP.
+
+    Return
+    ---------
+    recommendations : pandas.DataFrame
+        EPC recommendations for given area."""
+
+    zip_members = epc_data.read_zip_members("recommendations.csv") if from_zip else None
+
+    directories = epc_data.get_epc_directories(
+        subset,
+        local_authorities=local_authorities,
+        from_zip=from_zip,
+        zip_members=zip_members,
+    )
+
+    cache_paths = epc_data.map_directories(
+        partial(
+            update_recommendations_cache, from_zip=from_zip, zip_members=zip_members
+        ),
+        directories,
+        n_jobs=n_jobs,
+    )
+
+    return epc_data.concat_epc_frames(
+        [
+            caching.read_cache(
+                recommendations_path,
+                columns=usecols,
+                dictionary_columns=epc_schema.get_categorical_columns(
+                    usecols, schema=epc_schema.RECOMMENDATIONS_SCHEMA
+                ),
+            )
+            for recommendations_path, _ in cache_paths
+        ]
+    )
+
+
+def get_recommendations(
+    lmk_keys,
+    recommendations_index=None,
+    usecols=None,
+    subset="all",
+    local_authorities=None,
+    from_zip=False,
+):
+    """Get recommendations for given certificates by indexed lookup.
+
+    Only the directories holding recommendations for the given certificates are read,
+    and from those only the row groups holding the indexed row ranges.
+
+    Parameters
+    ----------
+    lmk_keys : list, pandas.Series
+        LMK_KEYs of certificates, e.g. epc_df["LMK_KEY"].
+
+    recommendations_index : pandas.DataFrame, default=None
+        Index as returned by load_recommendations_index().
+        If None, load index for subset and local authorities.
+        Pass the index when doing several lookups, to load it only once.
+
+    usecols : list, default=None
+        List of columns to load from recommendations.
+
+    subset : {'all', 'Wales', 'England'}, default='all'
+        EPC certificate area subset. Only used if recommendations_index is None.
+
+    local_authorities : list, default=None
+        Only look up recommendations for these local authority codes.
+        Only used if recommendations_index is None.
+
+    from_zip : bool, default=False
+        Read recommendations.csv files from the EPC bulk download ZIP.
+
+    Return
+    ---------
+    recommendations : pandas.DataFrame
+        Recommendations for given certificates
+        (certificates without recommendations are not included)."""
+
+    if recommendations_index is None:
+        recommendations_index = load_recommendations_index(
+            subset, local_authorities=local_authorities, from_zip=from_zip
+        )
+
+    zip_members = epc_data.read_zip_members("recommendations.csv") if from_zip else None
+
+    # Look up row ranges for certificates
+    hits = recommendations_index[
+        recommendations_index["LMK_KEY"].isin(pd.unique(np.asarray(lmk_keys)))
+    ]
+
+    frames = []
+
+    for directory, directory_hits in hits.groupby("DIRECTORY", sort=True):
+
+        if len(directory_hits) == 0:
+            continue
+
+        # Expand row ranges into row positions
+        starts = directory_hits["START"].to_numpy()
+        lengths = directory_hits["STOP"].to_numpy() - starts
+        offsets = np.cumsum(lengths) - lengths
+        positions = np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())
+
+        recommendations_path, _ = update_recommendations_cache(
+            directory, from_zip=from_zip, zip_members=zip_members
+        )
+        frames.append(
+            caching.read_cache_rows(
+                recommendations_path,
+                positions,
+                columns=usecols,
+                dictionary_columns=epc_schema.get_categorical_columns(
+                    usecols, schema=epc_schema.RECOMMENDATIONS_SCHEMA
+                ),
+            )
+        )
+
+    if frames:
+        return epc_data.concat_epc_frames(frames).reset_index(drop=True)
+
+    directories = recommendations_index["DIRECTORY"].cat.categories
+    if len(directories) == 0:
+        return pd.DataFrame(
+            columns=epc_schema.get_columns(
+                usecols, schema=epc_schema.RECOMMENDATIONS_SCHEMA
+            )
+        )
+
+    # No hits: no rows, but columns and dtypes of the cached recommendations
+    recommendations_path, _ = update_recommendations_cache(
+        directories[0], from_zip=from_zip, zip_members=zip_members
+    )
+    return caching.read_cache_rows(
+        recommendations_path,
+        [],
+        columns=usecols,
+        dictionary_columns=epc_schema.get_categorical_columns(
+            usecols, schema=epc_schema.RECOMMENDATIONS_SCHEMA
+        ),
+    )
@@ -0,0 +1,408 @@
+# File: getters/epc_schema.py
+"""Compact dtypes for all EPC certificate and recommendation columns.
+
+Low-cardinality text columns (ratings, tenure, property type, efficiencies
+and free text descriptions) are stored as categoricals with string categories,
+numeric columns as float32 or int16. Identifiers, addresses and dates remain strings.
+Energy ratings are ordered categoricals (A to G), so they can be compared.
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------------------------------
+
+CATEGORY = "category"
+STRING = "object"
+
+# Compact dtype for every column in the EPC certificates
+EPC_SCHEMA = {
+    "LMK_KEY": STRING,
+    "ADDRESS1": STRING,
+    "ADDRESS2": STRING,
+    "ADDRESS3": STRING,
+    "POSTCODE": CATEGORY,
+    "BUILDING_REFERENCE_NUMBER": "int64",
+    "CURRENT_ENERGY_RATING": CATEGORY,
+    "POTENTIAL_ENERGY_RATING": CATEGORY,
+    "CURRENT_ENERGY_EFFICIENCY": "int16",
+    "POTENTIAL_ENERGY_EFFICIENCY": "int16",
+    "PROPERTY_TYPE": CATEGORY,
+    "BUILT_FORM": CATEGORY,
+    "INSPECTION_DATE": STRING,
+    "LOCAL_AUTHORITY": CATEGORY,
+    "CONSTITUENCY": CATEGORY,
+    "COUNTY": CATEGORY,
+    "LODGEMENT_DATE": STRING,
+    "TRANSACTION_TYPE": CATEGORY,
+    "ENVIRONMENT_IMPACT_CURRENT": "int16",
+    "ENVIRONMENT_IMPACT_POTENTIAL": "int16",
+    "ENERGY_CONSUMPTION_CURRENT": "float32",
+    "ENERGY_CONSUMPTION_POTENTIAL": "float32",
+    "CO2_EMISSIONS_CURRENT": "float32",
+    "CO2_EMISS_CURR_PER_FLOOR_AREA": "float32",
+    "CO2_EMISSIONS_POTENTIAL": "float32",
+    "LIGHTING_COST_CURRENT": "float32",
+    "LIGHTING_COST_POTENTIAL": "float32",
+    "HEATING_COST_CURRENT": "float32",
+    "HEATING_COST_POTENTIAL": "float32",
+    "HOT_WATER_COST_CURRENT": "float32",
+    "HOT_WATER_COST_POTENTIAL": "float32",
+    "TOTAL_FLOOR_AREA": "float32",
+    "ENERGY_TARIFF": CATEGORY,
+    "MAINS_GAS_FLAG": CATEGORY,
+    "FLOOR_LEVEL": CATEGORY,
+    "FLAT_TOP_STOREY": CATEGORY,
+    "FLAT_STOREY_COUNT": "float32",
+    "MAIN_HEATING_CONTROLS": CATEGORY,
+    "MULTI_GLAZE_PROPORTION": "float32",
+    "GLAZED_TYPE": CATEGORY,
+    "GLAZED_AREA": CATEGORY,
+    "EXTENSION_COUNT": "float32",
+    "NUMBER_HABITABLE_ROOMS": "float32",
+    "NUMBER_HEATED_ROOMS": "float32",
+    "LOW_ENERGY_LIGHTING": "float32",
+    "NUMBER_OPEN_FIREPLACES": "float32",
+    "HOTWATER_DESCRIPTION": CATEGORY,
+    "HOT_WATER_ENERGY_EFF": CATEGORY,
+    "HOT_WATER_ENV_EFF": CATEGORY,
+    "FLOOR_DESCRIPTION": CATEGORY,
+    "FLOOR_ENERGY_EFF": CATEGORY,
+    "FLOOR_ENV_EFF": CATEGORY,
+    "WINDOWS_DESCRIPTION": CATEGORY,
+    "WINDOWS_ENERGY_EFF": CATEGORY,
+    "WINDOWS_ENV_EFF": CATEGORY,
+    "WALLS_DESCRIPTION": CATEGORY,
+    "WALLS_ENERGY_EFF": CATEGORY,
+    "WALLS_ENV_EFF": CATEGORY,
+    "SECONDHEAT_DESCRIPTION": CATEGORY,
+    "SHEATING_ENERGY_EFF": CATEGORY,
+    "SHEATING_ENV_EFF": CATEGORY,
+    "ROOF_DESCRIPTION": CATEGORY,
+    "ROOF_ENERGY_EFF": CATEGORY,
+    "ROOF_ENV_EFF": CATEGORY,
+    "MAINHEAT_DESCRIPTION": CATEGORY,
+    "MAINHEAT_ENERGY_EFF": CATEGORY,
+    "MAINHEAT_ENV_EFF": CATEGORY,
+    "MAINHEATCONT_DESCRIPTION": CATEGORY,
+    "MAINHEATC_ENERGY_EFF": CATEGORY,
+    "MAINHEATC_ENV_EFF": CATEGORY,
+    "LIGHTING_DESCRIPTION": CATEGORY,
+    "LIGHTING_ENERGY_EFF": CATEGORY,
+    "LIGHTING_ENV_EFF": CATEGORY,
+    "MAIN_FUEL": CATEGORY,
+    "WIND_TURBINE_COUNT": "float32",
+    "HEAT_LOSS_CORRIDOOR": CATEGORY,
+    "UNHEATED_CORRIDOR_LENGTH": "float32",
+    "FLOOR_HEIGHT": "float32",
+    "PHOTO_SUPPLY": "float32",
+    "SOLAR_WATER_HEATING_FLAG": CATEGORY,
+    "MECHANICAL_VENTILATION": CATEGORY,
+    "ADDRESS": STRING,
+    "LOCAL_AUTHORITY_LABEL": CATEGORY,
+    "CONSTITUENCY_LABEL": CATEGORY,
+    "POSTTOWN": CATEGORY,
+    "CONSTRUCTION_AGE_BAND": CATEGORY,
+    "LODGEMENT_DATETIME": STRING,
+    "TENURE": CATEGORY,
+    "FIXED_LIGHTING_OUTLETS_COUNT": "float32",
+    "LOW_ENERGY_FIXED_LIGHT_COUNT": "float32",
+}
+
+# Compact dtype for every column in the EPC recommendations
+RECOMMENDATIONS_SCHEMA = {
+    "LMK_KEY": STRING,
+    "IMPROVEMENT_ITEM": "int8",
+    "IMPROVEMENT_SUMMARY_TEXT": CATEGORY,
+    "IMPROVEMENT_DESCR_TEXT": CATEGORY,
+    "IMPROVEMENT_ID": "float32",
+    "IMPROVEMENT_ID_TEXT": CATEGORY,
+    "INDICATIVE_COST": CATEGORY,
+}
+
+# Order of categories for ordered categoricals,
+# other values (e.g. 'INVALID!') follow in alphabetical order
+ORDERED_CATEGORIES = {
+    "CURRENT_ENERGY_RATING": list("ABCDEFG"),
+    "POTENTIAL_ENERGY_RATING": list("ABCDEFG"),
+}
+
+# Size of the NaN float object in an object column
+NAN_OBJECT_SIZE = sys.getsizeof(np.nan)
+
+
+def get_columns(columns=None, schema=EPC_SCHEMA):
+    """Get schema columns, restricted to given columns.
+
+    Parameters
+    ----------
+    columns : list, default=None
+        Columns of interest. If None, use all schema columns.
+
+    schema : dict, default=EPC_SCHEMA
+        Schema mapping columns to compact dtypes.
+
+    Return
+    ---------
+    columns : list
+        Schema columns of interest."""
+
+    if columns is None:
+        return list(schema)
+
+    return [col for col in columns if col in schema]
+
+
+def get_dtypes(columns=None, schema=EPC_SCHEMA):
+    """Get compact dtypes for parsing given columns with pandas.read_csv().
+
+    Integer columns are parsed as float32 if they turn out to hold missing values,
+    see apply_schema(). String columns are left to pandas.
+
+    Parameters
+    ----------
+    columns : list, default=None
+        Columns to get dtypes for. If None, use all schema columns.
+
+    schema : dict, default=EPC_SCHEMA
+        Schema mapping columns to compact dtypes.
+
+    Return
+    ---------
+    dtypes : dict
+        Dtype for every column (apart from string columns)."""
+
+    return {
+        col: schema[col]
+        for col in get_columns(columns, schema)
+        if schema[col] in (CATEGORY, "float32")
+    }
+
+
+def get_categorical_columns(columns=None, schema=EPC_SCHEMA):
+    """Get columns stored as categoricals (dictionary-encoded strings).
+
+    Parameters
+    ----------
+    columns : list, default=None
+        Columns of interest. If None, use all schema columns.
+
+    schema : dict, default=EPC_SCHEMA
+        Schema mapping columns to compact dtypes.
+
+    Return
+    ---------
+    categorical_columns : list
+        Categorical columns."""
+
+    return [col for col in get_columns(columns, schema) if schema[col] == CATEGORY]
+
+
+def get_text_columns(df, schema=EPC_SCHEMA):
+    """Get categorical schema columns that pandas did not parse as text.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Dataframe parsed with the default dtypes.
+
+    schema : dict, default=EPC_SCHEMA
+        Schema mapping columns to compact dtypes.
+
+    Return
+    ---------
+    dtypes : dict
+        Parsed dtype (e.g. 'int64', or 'float64' if all values are missing)
+        for every categorical column parsed as numbers or booleans."""
+
+    return {
+        col: str(df[col].dtype)
+        for col in get_categorical_columns(df.columns, schema)
+        if pd.api.types.is_numeric_dtype(df[col].dtype)
+    }
+
+
+def restore_dtypes(df, dtypes):
+    """Convert text columns back to the dtypes pandas parsed them as.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Dataframe with text columns (changed in place).
+
+    dtypes : dict
+        Parsed dtype for every text column, see get_text_columns().
+
+    Return
+    ---------
+    df : pandas.DataFrame
+        Dataframe with parsed dtypes."""
+
+    for col, dtype in dtypes.items():
+        if col not in df.columns:
+            continue
+
+        if pd.api.types.is_bool_dtype(dtype):
+            df[col] = df[col].str.lower() == "true"
+        else:
+            df[col] = df[col].astype(dtype)
+
+    return df
+
+
+def to_categorical(series, ordered_categories=None):
+    """Convert series to categorical with string categories.
+
+    Categories are strings whatever type they were parsed as
+    (e.g. FLOOR_LEVEL holds only numbers in some local authorities),
+    so categoricals of different local authorities can be concatenated.
+
+    Parameters
+    ----------
+    series : pandas.Series
+        Series to convert, categorical or not.
+
+    ordered_categories : list, default=None
+        Order of categories for an ordered categorical, see ORDERED_CATEGORIES.
+        If None, the categorical is unordered.
+
+    Return
+    ---------
+    series : pandas.Series
+        Categorical series."""
+
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(CATEGORY)
+
+    categories = series.cat.categories
+    string_categories = categories.astype(str)
+
+    if categories.dtype != string_categories.dtype or not categories.equals(
+        string_categories
+    ):
+        series = series.cat.rename_categories(string_categories)
+
+    if ordered_categories is not None:
+        other_categories = sorted(set(string_categories) - set(ordered_categories))
+        series = series.cat.set_categories(
+            list(ordered_categories) + other_categories, ordered=True
+        )
+
+    return series
+
+
+def apply_schema(df, schema=EPC_SCHEMA):
+    """Convert the columns of given dataframe to their compact dtypes.
+
+    Integer columns with missing values are converted to float32 instead.
+    Categorical columns get string categories, see to_categorical().
+    Columns not in the schema are left as they are.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        EPC dataframe to convert (in place).
+
+    schema : dict, default=EPC_SCHEMA
+        Schema mapping columns to compact dtypes.
+
+    Return
+    ---------
+    df : pandas.DataFrame
+        EPC dataframe with compact dtypes."""
+
+    for col in get_columns(df.columns, schema):
+
+        dtype = schema[col]
+
+        if dtype == CATEGORY:
+            df[col] = to_categorical(df[col], ORDERED_CATEGORIES.get(col))
+            continue
+
+        if dtype == STRING or df[col].dtype == dtype:
+            continue
+
+        if dtype.startswith("int") and df[col].isna().any():
+            dtype = "float32"
+
+        df[col] = df[col].astype(dtype)
+
+    return df
+
+
+def get_default_memory_usage(series):
+    """Get memory usage of series with the dtype pandas would infer by default.
+
+    Numeric columns are inferred as 64-bit. Categoricals are inferred as
+    object columns holding one Python string per row. The size is computed
+    from the category sizes and codes, without materialising the object column.
+
+    Parameters
+    ----------
+    series : pandas.Series
+        Series with compact dtype.
+
+    Return
+    ---------
+    n_bytes : int
+        Memory usage in bytes for default dtype."""
+
+    n_rows = len(series)
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        category_sizes = np.array(
+            [sys.getsizeof(category) for category in series.cat.categories] + [0],
+            dtype=np.int64,
+        )
+
+        # Code -1 (missing) points to the last entry
+        string_bytes = category_sizes[codes].sum()
+        nan_bytes = (codes == -1).sum() * NAN_OBJECT_SIZE
+
+        return int(8 * n_rows + string_bytes + nan_bytes)
+
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        return 8 * n_rows
+
+    return int(series.memory_usage(deep=True, index=False))
+
+
+def get_memory_report(df):
+    """Report memory saved per column by the compact dtypes.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        EPC dataframe with compact dtypes.
+
+    Return
+    ---------
+    memory_report : pandas.DataFrame
+        Dtype, default bytes, compact bytes and bytes saved for every column,
+        sorted by bytes saved."""
+
+    memory_report = pd.DataFrame(
+        {
+            "dtype": [str(df[col].dtype) for col in df.columns],
+            "default bytes": [get_default_memory_usage(df[col]) for col in df.columns],
+            "compact bytes": [
+                int(df[col].memory_usage(deep=True, index=False)) for col in df.columns
+            ],
+        },
+        index=df.columns,
+    )
+
+    memory_report["bytes saved"] = (
+        memory_report["default bytes"] - memory_report["compact bytes"]
+    )
+
+    return memory_report.sort_values("bytes saved", ascending=False)
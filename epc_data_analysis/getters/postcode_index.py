@@ -0,0 +1,275 @@
+# File: getters/postcode_index.py
+"""Persistent binary postcode index for location lookups.
+
+Postcodes are normalised (upper case, without spaces) and encoded as int64 keys
+(base 37 over the up to 7 characters, so the key order is the postcode order).
+The sorted keys and the float32 latitudes and longitudes are stored as .npy files
+under POSTCODE_INDEX_PATH and memory-mapped on load. A lookup is a binary search
+over the keys and returns coordinates by position, without merging data frames.
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from epc_data_analysis import get_yaml_config, Path, PROJECT_DIR, logger
+from epc_data_analysis.getters import util_data
+from epc_data_analysis.utils import caching
+
+# ---------------------------------------------------------------------------------
+
+# Load config file
+data_config = get_yaml_config(
+    Path(str(PROJECT_DIR) + "/epc_data_analysis/config/base.yaml")
+)
+
+# Get path
+POSTCODE_INDEX_PATH = str(PROJECT_DIR) + data_config["POSTCODE_INDEX_PATH"]
+
+# Maximum length of a postcode without space, e.g. 'SW1A1AA'
+MAX_POSTCODE_LENGTH = 7
+
+# Character values: 0 for padding, 1-10 for digits, 11-36 for letters
+CHARACTER_VALUES = np.zeros(256, dtype=np.int64)
+CHARACTER_VALUES[np.frombuffer(b"0123456789", dtype=np.uint8)] = np.arange(1, 11)
+CHARACTER_VALUES[np.frombuffer(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ", dtype=np.uint8)] = (
+    np.arange(11, 37)
+)
+
+# Weight of every character position
+POSITION_WEIGHTS = 37 ** np.arange(MAX_POSTCODE_LENGTH - 1, -1, -1, dtype=np.int64)
+
+INDEX_ARRAYS = ["keys", "latitudes", "longitudes"]
+
+
+def encode_unique_postcodes(postcodes):
+    """Encode unique postcodes as int64 keys.
+
+    Parameters
+    ----------
+    postcodes : numpy.ndarray
+        Postcodes (object array), e.g. 'CF10 1AA' or 'cf101aa'.
+
+    Return
+    ---------
+    keys : numpy.ndarray
+        Postcode key for every postcode (int64). -1 for missing or invalid postcodes."""
+
+    postcodes = pd.Series(postcodes, dtype=object)
+    normalised = postcodes.str.upper().str.replace(" ", "", regex=False)
+
+    # Only alphanumeric postcodes that fit into a key
+    is_valid = (
+        normalised.str.fullmatch(r"[0-9A-Z]{2,7}").fillna(False).to_numpy(dtype=bool)
+    )
+
+    keys = np.full(len(postcodes), -1, dtype=np.int64)
+
+    if is_valid.any():
+        characters = (
+            normalised[is_valid]
+            .to_numpy()
+            .astype("S{}".format(MAX_POSTCODE_LENGTH))
+            .view(np.uint8)
+            .reshape(-1, MAX_POSTCODE_LENGTH)
+        )
+        keys[is_valid] = CHARACTER_VALUES[characters] @ POSITION_WEIGHTS
+
+    return keys
+
+
+def encode_postcodes(postcodes):
+    """Encode postcodes as int64 keys, encoding every distinct postcode only once.
+
+    Parameters
+    ----------
+    postcodes : list, numpy.ndarray, pandas.Series
+        Postcodes, e.g. epc_df["POSTCODE"]. May be categorical.
+
+    Return
+    ---------
+    keys : numpy.ndarray
+        Postcode key for every postcode (int64). -1 for missing or invalid postcodes."""
+
+    if isinstance(getattr(postcodes, "dtype", None), pd.CategoricalDtype):
+        postcodes = pd.Series(postcodes)
+        codes = postcodes.cat.codes.to_numpy()
+        categories = postcodes.cat.categories
+    else:
+        codes, categories = pd.factorize(np.asarray(postcodes, dtype=object))
+
+    # Code -1 (missing) points to the last entry
+    unique_keys = np.append(
+        encode_unique_postcodes(np.asarray(categories, dtype=object)), -1
+    )
+
+    return unique_keys[codes]
+
+
+class PostcodeIndex:
+    """Sorted postcode keys with latitude and longitude for every key.
+
+    Parameters
+    ----------
+    keys : numpy.ndarray
+        Sorted, unique postcode keys (int64), see encode_postcodes().
+
+    latitudes : numpy.ndarray
+        Latitude for every key (float32).
+
+    longitudes : numpy.ndarray
+        Longitude for every key (float32)."""
+
+    def __init__(self, keys, latitudes, longitudes):
+
+        self.keys = keys
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+
+    def __len__(self):
+
+        return len(self.keys)
+
+    def get_positions(self, postcodes):
+        """Get position of given postcodes in the index.
+
+        Parameters
+        ----------
+        postcodes : list, numpy.ndarray, pandas.Series
+            Postcodes, with or without space.
+
+        Return
+        ---------
+        positions : numpy.ndarray
+            Position for every postcode (int64). -1 if postcode is not in index."""
+
+        keys = encode_postcodes(postcodes)
+
+        positions = np.searchsorted(self.keys, keys)
+        positions[positions == len(self.keys)] = 0
+
+        is_found = (keys != -1) & (np.asarray(self.keys[positions]) == keys)
+        positions[~is_found] = -1
+
+        return positions
+
+    def lookup(self, postcodes):
+        """Look up latitude and longitude for given postcodes.
+
+        Parameters
+        ----------
+        postcodes : list, numpy.ndarray, pandas.Series
+            Postcodes, with or without space.
+
+        Return
+        ---------
+        latitudes : numpy.ndarray
+            Latitude for every postcode (float32). NaN if postcode is not in index.
+
+        longitudes : numpy.ndarray
+            Longitude for every postcode (float32). NaN if postcode is not in index."""
+
+        positions = self.get_positions(postcodes)
+        is_found = positions != -1
+
+        latitudes = np.full(len(positions), np.nan, dtype=np.float32)
+        longitudes = np.full(len(positions), np.nan, dtype=np.float32)
+
+        latitudes[is_found] = self.latitudes[positions[is_found]]
+        longitudes[is_found] = self.longitudes[positions[is_found]]
+
+        return latitudes, longitudes
+
+
+def get_index_array_path(name):
+    """Get path to stored index array ('keys', 'latitudes' or 'longitudes')."""
+
+    return POSTCODE_INDEX_PATH + name + ".npy"
+
+
+def build_postcode_index():
+    """Build postcode index from location data and store it under POSTCODE_INDEX_PATH.
+
+    Postcodes that cannot be encoded are dropped.
+    For duplicate postcodes, the first entry is kept.
+
+    Return
+    ---------
+    postcode_index : PostcodeIndex
+        Postcode index (in memory)."""
+
+    signature = caching.get_file_signature(util_data.LOCATION_PATH)
+    location_data_df = util_data.get_location_data()
+
+    keys = encode_postcodes(location_data_df["POSTCODE"])
+    is_valid = keys != -1
+
+    if not is_valid.all():
+        logger.info(
+            "Postcode index: dropped {} invalid postcodes".format((~is_valid).sum())
+        )
+
+    # Sort by key, keep first entry for duplicates
+    order = np.flatnonzero(is_valid)
+    order = order[np.argsort(keys[order], kind="mergesort")]
+    sorted_keys = keys[order]
+    is_first = np.ones(len(sorted_keys), dtype=bool)
+    is_first[1:] = sorted_keys[1:] != sorted_keys[:-1]
+    order = order[is_first]
+
+    postcode_index = PostcodeIndex(
+        keys[order],
+        location_data_df["LATITUDE"].to_numpy(dtype=np.float32)[order],
+        location_data_df["LONGITUDE"].to_numpy(dtype=np.float32)[order],
+    )
+
+    os.makedirs(POSTCODE_INDEX_PATH, exist_ok=True)
+
+    # Remove sidecar first so index is invalid while being written
+    sidecar_path = caching.get_sidecar_path(get_index_array_path("keys"))
+    if os.path.exists(sidecar_path):
+        os.remove(sidecar_path)
+
+    for name in INDEX_ARRAYS:
+        array_path = get_index_array_path(name)
+        with open(array_path + ".tmp", "wb") as f:
+            np.save(f, getattr(postcode_index, name))
+        os.replace(array_path + ".tmp", array_path)
+
+    caching.write_cache_metadata(get_index_array_path("keys"), signature, INDEX_ARRAYS)
+
+    return postcode_index
+
+
+def load_postcode_index(rebuild=False):
+    """Load postcode index, building it if necessary.
+
+    The index is rebuilt if the location data (POSTCODE_PATH) has changed.
+    The arrays are memory-mapped, so loading is almost instant
+    and only the pages touched by lookups are read.
+
+    Parameters
+    ----------
+    rebuild : bool, default=False
+        Rebuild index even if it is up to date.
+
+    Return
+    ---------
+    postcode_index : PostcodeIndex
+        Postcode index with memory-mapped arrays."""
+
+    signature = caching.get_file_signature(util_data.LOCATION_PATH)
+
+    if rebuild or not caching.is_cache_valid(get_index_array_path("keys"), signature):
+        build_postcode_index()
+
+    return PostcodeIndex(
+        *[np.load(get_index_array_path(name), mmap_mode="r") for name in INDEX_ARRAYS]
+    )
@@ -2,6 +2,7 @@ import pandas as pd
 import os
 
 from epc_data_analysis import get_yaml_config, Path, PROJECT_DIR
+from epc_data_analysis.utils import caching, instrumentation
 
 # Load config file
 data_config = get_yaml_config(
@@ -11,10 +12,22 @@ data_config = get_yaml_config(
 # Get paths
 LOCATION_PATH = str(PROJECT_DIR) + data_config["POSTCODE_PATH"]
 WIMD_PATH = str(PROJECT_DIR) + data_config["WIMD_PATH"]
+UTIL_DATA_CACHE_PATH = str(PROJECT_DIR) + data_config["UTIL_DATA_CACHE_PATH"]
 
+# Compact dtypes
+LOCATION_DTYPES = {
+    "postcode": "category",
+    "latitude": "float32",
+    "longitude": "float32",
+}
+WIMD_DTYPES = {"POSTCODE": "category", "LATITUDE": "float32", "LONGITUDE": "float32"}
 
-def get_location_data():
-    """Load location data (postcode, latitude, longitude).
+# Data loaded in this session by source path, with the source signature
+_loaded_data = {}
+
+
+def read_location_data():
+    """Read location data from source CSV, with compact dtypes.
 
     Parameters
     ----------
@@ -26,11 +39,10 @@ def get_location_data():
         Location data (postcode, latitude, longitude).
     """
 
-    # Load data
-    location_data_df = pd.read_csv(LOCATION_PATH)
-
-    # Remove ID (not necessary and conflicts with EPC dataframe)
-    del location_data_df["id"]
+    # Load data, without ID (not necessary and conflicts with EPC dataframe)
+    location_data_df = pd.read_csv(
+        LOCATION_PATH, usecols=list(LOCATION_DTYPES), dtype=LOCATION_DTYPES
+    )
 
     # Rename columns to match EPC data
     location_data_df = location_data_df.rename(
@@ -43,8 +55,9 @@ def get_location_data():
     return location_data_df
 
 
-def get_WIMD_data():
-    """Load Wales Index of Multiple Deprivation (WIMD).
+def read_WIMD_data():
+    """Read Wales Index of Multiple Deprivation (WIMD) from source CSV,
+    with compact dtypes.
 
     Parameters
     ----------
@@ -55,6 +68,161 @@ def get_WIMD_data():
     wimd_df : pandas.DateFrame
         Wales Index of Multiple Deprivation data."""
 
+    return pd.read_csv(WIMD_PATH, dtype=WIMD_DTYPES)
+
+
+def read_cached(source_path, read_function):
+    """Read data from columnar cache, building it from source if outdated.
+
+    Parameters
+    ----------
+    source_path : str
+        Path to source CSV.
+
+    read_function : callable
+        Function reading the source CSV.
+
+    Return
+    ---------
+    df : pandas.DateFrame
+        Data from cache.
+
+    n_bytes : int
+        Number of bytes read (source CSV or cache)."""
+
+    cache_path = (
+        UTIL_DATA_CACHE_PATH
+        + os.path.splitext(os.path.basename(source_path))[0]
+        + ".parquet"
+    )
+    signature = caching.get_file_signature(source_path)
+
+    if not caching.is_cache_valid(cache_path, signature):
+        df = read_function()
+        caching.write_cache(df, cache_path, signature)
+        return df, signature["size"]
+
+    return caching.read_cache(cache_path), os.path.getsize(cache_path)
+
+
+def load_cached(source_path, read_function):
+    """Load data once per source signature and session, returning a copy.
+
+    Only the data of the latest signature is kept per source. Every call returns
+    a copy, so callers can modify it without affecting later calls.
+
+    Parameters
+    ----------
+    source_path : str
+        Path to source CSV.
+
+    read_function : callable
+        Function reading the source CSV.
+
+    Return
+    ---------
+    df : pandas.DateFrame
+        Copy of loaded data.
+
+    n_bytes : int
+        Number of bytes read, 0 if already loaded in this session."""
+
+    signature = caching.get_file_signature(source_path)
+    loaded = _loaded_data.get(source_path)
+
+    if loaded is not None and loaded[0] == signature:
+        return loaded[1].copy(), 0
+
+    df, n_bytes = read_cached(source_path, read_function)
+    _loaded_data[source_path] = (signature, df)
+
+    return df.copy(), n_bytes
+
+
+def get_location_data(return_stats=False, use_cache=True):
+    """Load location data (postcode, latitude, longitude).
+
+    POSTCODE is categorical, LATITUDE and LONGITUDE are float32.
+
+    Parameters
+    ----------
+    return_stats : bool, default=False
+        Also return load stats (rows/s, MB/s, peak RSS),
+        see instrumentation.get_load_stats(). Throughput refers to the bytes read,
+        which are 0 if the data was already loaded in this session.
+
+    use_cache : bool, default=True
+        Read from columnar cache, which is rebuilt if the source CSV changes.
+        Repeated calls in one session only copy the data loaded before.
+
+    Return
+    ---------
+    location_data_df : pandas.DateFrame
+        Location data (postcode, latitude, longitude).
+
+    load_stats : pandas.DataFrame
+        Load stats, only returned if return_stats is True.
+    """
+
+    load_records = []
+
+    # Load data
+    with instrumentation.timed_step(load_records, "parse", LOCATION_PATH) as step_info:
+        if use_cache:
+            location_data_df, step_info["N_BYTES"] = load_cached(
+                LOCATION_PATH, read_location_data
+            )
+        else:
+            location_data_df = read_location_data()
+            step_info["N_BYTES"] = caching.get_file_signature(LOCATION_PATH)["size"]
+        step_info["N_ROWS"] = len(location_data_df)
+
+    load_stats = instrumentation.get_load_stats("get_location_data", load_records)
+
+    if return_stats:
+        return location_data_df, load_stats
+
+    return location_data_df
+
+
+def get_WIMD_data(return_stats=False, use_cache=True):
+    """Load Wales Index of Multiple Deprivation (WIMD).
+
+    POSTCODE is categorical, LATITUDE and LONGITUDE are float32.
+
+    Parameters
+    ----------
+    return_stats : bool, default=False
+        Also return load stats (rows/s, MB/s, peak RSS),
+        see instrumentation.get_load_stats(). Throughput refers to the bytes read,
+        which are 0 if the data was already loaded in this session.
+
+    use_cache : bool, default=True
+        Read from columnar cache, which is rebuilt if the source CSV changes.
+        Repeated calls in one session only copy the data loaded before.
+
+    Return
+    ---------
+    wimd_df : pandas.DateFrame
+        Wales Index of Multiple Deprivation data.
+
+    load_stats : pandas.DataFrame
+        Load stats, only returned if return_stats is True."""
+
+    load_records = []
+
     # Load data
-    wimd_df = pd.read_csv(WIMD_PATH)
+    with instrumentation.timed_step(load_records, "parse", WIMD_PATH) as step_info:
+        if use_cache:
+            wimd_df, step_info["N_BYTES"] = load_cached(WIMD_PATH, read_WIMD_data)
+        else:
+            wimd_df = read_WIMD_data()
+            step_info["N_BYTES"] = caching.get_file_signature(WIMD_PATH)["size"]
+        step_info["N_ROWS"] = len(wimd_df)
+
+    load_stats = instrumentation.get_load_stats("get_WIMD_data", load_records)
+
+    if return_stats:
+        return wimd_df, load_stats
+
     return wimd_df
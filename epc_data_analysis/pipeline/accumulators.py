@@ -0,0 +1,524 @@
+# File: pipeline/accumulators.py
+"""Mergeable accumulators for statistics on data that does not fit into memory.
+
+Accumulators are fed chunk by chunk (e.g. from epc_data.read_certificate_chunks),
+can be merged across worker processes and are finalised into the same Series
+and dataframes the analysis and plotting functions use, e.g. value counts
+for easy_plotting.plot_subcategory_distribution(category_counts=...).
+
+Means and variances are combined with the parallel variant of Welford's
+algorithm (Chan et al.), so they stay accurate for large numbers of rows.
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+import copy
+
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from epc_data_analysis.getters import epc_data
+
+# ---------------------------------------------------------------------------------
+
+# Statistics kept for every group
+MOMENT_COLUMNS = ["SIZE", "COUNT", "SUM", "MEAN", "M2", "MIN", "MAX"]
+
+
+def get_moments(values, groups=None):
+    """Get moments of values in one chunk, optionally by group.
+
+    Parameters
+    ----------
+    values : pandas.Series
+        Numeric values.
+
+    groups : pandas.Series, default=None
+        Group of every value. If None, use a single group "total".
+        Missing groups are skipped.
+
+    Return
+    ---------
+    moments : pandas.DataFrame
+        SIZE (rows), COUNT (non-missing values), SUM, MEAN, M2 (sum of squared
+        differences from mean), MIN and MAX for every group."""
+
+    values = pd.to_numeric(values, errors="coerce").astype(np.float64)
+
+    if groups is None:
+        groups = pd.Series("total", index=values.index)
+
+    grouped = values.groupby(groups.to_numpy(), sort=False)
+
+    moments = grouped.agg(["size", "count", "sum", "mean", "min", "max"])
+    moments.columns = ["SIZE", "COUNT", "SUM", "MEAN", "MIN", "MAX"]
+    moments["M2"] = grouped.var(ddof=0).fillna(0.0) * moments["COUNT"]
+
+    return moments[MOMENT_COLUMNS]
+
+
+def merge_moments(moments_1, moments_2):
+    """Merge moments of two (disjoint) parts of the data.
+
+    Parameters
+    ----------
+    moments_1 : pandas.DataFrame
+        Moments by group, see get_moments().
+
+    moments_2 : pandas.DataFrame
+        Moments by group, see get_moments().
+
+    Return
+    ---------
+    moments : pandas.DataFrame
+        Moments of both parts by group."""
+
+    index = moments_1.index.union(moments_2.index, sort=False)
+    moments_1 = moments_1.reindex(index)
+    moments_2 = moments_2.reindex(index)
+
+    n_1 = moments_1["COUNT"].fillna(0)
+    n_2 = moments_2["COUNT"].fillna(0)
+    n = n_1 + n_2
+
+    mean_1 = moments_1["MEAN"].where(n_1 > 0, 0.0)
+    mean_2 = moments_2["MEAN"].where(n_2 > 0, 0.0)
+    delta = mean_2 - mean_1
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        share_2 = (n_2 / n).fillna(0.0)
+
+    moments = pd.DataFrame(index=index)
+    moments["SIZE"] = moments_1["SIZE"].fillna(0) + moments_2["SIZE"].fillna(0)
+    moments["COUNT"] = n
+    moments["SUM"] = moments_1["SUM"].fillna(0) + moments_2["SUM"].fillna(0)
+    moments["MEAN"] = (mean_1 + delta * share_2).where(n > 0)
+    moments["M2"] = (
+        moments_1["M2"].fillna(0) + moments_2["M2"].fillna(0) + delta**2 * n_1 * share_2
+    )
+    moments["MIN"] = np.fmin(moments_1["MIN"], moments_2["MIN"])
+    moments["MAX"] = np.fmax(moments_1["MAX"], moments_2["MAX"])
+
+    return moments
+
+
+def sort_index(series_or_df):
+    """Sort by index if index values are comparable."""
+
+    try:
+        return series_or_df.sort_index()
+    except TypeError:
+        return series_or_df
+
+
+class MomentsAccumulator:
+    """Count, sum, mean, variance, minimum and maximum of a numeric feature.
+
+    Parameters
+    ----------
+    feature : str
+        Numeric feature, e.g. "CO2_EMISSIONS_CURRENT"."""
+
+    def __init__(self, feature):
+
+        self.feature = feature
+        self.columns = [feature]
+        self.moments = pd.DataFrame(columns=MOMENT_COLUMNS, dtype=np.float64)
+
+    def update(self, df):
+        """Add chunk of data.
+
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            Chunk of data, with feature as column.
+
+        Return
+        ---------
+        self : MomentsAccumulator
+            Updated accumulator."""
+
+        self.moments = merge_moments(self.moments, get_moments(df[self.feature]))
+
+        return self
+
+    def merge(self, other):
+        """Add statistics of other accumulator (e.g. from other process).
+
+        Parameters
+        ----------
+        other : MomentsAccumulator
+            Accumulator for same feature.
+
+        Return
+        ---------
+        self : MomentsAccumulator
+            Merged accumulator."""
+
+        self.moments = merge_moments(self.moments, other.moments)
+
+        return self
+
+    def result(self):
+        """Get final statistics.
+
+        Return
+        ---------
+        statistics : pandas.Series
+            count, sum, mean, std, var (sample), min and max."""
+
+        moments = self.moments.reindex(["total"]).iloc[0]
+        n = moments["COUNT"] if moments["COUNT"] > 0 else 0
+        variance = moments["M2"] / (n - 1) if n > 1 else np.nan
+
+        return pd.Series(
+            {
+                "count": n,
+                "sum": moments["SUM"] if n > 0 else 0.0,
+                "mean": moments["MEAN"],
+                "std": np.sqrt(variance),
+                "var": variance,
+                "min": moments["MIN"],
+                "max": moments["MAX"],
+            },
+            name=self.feature,
+        )
+
+
+class GroupedMomentsAccumulator:
+    """Moments of a numeric feature for every value of a grouping feature.
+
+    Parameters
+    ----------
+    feature : str
+        Numeric feature, e.g. "CO2_EMISSIONS_CURRENT".
+
+    by : str
+        Feature by which to group, e.g. "TENURE"."""
+
+    def __init__(self, feature, by):
+
+        self.feature = feature
+        self.by = by
+        self.columns = [feature, by]
+        self.moments = pd.DataFrame(columns=MOMENT_COLUMNS, dtype=np.float64)
+        self.total = MomentsAccumulator(feature)
+
+    def update(self, df):
+        """Add chunk of data.
+
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            Chunk of data, with feature and grouping feature as columns.
+
+        Return
+        ---------
+        self : GroupedMomentsAccumulator
+            Updated accumulator."""
+
+        self.moments = merge_moments(
+            self.moments, get_moments(df[self.feature], df[self.by])
+        )
+        self.total.update(df)
+
+        return self
+
+    def merge(self, other):
+        """Add statistics of other accumulator (e.g. from other process).
+
+        Parameters
+        ----------
+        other : GroupedMomentsAccumulator
+            Accumulator for same feature and grouping feature.
+
+        Return
+        ---------
+        self : GroupedMomentsAccumulator
+            Merged accumulator."""
+
+        self.moments = merge_moments(self.moments, other.moments)
+        self.total.merge(other.total)
+
+        return self
+
+    def result(self):
+        """Get final statistics by group.
+
+        Return
+        ---------
+        statistics : pandas.DataFrame
+            SUM, SHARE (in % of total over all rows), MEAN, COUNT (non-missing
+            values), SIZE (rows), STD (sample), MIN and MAX, indexed by group,
+            as epc_analysis.get_group_stats()."""
+
+        moments = sort_index(self.moments)
+        n = moments["COUNT"]
+
+        statistics = pd.DataFrame(index=moments.index)
+        statistics["SUM"] = moments["SUM"]
+        statistics["SHARE"] = moments["SUM"] / self.total.result()["sum"] * 100
+        statistics["MEAN"] = moments["MEAN"]
+        statistics["COUNT"] = n.astype(np.int64)
+        statistics["SIZE"] = moments["SIZE"].astype(np.int64)
+        statistics["STD"] = np.sqrt(moments["M2"] / (n - 1)).where(n > 1)
+        statistics["MIN"] = moments["MIN"]
+        statistics["MAX"] = moments["MAX"]
+        statistics.index.name = self.by
+
+        return statistics
+
+
+class HistogramAccumulator:
+    """Number of rows for every value of a categorical feature.
+
+    Parameters
+    ----------
+    feature : str
+        Categorical feature, e.g. "CURRENT_ENERGY_RATING"."""
+
+    def __init__(self, feature):
+
+        self.feature = feature
+        self.columns = [feature]
+        self.counts = pd.Series(dtype=np.int64)
+
+    def update(self, df):
+        """Add chunk of data.
+
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            Chunk of data, with feature as column.
+
+        Return
+        ---------
+        self : HistogramAccumulator
+            Updated accumulator."""
+
+        counts = df[self.feature].value_counts(sort=False)
+
+        # Plain index, so counts of different chunks can be added
+        counts.index = pd.Index(np.asarray(counts.index, dtype=object))
+        self.counts = self.counts.add(counts[counts > 0], fill_value=0)
+
+        return self
+
+    def merge(self, other):
+        """Add counts of other accumulator (e.g. from other process).
+
+        Parameters
+        ----------
+        other : HistogramAccumulator
+            Accumulator for same feature.
+
+        Return
+        ---------
+        self : HistogramAccumulator
+            Merged accumulator."""
+
+        self.counts = self.counts.add(other.counts, fill_value=0)
+
+        return self
+
+    def result(self, normalize=False):
+        """Get final counts, as pandas.Series.value_counts().
+
+        Parameters
+        ----------
+        normalize : bool, default=False
+            If True, return shares (0-1) instead of counts.
+
+        Return
+        ---------
+        counts : pandas.Series
+            Counts (or shares) by value, sorted by frequency."""
+
+        counts = sort_index(self.counts.astype(np.int64)).sort_values(
+            ascending=False, kind="mergesort"
+        )
+        counts.index.name = self.feature
+        counts.name = "count"
+
+        if normalize:
+            counts = (counts / counts.sum()).rename("proportion")
+
+        return counts
+
+
+def accumulate_chunks(chunks, accumulators, feature_functions=None):
+    """Feed chunks of data to accumulators.
+
+    Parameters
+    ----------
+    chunks : iterable
+        Chunks of data (pandas.DataFrames).
+
+    accumulators : list
+        Accumulators to update.
+
+    feature_functions : list, default=None
+        Row-wise feature functions to apply to every chunk first,
+        e.g. feature_engineering.get_new_EPC_rating_features.
+
+    Return
+    ---------
+    accumulators : list
+        Updated accumulators."""
+
+    for chunk in chunks:
+
+        for feature_function in feature_functions or []:
+            chunk = feature_function(chunk)
+
+        for accumulator in accumulators:
+            accumulator.update(chunk)
+
+    return accumulators
+
+
+def accumulate_directory(
+    directory,
+    accumulators,
+    usecols,
+    feature_functions,
+    chunksize,
+    from_zip,
+    zip_members,
+):
+    """Feed certificates of one local authority to accumulators chunk by chunk.
+
+    Parameters
+    ----------
+    directory : str
+        Local authority directory, e.g. 'domestic-W06000015-Cardiff'.
+
+    accumulators : list
+        Accumulators to update.
+
+    usecols : list
+        Columns to read.
+
+    feature_functions : list
+        Row-wise feature functions to apply to every chunk first.
+
+    chunksize : int
+        Maximum number of rows per chunk.
+
+    from_zip : bool
+        Read certificates from EPC bulk download ZIP.
+
+    zip_members : dict
+        ZIP members by directory, see epc_data.read_zip_members().
+
+    Return
+    ---------
+    accumulators : list
+        Copies of accumulators, updated with certificates of directory."""
+
+    # Start from copies, so accumulators of different directories can be merged
+    accumulators = copy.deepcopy(accumulators)
+
+    chunks = epc_data.read_certificate_chunks(
+        directory,
+        usecols=usecols,
+        chunksize=chunksize,
+        from_zip=from_zip,
+        zip_members=zip_members,
+    )
+
+    return accumulate_chunks(chunks, accumulators, feature_functions)
+
+
+def accumulate_epc_data(
+    accumulators,
+    subset="all",
+    local_authorities=None,
+    usecols=None,
+    feature_functions=None,
+    chunksize=100000,
+    n_jobs=1,
+    from_zip=False,
+):
+    """Compute statistics over EPC data without loading it into memory at once.
+
+    Every local authority is streamed in chunks, optionally in parallel processes,
+    and the accumulators of all local authorities are merged.
+
+    Parameters
+    ----------
+    accumulators : list
+        Accumulators to compute, e.g. [HistogramAccumulator("TENURE")].
+
+    subset : {'all', 'Wales', 'England'}, default='all'
+        EPC certificate area subset.
+
+    local_authorities : list, default=None
+        Only use these local authority codes, e.g. ['W06000015'].
+
+    usecols : list, default=None
+        Columns to read. If None, read the columns the accumulators need,
+        which requires feature_functions to be None.
+
+    feature_functions : list, default=None
+        Row-wise feature functions to apply to every chunk first.
+
+    chunksize : int, default=100000
+        Maximum number of rows per chunk.
+
+    n_jobs : int, default=1
+        Number of processes. If -1, use all CPUs.
+
+    from_zip : bool, default=False
+        Read certificates from EPC bulk download ZIP at EPC_ZIP_PATH.
+
+    Return
+    ---------
+    accumulators : list
+        Accumulators with statistics over all chunks."""
+
+    if usecols is None and feature_functions is None:
+        usecols = list(
+            dict.fromkeys(
+                column for accumulator in accumulators for column in accumulator.columns
+            )
+        )
+
+    zip_members = epc_data.read_zip_members() if from_zip else None
+
+    directories = epc_data.get_epc_directories(
+        subset=subset,
+        local_authorities=local_authorities,
+        from_zip=from_zip,
+        zip_members=zip_members,
+    )
+
+    results = epc_data.map_directories(
+        partial(
+            accumulate_directory,
+            accumulators=accumulators,
+            usecols=usecols,
+            feature_functions=feature_functions,
+            chunksize=chunksize,
+            from_zip=from_zip,
+            zip_members=zip_members,
+        ),
+        directories,
+        n_jobs=n_jobs,
+    )
+
+    if not results:
+        return accumulators
+
+    merged_accumulators = results[0]
+    for directory_accumulators in results[1:]:
+        for accumulator, other in zip(merged_accumulators, directory_accumulators):
+            accumulator.merge(other)
+
+    return merged_accumulators
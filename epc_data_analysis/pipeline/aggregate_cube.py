@@ -0,0 +1,433 @@
+# File: pipeline/aggregate_cube.py
+"""Precomputed aggregate cube for fast interactive analysis.
+
+The cube holds one row for every observed combination of the dimensions
+(e.g. TENURE, WIMD Decile, CURRENT_ENERGY_RATING) with the number of dwellings
+and the count, sum and sum of squares of every numeric measure. Counts, means,
+shares and standard deviations for any roll-up or slice are computed from these
+few rows instead of the full EPC dataframe, so widgets answer in milliseconds.
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from epc_data_analysis import get_yaml_config, Path, PROJECT_DIR, logger
+from epc_data_analysis.utils import caching
+
+# ---------------------------------------------------------------------------------
+
+# Load config file
+data_config = get_yaml_config(
+    Path(str(PROJECT_DIR) + "/epc_data_analysis/config/base.yaml")
+)
+
+# Get path
+AGGREGATE_CUBE_PATH = str(PROJECT_DIR) + data_config["AGGREGATE_CUBE_PATH"]
+
+CUBE_DIMENSIONS = [
+    "TENURE",
+    "WIMD Decile",
+    "WIMD Quartile",
+    "CURRENT_ENERGY_RATING",
+    "HEATING_SYSTEM",
+    "LOCAL_AUTHORITY",
+    "PROPERTY_TYPE",
+]
+
+CUBE_MEASURES = [
+    "CO2_EMISSIONS_CURRENT",
+    "CO2_EMISS_CURR_PER_FLOOR_AREA",
+    "TOTAL_FLOOR_AREA",
+    "CURR_ENERGY_RATING_NUM",
+    "DIFF_POT_ENERGY_RATING",
+]
+
+# Number of dwellings per cell
+COUNT = "N_DWELLINGS"
+
+# Statistics stored for every measure
+MEASURE_STATS = ["COUNT", "SUM", "SUMSQ"]
+
+
+class AggregateCube:
+    """Counts, sums and sums of squares by every combination of dimensions.
+
+    Parameters
+    ----------
+    cells : pandas.DataFrame
+        One row per observed combination of dimensions, with N_DWELLINGS and
+        <MEASURE>_COUNT, <MEASURE>_SUM and <MEASURE>_SUMSQ for every measure.
+
+    dimensions : list
+        Dimension columns.
+
+    measures : list
+        Numeric measures."""
+
+    def __init__(self, cells, dimensions, measures):
+
+        self.cells = cells
+        self.dimensions = list(dimensions)
+        self.measures = list(measures)
+
+    def __len__(self):
+
+        return len(self.cells)
+
+    def select(self, filters=None):
+        """Get cells matching the given dimension values (slice).
+
+        Parameters
+        ----------
+        filters : dict, default=None
+            Dimension value (or list of values) to keep for every given dimension,
+            e.g. {"TENURE": "rental (social)"}. If None, keep all cells.
+
+        Return
+        ---------
+        cells : pandas.DataFrame
+            Matching cells."""
+
+        if not filters:
+            return self.cells
+
+        keep = np.ones(len(self.cells), dtype=bool)
+
+        for dimension, values in filters.items():
+
+            if dimension not in self.dimensions:
+                raise IOError(
+                    "Dimension '{}' is not part of the cube.".format(dimension)
+                )
+
+            values = values if isinstance(values, (list, tuple, set)) else [values]
+            keep &= self.cells[dimension].isin(values).to_numpy()
+
+        return self.cells.loc[keep]
+
+    def query(self, by=None, filters=None, measures=None, dropna=False):
+        """Roll up cube to given dimensions, optionally after slicing.
+
+        Parameters
+        ----------
+        by : str, list, default=None
+            Dimension(s) to keep. If None, roll up to a single total.
+
+        filters : dict, default=None
+            Dimension values to keep before rolling up, see select().
+
+        measures : list, default=None
+            Measures for which to compute statistics. If None, use all measures.
+
+        dropna : bool, default=False
+            Whether to drop groups with missing dimension values.
+
+        Return
+        ---------
+        result : pandas.DataFrame
+            N_DWELLINGS, SHARE (in %) and <MEASURE>_SUM, <MEASURE>_MEAN and
+            <MEASURE>_STD for every measure, indexed by the given dimensions."""
+
+        by = [] if by is None else [by] if isinstance(by, str) else list(by)
+        measures = self.measures if measures is None else measures
+
+        for dimension in by:
+            if dimension not in self.dimensions:
+                raise IOError(
+                    "Dimension '{}' is not part of the cube.".format(dimension)
+                )
+
+        cells = self.select(filters)
+        stat_columns = [COUNT] + [
+            "{}_{}".format(measure, stat)
+            for measure in measures
+            for stat in MEASURE_STATS
+        ]
+
+        # Sum up cells (counts, sums and sums of squares are additive)
+        if by:
+            totals = cells.groupby(by, observed=True, dropna=dropna, sort=True)[
+                stat_columns
+            ].sum()
+        else:
+            totals = cells[stat_columns].sum().to_frame("total").T
+
+        result = pd.DataFrame(index=totals.index)
+        result[COUNT] = totals[COUNT]
+        result["SHARE"] = totals[COUNT] / cells[COUNT].sum() * 100
+
+        for measure in measures:
+
+            n = totals[measure + "_COUNT"]
+            total = totals[measure + "_SUM"]
+            sumsq = totals[measure + "_SUMSQ"]
+
+            # Sample variance from sums, clipped against rounding errors
+            variance = ((sumsq - total**2 / n) / (n - 1)).clip(lower=0)
+
+            result[measure + "_SUM"] = total
+            result[measure + "_MEAN"] = total / n
+            result[measure + "_STD"] = np.sqrt(variance.where(n > 1))
+
+        return result
+
+    def value_counts(self, dimension, filters=None, normalize=False):
+        """Get number of dwellings per dimension value, like pandas.value_counts().
+
+        Parameters
+        ----------
+        dimension : str
+            Dimension to count.
+
+        filters : dict, default=None
+            Dimension values to keep before counting, see select().
+
+        normalize : bool, default=False
+            Whether to return shares (0-1) instead of counts.
+
+        Return
+        ---------
+        counts : pandas.Series
+            Counts or shares per dimension value, sorted by frequency."""
+
+        counts = self.query(by=dimension, filters=filters, measures=[], dropna=True)[
+            COUNT
+        ].sort_values(ascending=False, kind="mergesort")
+
+        if normalize:
+            counts = counts / counts.sum()
+
+        return counts
+
+    def crosstab(self, dimension_1, dimension_2, filters=None):
+        """Get number of dwellings for every combination of two dimensions.
+
+        Parameters
+        ----------
+        dimension_1 : str
+            Dimension for rows.
+
+        dimension_2 : str
+            Dimension for columns.
+
+        filters : dict, default=None
+            Dimension values to keep before counting, see select().
+
+        Return
+        ---------
+        counts : pandas.DataFrame
+            Number of dwellings, with dimension_1 values as index
+            and dimension_2 values as columns."""
+
+        counts = self.query(
+            by=[dimension_1, dimension_2], filters=filters, measures=[], dropna=True
+        )[COUNT]
+
+        return counts.unstack(fill_value=0)
+
+
+def build_cube(df, dimensions=None, measures=None):
+    """Aggregate EPC dataframe into cube.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        EPC dataframe, e.g. with WIMD and heating features.
+
+    dimensions : list, default=None
+        Dimension columns. If None, use all CUBE_DIMENSIONS found in df.
+
+    measures : list, default=None
+        Numeric measures. If None, use all CUBE_MEASURES found in df.
+
+    Return
+    ---------
+    cube : AggregateCube
+        Aggregate cube."""
+
+    dimensions = (
+        [dim for dim in CUBE_DIMENSIONS if dim in df.columns]
+        if dimensions is None
+        else list(dimensions)
+    )
+    measures = (
+        [measure for measure in CUBE_MEASURES if measure in df.columns]
+        if measures is None
+        else list(measures)
+    )
+
+    if not dimensions:
+        raise IOError("No cube dimensions found in dataframe.")
+
+    # Count, sum and sum of squares for every measure
+    aggregation_df = pd.DataFrame({COUNT: np.ones(len(df), dtype=np.int64)})
+
+    for measure in measures:
+        values = pd.to_numeric(df[measure], errors="coerce").to_numpy(
+            dtype=np.float64, na_value=np.nan
+        )
+        is_valid = ~np.isnan(values)
+        values = np.where(is_valid, values, 0.0)
+
+        aggregation_df[measure + "_COUNT"] = is_valid.astype(np.int64)
+        aggregation_df[measure + "_SUM"] = values
+        aggregation_df[measure + "_SUMSQ"] = values**2
+
+    # Categorical keys make the groupby work on integer codes
+    for dimension in dimensions:
+        aggregation_df[dimension] = df[dimension].astype("category").to_numpy()
+
+    cells = (
+        aggregation_df.groupby(dimensions, observed=True, dropna=False, sort=True)
+        .sum()
+        .reset_index()
+    )
+
+    for dimension in dimensions:
+        cells[dimension] = cells[dimension].astype("category")
+
+    logger.info(
+        "Built aggregate cube with {} cells from {} rows".format(len(cells), len(df))
+    )
+
+    return AggregateCube(cells, dimensions, measures)
+
+
+def get_cube_path(name):
+    """Get path to stored cube with given name."""
+
+    return os.path.join(AGGREGATE_CUBE_PATH, name + ".parquet")
+
+
+def get_cube_signature(df, dimensions, measures):
+    """Get signature of cube, identifying the data and settings it is built from.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        EPC dataframe.
+
+    dimensions : list
+        Dimension columns.
+
+    measures : list
+        Numeric measures.
+
+    Return
+    ---------
+    signature : dict
+        Dimensions, measures, number of rows and hash of the used columns."""
+
+    data_hash = pd.util.hash_pandas_object(df[dimensions + measures], index=False)
+
+    return {
+        "dimensions": dimensions,
+        "measures": measures,
+        "n_rows": len(df),
+        "data_hash": int(data_hash.sum()),
+    }
+
+
+def save_cube(cube, name, signature=None):
+    """Store cube as Parquet file in AGGREGATE_CUBE_PATH.
+
+    Parameters
+    ----------
+    cube : AggregateCube
+        Cube to store.
+
+    name : str
+        Name of cube, e.g. "wales".
+
+    signature : dict, default=None
+        Signature of data cube was built from, see get_cube_signature().
+
+    Return
+    ---------
+    None"""
+
+    signature = {} if signature is None else dict(signature)
+    signature["dimensions"] = cube.dimensions
+    signature["measures"] = cube.measures
+
+    caching.write_cache(cube.cells, get_cube_path(name), signature)
+
+
+def load_cube(name):
+    """Load stored cube.
+
+    Parameters
+    ----------
+    name : str
+        Name of cube, e.g. "wales".
+
+    Return
+    ---------
+    cube : AggregateCube
+        Aggregate cube."""
+
+    cube_path = get_cube_path(name)
+    metadata = caching.read_cache_metadata(cube_path)
+
+    if metadata is None:
+        raise IOError("Aggregate cube '{}' not found.".format(cube_path))
+
+    signature = metadata["signature"]
+    cells = caching.read_cache(cube_path, dictionary_columns=signature["dimensions"])
+
+    return AggregateCube(cells, signature["dimensions"], signature["measures"])
+
+
+def get_cube(df, name, dimensions=None, measures=None, rebuild=False):
+    """Get cube for EPC dataframe, loading it from disk if built from the same data.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        EPC dataframe.
+
+    name : str
+        Name under which to store cube, e.g. "wales".
+
+    dimensions : list, default=None
+        Dimension columns. If None, use all CUBE_DIMENSIONS found in df.
+
+    measures : list, default=None
+        Numeric measures. If None, use all CUBE_MEASURES found in df.
+
+    rebuild : bool, default=False
+        Whether to rebuild cube even if a stored one is valid.
+
+    Return
+    ---------
+    cube : AggregateCube
+        Aggregate cube."""
+
+    dimensions = (
+        [dim for dim in CUBE_DIMENSIONS if dim in df.columns]
+        if dimensions is None
+        else list(dimensions)
+    )
+    measures = (
+        [measure for measure in CUBE_MEASURES if measure in df.columns]
+        if measures is None
+        else list(measures)
+    )
+
+    signature = get_cube_signature(df, dimensions, measures)
+
+    if not rebuild and caching.is_cache_valid(get_cube_path(name), signature):
+        return load_cube(name)
+
+    cube = build_cube(df, dimensions=dimensions, measures=measures)
+    save_cube(cube, name, signature=signature)
+
+    return cube
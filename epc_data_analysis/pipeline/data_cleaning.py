@@ -3,13 +3,34 @@
 
 Created August 2021
 @author: Julia Suter
-Last updated on 05/08/2021
+Last updated on 17/10/2026
 """
 
+# ---------------------------------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+
+from epc_data_analysis import logger
+
+# ---------------------------------------------------------------------------------
+
+# UK postcode without space: area, district, sector digit and unit
+POSTCODE_PATTERN = r"([A-Z]{1,2})([0-9][0-9A-Z]?)([0-9])([A-Z]{2})"
+
+POSTCODE_FEATURES = [
+    "POSTCODE",
+    "POSTCODE_AREA",
+    "POSTCODE_DISTRICT",
+    "POSTCODE_SECTOR",
+]
+
 
 def reformat_postcode(df):
     """Change the POSTCODE feature in uniform format (without spaces).
 
+    The given dataframe is not changed.
+
     Parameters
     ----------
     df : pandas.Dataframe
@@ -20,6 +41,90 @@ def reformat_postcode(df):
     df : pandas.Dataframe
         Dataframe with reformatted POSTCODE."""
 
-    df["POSTCODE"] = df["POSTCODE"].str.replace(r" ", "")
+    return df.assign(POSTCODE=df["POSTCODE"].str.replace(r" ", ""))
+
+
+def get_postcode_features(raw_postcodes):
+    """Normalise and validate raw postcodes and derive area, district and sector.
+
+    Parameters
+    ----------
+    raw_postcodes : pandas.Index
+        Unique raw postcodes, e.g. 'cf10 1aa'.
+
+    Return
+    ----------
+    postcode_features : pandas.DataFrame
+        POSTCODE (upper case, without space), POSTCODE_AREA (e.g. 'CF'),
+        POSTCODE_DISTRICT (e.g. 'CF10') and POSTCODE_SECTOR (e.g. 'CF10 1')
+        for every raw postcode, indexed by raw postcode. NaN for invalid postcodes."""
+
+    normalised = (
+        pd.Series(raw_postcodes, dtype=object)
+        .str.upper()
+        .str.replace(r"\s+", "", regex=True)
+    )
+    parts = normalised.str.extract("^" + POSTCODE_PATTERN + "$")
+
+    postcode_features = pd.DataFrame(
+        {
+            "POSTCODE": normalised.where(parts[0].notna()),
+            "POSTCODE_AREA": parts[0],
+            "POSTCODE_DISTRICT": parts[0] + parts[1],
+            "POSTCODE_SECTOR": parts[0] + parts[1] + " " + parts[2],
+        }
+    )
+    postcode_features.index = raw_postcodes
+
+    return postcode_features
+
+
+def normalise_postcodes(postcodes):
+    """Normalise and validate postcodes and derive area, district and sector codes.
+
+    Every distinct raw postcode is processed only once per call and the results
+    are mapped back to all rows by their codes. Postcodes are upper-cased, whitespace is removed and the result is
+    validated against the UK postcode format. All outputs are categoricals,
+    so joins and groupbys on them work on integer codes.
+
+    Parameters
+    ----------
+    postcodes : pandas.Series
+        Raw postcodes, e.g. epc_df["POSTCODE"].
+
+    Return
+    ----------
+    postcode_features : pandas.DataFrame
+        POSTCODE (upper case, without space), POSTCODE_AREA (e.g. 'CF'),
+        POSTCODE_DISTRICT (e.g. 'CF10') and POSTCODE_SECTOR (e.g. 'CF10 1')
+        as categoricals, with the index of postcodes.
+        Missing and invalid postcodes are NaN."""
+
+    if isinstance(postcodes.dtype, pd.CategoricalDtype):
+        codes = postcodes.cat.codes.to_numpy()
+        uniques = pd.Index(postcodes.cat.categories, dtype=object)
+    else:
+        codes, uniques = pd.factorize(postcodes.to_numpy(dtype=object))
+        uniques = pd.Index(uniques, dtype=object)
+
+    unique_features = get_postcode_features(uniques)
+
+    # Missing postcodes (code -1) are not counted as invalid
+    is_invalid = np.append(unique_features["POSTCODE"].isna().to_numpy(), False)
+    n_invalid = is_invalid[codes].sum()
+    if n_invalid > 0:
+        logger.info("{} postcodes are invalid and set to NaN".format(n_invalid))
+
+    postcode_features = pd.DataFrame(index=postcodes.index)
+
+    for feature in POSTCODE_FEATURES:
+
+        # Categorise unique values, then map every row by its unique code
+        feature_codes, categories = pd.factorize(unique_features[feature], sort=True)
+        feature_codes = np.append(feature_codes, -1)
+
+        postcode_features[feature] = pd.Categorical.from_codes(
+            feature_codes[codes], categories=categories
+        )
 
-    return df
+    return postcode_features
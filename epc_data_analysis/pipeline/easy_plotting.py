@@ -3,7 +3,7 @@
 
 Created May 2021
 @author: Julia Suter
-Last updated on 13/07/2021
+Last updated on 17/10/2026
 """
 
 # ---------------------------------------------------------------------------------
@@ -153,6 +153,7 @@ def plot_subcategory_distribution(
     y_label="",
     x_label="",
     y_ticklabel_type=None,
+    category_counts=None,
 ):
     """Plot distribution of subcategories/values of specific category/feature.
 
@@ -181,21 +182,23 @@ def plot_subcategory_distribution(
         Label for yticklabel, e.g. 'k' when displaying numbers
         in more compact way for easier readability (50000 --> 50k).
 
+    category_counts : pd.Series, default=None
+        Precomputed counts for every subcategory, e.g. from
+        accumulators.HistogramAccumulator. If given, df is not used and can be None.
+
     Return
     ---------
     None"""
 
+    # Get counts for every category
+    if category_counts is None:
+        category_counts = df[category].value_counts()
+
     # Get relative numbers (percentage) instead of absolute numbers
     if normalize:
-
-        # Get counts for every category
-        category_counts = round(df[category].value_counts(normalize=True) * 100, 2)
+        category_counts = round(category_counts / category_counts.sum() * 100, 2)
         y_ticklabel_type = "%"
 
-    else:
-        # Get counts for every category
-        category_counts = df[category].value_counts()
-
     # Plot category counts
     category_counts.plot(kind="bar", color=color)
 
@@ -0,0 +1,340 @@
+# File: pipeline/enrichment.py
+"""Enrich EPC data with location and WIMD data in a single pass.
+
+The EPC postcodes are normalised once into a postcode dictionary
+(the categories of the normalised postcodes). Every lookup table is matched
+against this dictionary only, and its columns are gathered into the EPC dataframe
+by position. No merged copy of the EPC dataframe is created.
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from epc_data_analysis import logger
+from epc_data_analysis.getters import postcode_index, util_data
+from epc_data_analysis.pipeline import data_cleaning, spatial_join
+
+# ---------------------------------------------------------------------------------
+
+
+def get_postcode_dictionary(postcodes):
+    """Normalise postcodes into a postcode dictionary and codes.
+
+    Parameters
+    ----------
+    postcodes : pandas.Series
+        Raw postcodes, e.g. epc_df["POSTCODE"].
+
+    Return
+    ---------
+    dictionary : pandas.Index
+        Unique normalised postcodes (upper case, without space).
+
+    codes : numpy.ndarray
+        Position of every postcode in dictionary. -1 for missing or invalid postcodes.
+    """
+
+    normalised = data_cleaning.normalise_postcodes(postcodes)["POSTCODE"]
+
+    return normalised.cat.categories, normalised.cat.codes.to_numpy()
+
+
+def gather(values, dictionary_positions, codes):
+    """Gather values for every row via the postcode dictionary.
+
+    Parameters
+    ----------
+    values : numpy.ndarray, pandas.api.extensions.ExtensionArray
+        Column of lookup table.
+
+    dictionary_positions : numpy.ndarray
+        Row in lookup table for every dictionary entry. -1 if not in lookup table.
+
+    codes : numpy.ndarray
+        Dictionary code for every row. -1 for missing postcodes.
+
+    Return
+    ---------
+    gathered : numpy.ndarray, pandas.api.extensions.ExtensionArray
+        Value for every row, NaN where there is no match."""
+
+    # Code -1 (missing) points to the last entry
+    positions = np.append(dictionary_positions, -1)[codes]
+
+    return take_rows(values, positions)
+
+
+def take_rows(values, positions):
+    """Take values by position, with missing values for position -1.
+
+    Integer columns keep their dtype if every position is valid. Otherwise they
+    become nullable integers (e.g. Int64) rather than float, as pandas.merge() would.
+
+    Parameters
+    ----------
+    values : numpy.ndarray, pandas.api.extensions.ExtensionArray
+        Column of lookup table.
+
+    positions : numpy.ndarray
+        Row in lookup table for every row. -1 for rows without match.
+
+    Return
+    ---------
+    taken : numpy.ndarray, pandas.api.extensions.ExtensionArray
+        Value for every row, missing where there is no match."""
+
+    if (positions >= 0).all():
+        return pd.api.extensions.take(values, positions)
+
+    # Numpy integers as nullable integers, e.g. int64 as Int64
+    dtype = pd.Series(values, copy=False).dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in "iu":
+        values = pd.array(np.asarray(values), dtype=dtype.name.capitalize())
+
+    return pd.api.extensions.take(values, positions, allow_fill=True)
+
+
+def restore_integer_dtypes(df, columns):
+    """Turn nullable integer columns without missing values back into numpy integers.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Dataframe, changed in place.
+
+    columns : list
+        Columns to check.
+
+    Return
+    ---------
+    None"""
+
+    for column in columns:
+        dtype = df[column].dtype
+        if (
+            pd.api.types.is_extension_array_dtype(dtype)
+            and pd.api.types.is_integer_dtype(dtype)
+            and not df[column].hasnans
+        ):
+            df[column] = df[column].to_numpy(dtype=dtype.numpy_dtype)
+
+
+def add_location_features(epc_df, dictionary, codes):
+    """Add LATITUDE and LONGITUDE (float32) from the postcode index, in place.
+
+    Parameters
+    ----------
+    epc_df : pandas.DataFrame
+        EPC dataframe.
+
+    dictionary : pandas.Index
+        Postcode dictionary, see get_postcode_dictionary().
+
+    codes : numpy.ndarray
+        Dictionary code for every row of epc_df.
+
+    Return
+    ---------
+    is_matched : numpy.ndarray
+        True for every row with location data."""
+
+    location_index = postcode_index.load_postcode_index()
+    dictionary_positions = location_index.get_positions(dictionary.to_numpy())
+
+    epc_df["LATITUDE"] = gather(
+        np.asarray(location_index.latitudes), dictionary_positions, codes
+    )
+    epc_df["LONGITUDE"] = gather(
+        np.asarray(location_index.longitudes), dictionary_positions, codes
+    )
+
+    return np.append(dictionary_positions, -1)[codes] != -1
+
+
+def add_wimd_features(epc_df, dictionary, codes):
+    """Add WIMD features, in place.
+
+    Columns already in the EPC dataframe (e.g. LATITUDE and LONGITUDE
+    from the location data) are not added again.
+
+    Parameters
+    ----------
+    epc_df : pandas.DataFrame
+        EPC dataframe.
+
+    dictionary : pandas.Index
+        Postcode dictionary, see get_postcode_dictionary().
+
+    codes : numpy.ndarray
+        Dictionary code for every row of epc_df.
+
+    Return
+    ---------
+    is_matched : numpy.ndarray
+        True for every row with WIMD data."""
+
+    wimd_df = util_data.get_WIMD_data()
+
+    # Normalise WIMD postcodes and keep first entry per postcode
+    wimd_postcodes = data_cleaning.normalise_postcodes(wimd_df["POSTCODE"])["POSTCODE"]
+    wimd_keys = pd.Index(wimd_postcodes.astype(object))
+    is_first = ~wimd_keys.duplicated() & wimd_postcodes.notna().to_numpy()
+    wimd_df = wimd_df[is_first]
+
+    dictionary_positions = pd.Index(wimd_keys[is_first]).get_indexer(dictionary)
+
+    for column in wimd_df.columns:
+        if column == "POSTCODE" or column in epc_df.columns:
+            continue
+
+        epc_df[column] = gather(wimd_df[column].array, dictionary_positions, codes)
+
+    return np.append(dictionary_positions, -1)[codes] != -1
+
+
+def add_nearest_wimd_features(epc_df, dictionary, codes, max_distance=1.0):
+    """Add features of nearest WIMD record by spatial join, in place.
+
+    Parameters
+    ----------
+    epc_df : pandas.DataFrame
+        EPC dataframe with LATITUDE and LONGITUDE.
+
+    dictionary : pandas.Index
+        Postcode dictionary (not used, the join is by coordinates).
+
+    codes : numpy.ndarray
+        Dictionary code for every row of epc_df (not used).
+
+    max_distance : float, default=1.0
+        Maximum distance in km to nearest WIMD record.
+
+    Return
+    ---------
+    is_matched : numpy.ndarray
+        True for every row with a WIMD record within max_distance."""
+
+    if not {"LATITUDE", "LONGITUDE"}.issubset(epc_df.columns):
+        raise IOError(
+            "Spatial WIMD join requires LATITUDE and LONGITUDE. Use with_location=True."
+        )
+
+    return spatial_join.add_nearest_wimd_features(epc_df, max_distance=max_distance)
+
+
+def enrich(
+    epc_df,
+    with_location=True,
+    with_wimd=True,
+    how="left",
+    wimd_join="postcode",
+    max_distance=1.0,
+    return_match_rates=False,
+):
+    """Add location and WIMD features to EPC dataframe in a single pass.
+
+    The EPC postcodes are normalised once and every lookup table is matched against
+    the resulting postcode dictionary. Columns are added in place,
+    so peak memory stays near the size of the EPC dataframe plus the new columns.
+    The POSTCODE column itself is not changed.
+
+    Parameters
+    ----------
+    epc_df : pandas.DataFrame
+        EPC dataframe with POSTCODE. Columns are added in place.
+
+    with_location : bool, default=True
+        Add LATITUDE and LONGITUDE from the location data.
+
+    with_wimd : bool, default=True
+        Add Wales Index of Multiple Deprivation (WIMD) features.
+
+    how : {'left', 'inner'}, default='left'
+        'left' keeps all rows, with NaN for rows without match
+        (integer columns become nullable integers, e.g. Int64).
+        'inner' only keeps rows matched in every lookup table, like pandas.merge().
+
+    wimd_join : {'postcode', 'spatial'}, default='postcode'
+        'postcode' matches WIMD records by postcode.
+        'spatial' assigns every geocoded certificate its nearest WIMD record
+        (KD-tree query), so certificates with postcodes missing from the WIMD data
+        are matched as well. Requires LATITUDE and LONGITUDE.
+
+    max_distance : float, default=1.0
+        Maximum distance in km to nearest WIMD record for spatial join.
+
+    return_match_rates : bool, default=False
+        Also return match rate per lookup table.
+
+    Return
+    ---------
+    epc_df : pandas.DataFrame
+        Enriched EPC dataframe. For how='inner', a filtered copy.
+
+    match_rates : dict
+        Share of EPC rows matched per lookup table ('location', 'WIMD').
+        Only returned if return_match_rates is True."""
+
+    if how not in ("left", "inner"):
+        raise IOError("'{}' is not a valid join. Use 'left' or 'inner'.".format(how))
+
+    if wimd_join not in ("postcode", "spatial"):
+        raise IOError(
+            "'{}' is not a valid WIMD join. Use 'postcode' or 'spatial'.".format(
+                wimd_join
+            )
+        )
+
+    dictionary, codes = get_postcode_dictionary(epc_df["POSTCODE"])
+    original_columns = set(epc_df.columns)
+
+    is_matched = np.ones(len(epc_df), dtype=bool)
+    match_rates = {}
+
+    lookup_tables = [
+        ("location", with_location, add_location_features),
+        (
+            "WIMD",
+            with_wimd,
+            (
+                add_wimd_features
+                if wimd_join == "postcode"
+                else partial(add_nearest_wimd_features, max_distance=max_distance)
+            ),
+        ),
+    ]
+
+    for table, add_table, add_features in lookup_tables:
+        if not add_table:
+            continue
+
+        is_table_matched = add_features(epc_df, dictionary, codes)
+        is_matched &= is_table_matched
+
+        match_rates[table] = (
+            float(is_table_matched.mean()) if len(epc_df) > 0 else np.nan
+        )
+        logger.info(
+            "Matched {:.1%} of EPC rows with {} data".format(match_rates[table], table)
+        )
+
+    if how == "inner" and not is_matched.all():
+        epc_df = epc_df[is_matched].copy()
+
+        # Unmatched rows are dropped, so integer columns need no missing values
+        restore_integer_dtypes(
+            epc_df, [col for col in epc_df.columns if col not in original_columns]
+        )
+
+    if return_match_rates:
+        return epc_df, match_rates
+
+    return epc_df
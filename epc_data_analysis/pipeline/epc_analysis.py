@@ -3,12 +3,15 @@
 
 Created May 2021
 @author: Julia Suter
-Last updated on 13/07/2021
+Last updated on 17/10/2026
 """
 
 # ---------------------------------------------------------------------------------
 
 # Imports
+import numpy as np
+import pandas as pd
+
 from epc_data_analysis import get_yaml_config, Path, PROJECT_DIR
 
 # ---------------------------------------------------------------------------------
@@ -19,6 +22,141 @@ epc_data_config = get_yaml_config(
 )
 FIG_PATH = str(PROJECT_DIR) + epc_data_config["FIGURE_PATH"]
 
+# Poisson(1) weight for every 16-bit random number (inverse of cumulative
+# distribution function), so weights are drawn with a lookup instead of
+# the much slower Generator.poisson()
+POISSON_CDF = np.cumsum(np.exp(-1) / np.cumprod(np.r_[1, np.arange(1, 20)]))
+POISSON_WEIGHTS = np.searchsorted(
+    POISSON_CDF, (np.arange(2**16) + 0.5) / 2**16, side="right"
+).astype(np.float64)
+
+
+def get_group_codes(series):
+    """Get integer group codes and sorted group values for feature.
+
+    Parameters
+    ----------
+    series : pandas.Series
+        Feature by which to group.
+
+    Return
+    ----------
+    codes : numpy.ndarray
+        Group code for every row, -1 for missing values.
+
+    groups : pandas.Index
+        Group value for every code. CategoricalIndex with all categories
+        for categorical features."""
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return (
+            series.cat.codes.to_numpy(),
+            pd.CategoricalIndex(series.cat.categories, dtype=series.dtype),
+        )
+
+    codes, groups = pd.factorize(series, sort=True)
+
+    return codes, pd.Index(groups)
+
+
+def get_group_stats(df, features, group_by):
+    """Get totals and per-group sums, means and counts for many features
+    and grouping features in a single scan.
+
+    Every grouping feature is turned into integer codes once and every
+    numeric feature into a float array once. The statistics are computed
+    with np.bincount over the codes instead of a groupby per pair.
+    As in pandas, missing values are skipped and missing group values
+    are not counted in any group. Categorical grouping features keep
+    all their categories, as groupby(observed=False).
+
+    Parameters
+    ----------
+
+    df : pandas.DataFrame
+        Dataframe from which to retrieve data.
+
+    features : list
+        Numeric features to aggregate, e.g. "CO2_EMISSIONS_CURRENT".
+
+    group_by : list
+        Features by which to group, e.g. "TENURE".
+
+    Return
+    ----------
+
+    totals : dict
+        Sum over all rows for every numeric feature.
+
+    group_stats : dict
+        Dataframe for every (feature, grouping feature) pair with
+        SUM, SHARE (in % of total), MEAN, COUNT (non-missing values)
+        and SIZE (rows) for every observed group, or every category
+        (with zero sums and counts if unobserved)."""
+
+    # Get values and missing values for every numeric feature
+    values = {}
+    is_valid = {}
+
+    for feature in features:
+        feature_values = df[feature].to_numpy(dtype=np.float64, na_value=np.nan)
+        is_valid[feature] = ~np.isnan(feature_values)
+        values[feature] = np.where(is_valid[feature], feature_values, 0.0)
+
+    # Keep integer sums as integers, as pandas does
+    is_integer = {
+        feature: pd.api.types.is_integer_dtype(df[feature].dtype)
+        for feature in features
+    }
+    totals = {
+        feature: (
+            np.int64(values[feature].sum())
+            if is_integer[feature]
+            else values[feature].sum()
+        )
+        for feature in features
+    }
+    group_stats = {}
+
+    for group_feature in group_by:
+
+        codes, groups = get_group_codes(df[group_feature])
+        n_groups = len(groups)
+
+        # Shift codes so missing group values (-1) fall into bin 0
+        bins = codes.astype(np.intp) + 1
+        sizes = np.bincount(bins, minlength=n_groups + 1)[1:]
+        observed = (sizes > 0) | isinstance(groups, pd.CategoricalIndex)
+
+        group_index = groups[observed]
+        group_index.name = group_feature
+
+        for feature in features:
+
+            sums = np.bincount(bins, weights=values[feature], minlength=n_groups + 1)
+            counts = np.bincount(
+                bins, weights=is_valid[feature], minlength=n_groups + 1
+            )
+            sums, counts = sums[1:][observed], counts[1:][observed]
+
+            with np.errstate(invalid="ignore", divide="ignore"):
+                means = np.where(counts > 0, sums / counts, np.nan)
+
+            group_stats[(feature, group_feature)] = pd.DataFrame(
+                {
+                    "SUM": (
+                        sums.round().astype(np.int64) if is_integer[feature] else sums
+                    ),
+                    "SHARE": sums / totals[feature] * 100,
+                    "MEAN": means,
+                    "COUNT": counts.astype(np.int64),
+                    "SIZE": sizes[observed],
+                },
+                index=group_index,
+            )
+
+    return totals, group_stats
+
 
 def get_emissions_info(df, feature_1, feature_2):
     """Get CO2 emissions data as absolute and relative numbers as well
@@ -45,17 +183,24 @@ def get_emissions_info(df, feature_1, feature_2):
     emissions_dict : dict
         Dictionary holding data on emissions (absolute, relative and mean)."""
 
+    # Aggregate all emission features in one scan
+    features = list(
+        dict.fromkeys(
+            ["CO2_EMISSIONS_CURRENT", "CO2_EMISS_CURR_PER_FLOOR_AREA", feature_1]
+        )
+    )
+    totals, group_stats = get_group_stats(df, features, [feature_2])
+    emissions = group_stats[(feature_1, feature_2)]
+
     # Total emissions
-    total_emissions = df["CO2_EMISSIONS_CURRENT"].sum()
-    total_emissions_by_area = df["CO2_EMISS_CURR_PER_FLOOR_AREA"].sum()
-    total = total_emissions = df[feature_1].sum()
+    total_emissions_by_area = totals["CO2_EMISS_CURR_PER_FLOOR_AREA"]
+    total = total_emissions = totals[feature_1]
 
     # Get absolute, relative and mean emissions
-    emissions = df.groupby(feature_2)[feature_1]
-    emissions_rel = emissions.sum() / total * 100
-    emissions_abs = emissions.sum()
-    emissions_mean = emissions.mean()
-    emissions_by_dwelling = emissions_abs / df[feature_2].value_counts()
+    emissions_rel = emissions["SUM"].rename(feature_1) / total * 100
+    emissions_abs = emissions["SUM"].rename(feature_1)
+    emissions_mean = emissions["MEAN"].rename(feature_1)
+    emissions_by_dwelling = (emissions["SUM"] / emissions["SIZE"]).rename(None)
 
     # Set up emissions dictionary
     emissions_dict = {
@@ -69,3 +214,211 @@ def get_emissions_info(df, feature_1, feature_2):
     }
 
     return emissions_dict
+
+
+def get_bootstrap_resample_stats(
+    group_codes, values, n_groups, n_resamples, rng, method="auto", max_batch_size=2**24
+):
+    """Get group counts and sums for every bootstrap resample.
+
+    Resamples are computed in batches, with two methods:
+
+    - "cells": rows are reduced to counts per (group, value) combination and
+      resamples are drawn as multinomial counts over these cells, which is
+      an exact bootstrap. Fast for features with few values,
+      e.g. CURR_ENERGY_RATING_NUM.
+    - "rows": every row gets a Poisson(1) weight per resample (Poisson bootstrap)
+      and the weights are reduced to group counts and sums with one
+      matrix product per batch. Used for continuous features with
+      (almost) as many values as rows.
+
+    Parameters
+    ----------
+
+    group_codes : numpy.ndarray
+        Group code for every row (0 to n_groups-1).
+
+    values : numpy.ndarray
+        Numeric value for every row.
+
+    n_groups : int
+        Number of groups.
+
+    n_resamples : int
+        Number of bootstrap resamples.
+
+    rng : numpy.random.Generator
+        Random number generator.
+
+    method : {"auto", "cells", "rows"}, default="auto"
+        Resampling method. If "auto", use "cells" if there are
+        at least 16 times fewer (group, value) combinations than rows.
+
+    max_batch_size : int, default=2**24
+        Maximum number of multinomial counts or weights held in memory at once.
+
+    Return
+    ----------
+
+    counts : numpy.ndarray
+        Number of rows per resample (rows) and group (columns).
+
+    sums : numpy.ndarray
+        Sum of values per resample (rows) and group (columns)."""
+
+    n_rows = len(values)
+
+    # Reduce rows to counts per (group, value) combination
+    value_codes, unique_values = pd.factorize(values)
+    cell_codes, cells = pd.factorize(
+        group_codes.astype(np.int64) * len(unique_values) + value_codes
+    )
+
+    # Drawing a multinomial count per cell takes about 16 times
+    # as long as drawing and applying a Poisson weight per row
+    if method == "auto":
+        method = "cells" if len(cells) * 16 <= n_rows else "rows"
+
+    if method == "cells":
+
+        cell_counts = np.bincount(cell_codes, minlength=len(cells))
+        cell_groups = cells // len(unique_values)
+        cell_values = unique_values[cells % len(unique_values)]
+
+        # Map cells to groups, with and without value weights
+        group_matrix = np.zeros((len(cells), n_groups))
+        group_matrix[np.arange(len(cells)), cell_groups] = 1.0
+        value_matrix = group_matrix * cell_values[:, np.newaxis]
+
+        counts, sums = [], []
+        batch_size = max(1, max_batch_size // len(cells))
+
+        for start in range(0, n_resamples, batch_size):
+            resampled_counts = rng.multinomial(
+                n_rows,
+                cell_counts / n_rows,
+                size=min(batch_size, n_resamples - start),
+            )
+            counts.append(resampled_counts @ group_matrix)
+            sums.append(resampled_counts @ value_matrix)
+
+        return np.concatenate(counts), np.concatenate(sums)
+
+    if method != "rows":
+        raise IOError("'{}' is not a valid bootstrap method.".format(method))
+
+    # Map rows to groups, with and without value weights
+    group_matrix = np.zeros((n_rows, 2 * n_groups))
+    group_matrix[np.arange(n_rows), group_codes] = 1.0
+    group_matrix[np.arange(n_rows), n_groups + group_codes] = values
+
+    counts, sums = [], []
+    batch_size = max(1, max_batch_size // n_rows)
+
+    for start in range(0, n_resamples, batch_size):
+        random_numbers = rng.integers(
+            0,
+            2**16,
+            size=(min(batch_size, n_resamples - start), n_rows),
+            dtype=np.uint16,
+        )
+        resampled_stats = POISSON_WEIGHTS[random_numbers] @ group_matrix
+        counts.append(resampled_stats[:, :n_groups])
+        sums.append(resampled_stats[:, n_groups:])
+
+    return np.concatenate(counts), np.concatenate(sums)
+
+
+def get_bootstrap_intervals(
+    df,
+    feature,
+    by,
+    n_resamples=1000,
+    confidence=0.95,
+    seed=None,
+    method="auto",
+):
+    """Get group means and shares with bootstrap confidence intervals.
+
+    All resamples are computed with vectorised NumPy operations,
+    see get_bootstrap_resample_stats(). Rows with missing values
+    for feature or grouping feature are not used.
+
+    Parameters
+    ----------
+
+    df : pandas.DataFrame
+        Dataframe from which to retrieve data.
+
+    feature : str
+        Numeric feature, e.g. "CURR_ENERGY_RATING_NUM" or "CO2_EMISSIONS_CURRENT".
+
+    by : str
+        Feature by which to group, e.g. "TENURE" or "WIMD Quartile".
+
+    n_resamples : int, default=1000
+        Number of bootstrap resamples.
+
+    confidence : float, default=0.95
+        Confidence level of percentile intervals.
+
+    seed : int, default=None
+        Seed for random number generator.
+
+    method : {"auto", "cells", "rows"}, default="auto"
+        Resampling method, see get_bootstrap_resample_stats().
+
+    Return
+    ----------
+
+    intervals : pandas.DataFrame
+        COUNT, SHARE (% of dwellings) and MEAN with lower and upper
+        confidence bounds (e.g. MEAN_CI_LOWER, MEAN_CI_UPPER) for every group."""
+    values = df[feature].to_numpy(dtype=np.float64, na_value=np.nan)
+    group_codes, groups = get_group_codes(df[by])
+
+    # Only use rows with feature and group values
+    is_valid = ~np.isnan(values) & (group_codes >= 0)
+    values, group_codes = values[is_valid], group_codes[is_valid]
+
+    # Only keep observed groups
+    group_counts = np.bincount(group_codes, minlength=len(groups))
+    observed = group_counts > 0
+    group_codes = (np.cumsum(observed) - 1)[group_codes]
+    group_index = groups[observed]
+    group_index.name = by
+
+    n_rows = len(values)
+    n_groups = len(group_index)
+
+    rng = np.random.default_rng(seed)
+    counts, sums = get_bootstrap_resample_stats(
+        group_codes, values, n_groups, n_resamples, rng, method=method
+    )
+
+    # Statistics of original data and of every resample
+    count = np.bincount(group_codes, minlength=n_groups)
+    statistics = {
+        "SHARE": (
+            count / n_rows * 100,
+            counts / counts.sum(axis=1, keepdims=True) * 100,
+        ),
+        "MEAN": (
+            np.bincount(group_codes, weights=values, minlength=n_groups) / count,
+            np.where(counts > 0, sums / np.maximum(counts, 1), np.nan),
+        ),
+    }
+
+    # Percentile intervals
+    percentiles = [(1 - confidence) / 2 * 100, (1 + confidence) / 2 * 100]
+
+    intervals = pd.DataFrame({"COUNT": count}, index=group_index)
+
+    for statistic, (estimate, resampled) in statistics.items():
+        lower, upper = np.nanpercentile(resampled, percentiles, axis=0)
+
+        intervals[statistic] = estimate
+        intervals[statistic + "_CI_LOWER"] = lower
+        intervals[statistic + "_CI_UPPER"] = upper
+
+    return intervals
@@ -3,18 +3,187 @@
 
 Created May 2021
 @author: Julia Suter
-Last updated on 13/07/2021
+Last updated on 17/10/2026
 """
 
 # ---------------------------------------------------------------------------------
 
 # Import
+import contextlib
+import json
+import os
+import tempfile
+
+import numpy as np
 import pandas as pd
 
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows, cache is not locked
+    fcntl = None
+
+from epc_data_analysis import get_yaml_config, Path, PROJECT_DIR
+
 # ---------------------------------------------------------------------------------
 
+# Load config file
+epc_data_config = get_yaml_config(
+    Path(str(PROJECT_DIR) + "/epc_data_analysis/config/base.yaml")
+)
+
+# Get path
+HEATING_CLASSES_PATH = str(PROJECT_DIR) + epc_data_config["HEATING_CLASSES_PATH"]
+
+# EPC rating as number
+RATING_SCALE = {
+    "A": 7,
+    "B": 6,
+    "C": 5,
+    "D": 4,
+    "E": 3,
+    "F": 2,
+    "G": 1,
+    "H": 0,
+    "INVALID!": 0,
+}
+
+# Quality (efficiency) as number
+QUALITY_SCALE = {
+    "Very Good": 5,
+    "Good": 4,
+    "Average": 3,
+    "Poor": 2,
+    "Very Poor": 1,
+}
+
+# Increase when classify_heating() changes, invalidates persistent cache
+HEATING_CLASSIFIER_VERSION = 1
+
+# Set heating system dict
+HEATING_SYSTEM_DICT = {
+    "boiler and radiator": "boiler and radiator",
+    "boiler & radiator": "boiler and radiator",
+    "boiler and underfloor": "boiler and underfloor",
+    "boiler & underfloor": "boiler and underfloor",
+    "community scheme": "community scheme",
+    "heater": "heater",  # not specified heater (otherwise handeld above)
+}
+
+# Set heating source dict
+HEATING_SOURCE_DICT = {
+    "gas": "gas",
+    ", oil": "oil",  # with preceeding comma (!= "boiler")
+    "lpg": "LPG",
+    "electric": "electric",
+}
+
+# Heating classes per description, loaded from persistent cache on first use
+_heating_classes = None
+
+
+def get_ordinal_values(series, scale):
+    """Get ordinal values for feature with a code lookup table.
+
+    The lookup table is built over the categories (or unique values) only,
+    so every row costs a single array lookup.
+
+    Parameters
+    ----------
+    series : pandas.Series
+        Feature to encode, object or categorical.
+
+    scale : dict
+        Ordinal value (int8) for every valid feature value.
+
+    Return
+    ---------
+    values : numpy.ndarray
+        Ordinal value for every row (int8).
+
+    is_missing : numpy.ndarray
+        True for rows with missing value or value not in scale."""
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        categories = series.cat.categories
+    else:
+        codes, categories = pd.factorize(series)
+
+    # Code -1 (missing) points to the last entry
+    value_lut = np.array(
+        [scale.get(category, 0) for category in categories] + [0], dtype=np.int8
+    )
+    missing_lut = np.array(
+        [category not in scale for category in categories] + [True], dtype=bool
+    )
+
+    return value_lut[codes], missing_lut[codes]
+
+
+def to_ordinal_array(values, is_missing):
+    """Get nullable Int8 array for ordinal values, with <NA> for missing values.
+
+    Missing values are masked rather than encoded as NaN or a sentinel, so
+    the values stay integers and means, counts etc. skip missing values.
+    Use .to_numpy(dtype=float, na_value=np.nan) for a float array with NaN.
+    The dtype does not depend on whether values are missing, so every chunk
+    of a dataset gets the same dtype.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Ordinal values (int8).
+
+    is_missing : numpy.ndarray
+        True for rows with missing value.
+
+    Return
+    ---------
+    ordinal_array : pandas.arrays.IntegerArray
+        Ordinal values (Int8), <NA> for missing values."""
+
+    return pd.arrays.IntegerArray(values.astype(np.int8), is_missing.copy())
+
+
+def encode_ordinal(df, list_of_features, scale, suffix="_AS_NUM", inplace=True):
+    """Encode several features with the same ordinal scale in one call.
+
+    For every feature, a new feature with given suffix holds the ordinal values
+    as nullable Int8, with <NA> for values that are missing or not in scale.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Dataframe with features to encode.
+
+    list_of_features : list
+        Features to encode.
+
+    scale : dict
+        Ordinal value for every valid feature value, e.g. QUALITY_SCALE.
+
+    suffix : str, default="_AS_NUM"
+        Suffix for new features.
+
+    inplace : bool, default=True
+        Add new features to df. If False, df is not changed.
+
+    Return
+    ---------
+    df : pandas.DataFrame
+        Dataframe with encoded features."""
+
+    if not inplace:
+        df = df.copy(deep=False)
+
+    for feature in list_of_features:
+        df[feature + suffix] = to_ordinal_array(*get_ordinal_values(df[feature], scale))
+
+    return df
+
 
-def get_new_EPC_rating_features(df):
+def get_new_EPC_rating_features(df, inplace=True, drop_invalid=True):
     """Get new EPC rating features related to EPC ratings.
 
         CURR_ENERGY_RATING_NUM: EPC rating representeed as number
@@ -32,24 +201,18 @@ def get_new_EPC_rating_features(df):
     df : pandas.Dataframe
         EPC dataframe.
 
+    inplace : bool, default=True
+        Add new features to df (if no samples are removed). If False, df is not changed.
+
+    drop_invalid : bool, default=True
+        Remove samples with negative or missing DIFF_POT_ENERGY_RATING.
+        If all samples are valid, df is not copied.
+
     Return
     ---------
     df : pandas.DateFrame
         Updated EPC dataframe with new EPC rating features."""
 
-    # EPC rating dict
-    rating_dict = {
-        "A": 7,
-        "B": 6,
-        "C": 5,
-        "D": 4,
-        "E": 3,
-        "F": 2,
-        "G": 1,
-        "H": 0,
-        "INVALID!": 0,
-    }
-
     EPC_cat_dict = {
         "A": "A-B",
         "B": "A-B",
@@ -61,169 +224,332 @@ def get_new_EPC_rating_features(df):
     }
 
     # EPC rating in number instead of letter
-    df["CURR_ENERGY_RATING_NUM"] = df.CURRENT_ENERGY_RATING.map(rating_dict)
-
-    # EPC rating in category (A-B, C-D or E-G)
-    df["ENERGY_RATING_CAT"] = df.CURRENT_ENERGY_RATING.map(EPC_cat_dict)
+    current_rating, current_missing = get_ordinal_values(
+        df.CURRENT_ENERGY_RATING, RATING_SCALE
+    )
+    potential_rating, potential_missing = get_ordinal_values(
+        df.POTENTIAL_ENERGY_RATING, RATING_SCALE
+    )
 
     # Numerical difference between current and potential energy rating (A-G)
-    df["DIFF_POT_ENERGY_RATING"] = (
-        df.POTENTIAL_ENERGY_RATING.map(rating_dict) - df["CURR_ENERGY_RATING_NUM"]
-    )
+    diff_rating = potential_rating - current_rating
+    diff_missing = current_missing | potential_missing
 
-    # Set DIFF_POT_ENERGY_RATING to 0.0
-    # if substraction yielded value below 0.0 due to input error (few cases).
-    df = df[df.DIFF_POT_ENERGY_RATING >= 0.0]
+    # Remove samples if substraction yielded value below 0.0
+    # due to input error (few cases) or rating is missing.
+    is_valid = ~diff_missing & (diff_rating >= 0)
 
-    return df
+    if drop_invalid and not is_valid.all():
+        valid_rows = np.flatnonzero(is_valid)
+        df = df.take(valid_rows)
 
+        current_rating = current_rating[valid_rows]
+        current_missing = current_missing[valid_rows]
+        diff_rating = diff_rating[valid_rows]
+        diff_missing = diff_missing[valid_rows]
 
-def map_quality_to_number(df, list_of_features):
+    elif not inplace:
+        df = df.copy(deep=False)
 
-    quality_to_num_dict = {
-        "Very Good": 5.0,
-        "Good": 4.0,
-        "Average": 3.0,
-        "Poor": 2.0,
-        "Very Poor": 1.0,
-    }
+    df["CURR_ENERGY_RATING_NUM"] = to_ordinal_array(current_rating, current_missing)
 
-    for feature in list_of_features:
-        df[feature + "_AS_NUM"] = df[feature].map(quality_to_num_dict)
+    # EPC rating in category (A-B, C-D or E-G)
+    df["ENERGY_RATING_CAT"] = df.CURRENT_ENERGY_RATING.map(EPC_cat_dict)
+
+    df["DIFF_POT_ENERGY_RATING"] = to_ordinal_array(diff_rating, diff_missing)
 
     return df
 
 
-def get_heating_features(df, fine_grained_HP_types=False):
-    """Get heating type category based on HEATING_TYPE category.
-    heating_system: heat pump, boiler, community scheme etc.
-    heating_source: oil, gas, LPC, electric.
+def map_quality_to_number(df, list_of_features):
+    """Map quality features (Very Good to Very Poor) to numbers (5 to 1).
+
+    For every feature, the new feature ..._AS_NUM is added in place,
+    see encode_ordinal().
 
     Parameters
     ----------
     df : pandas.DataFrame
-        Dataframe that is updated with heating features.
+        Dataframe with quality features, e.g. MAINHEAT_ENERGY_EFF.
 
-    fine_grained_HP_types : bool, default=False
-        If True, get different heat pump types (air sourced, ground sourced etc.).
-        If False, return "heat pump" as heating type category.
+    list_of_features : list
+        Quality features to map.
 
     Return
     ---------
     df : pandas.DataFrame
-        Updated dataframe with heating system and source."""
-
-    # Collections
-    heating_system_types = []
-    heating_source_types = []
-
-    # Get heating types
-    heating_types = df["MAINHEAT_DESCRIPTION"]
-
-    # Get specific and general heating category for each entry
-    for heating in heating_types:
+        Dataframe with numeric quality features."""
+
+    return encode_ordinal(df, list_of_features, QUALITY_SCALE)
+
+
+def classify_heating(heating):
+    """Get heating system and source for a single heating description.
+
+    Heat pump types are always fine-grained (air sourced, ground sourced etc.).
+
+    Parameters
+    ----------
+    heating : str
+        Heating description (MAINHEAT_DESCRIPTION).
+
+    Return
+    ---------
+    system_type : str
+        Heating system, e.g. "boiler and radiator" or "air source heat pump".
+
+    source_type : str
+        Heating source, e.g. "gas" or "electric"."""
+
+    # Set default value
+    system_type = "unknown"
+    source_type = "unknown"
+
+    # Lowercase
+    heating = heating.lower()
+
+    other_heating_system = [
+        ("boiler and radiator" in heating),
+        ("boiler & radiator" in heating),
+        ("boiler and underfloor" in heating),
+        ("boiler & underfloor" in heating),
+        ("community scheme" in heating),
+        ("heater" in heating),  # not specified heater
+    ]
+
+    # Different heat pump types
+    # --------------------------
+
+    if "ground source heat pump" in heating:
+        system_type = "ground source heat pump"
+        source_type = "electric"
+
+    elif "air source heat pump" in heating:
+        system_type = "air source heat pump"
+        source_type = "electric"
+
+    elif "water source heat pump" in heating:
+        system_type = "water source heat pump"
+        source_type = "electric"
+
+    elif "heat pump" in heating:
+        system_type = "heat pump"
+        source_type = "electric"
+
+    # Electric heaters
+    # --------------------------
+
+    elif "electric storage heaters" in heating:
+        system_type = "storage heater"
+        source_type = "electric"
+
+    elif "electric underfloor heating" in heating:
+        system_type = "underfloor heating"
+        source_type = "electric"
+
+    # Warm air
+    # --------------------------
+
+    elif "warm air" in heating:
+        system_type = "warm air"
+        source_type = "electric"
+
+    # Boiler and radiator / Boiler and underfloor / Community scheme / Heater (unspecified)
+    # --------------------------
+
+    elif any(other_heating_system):
+
+        # If heating system word is found, save respective system type
+        for word, system in HEATING_SYSTEM_DICT.items():
+            if word in heating:
+                system_type = system
+
+        # If heating source word is found, save respective source type
+        for word, source in HEATING_SOURCE_DICT.items():
+            if word in heating:
+                source_type = source
+
+    return system_type, source_type
+
+
+@contextlib.contextmanager
+def heating_classes_lock():
+    """Lock persistent cache of heating classes across processes.
+
+    Return
+    ---------
+    None"""
+
+    os.makedirs(os.path.dirname(HEATING_CLASSES_PATH), exist_ok=True)
+
+    with open(HEATING_CLASSES_PATH + ".lock", "a") as lock_file:
+
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def read_heating_classes():
+    """Read persistent cache of heating classes from disk.
+
+    Return
+    ---------
+    heating_classes : dict
+        Heating system and source (fine-grained) for every description.
+        Empty if there is no cache for the current HEATING_CLASSIFIER_VERSION."""
+
+    if not os.path.exists(HEATING_CLASSES_PATH):
+        return {}
+
+    with open(HEATING_CLASSES_PATH, "r") as f:
+        try:
+            heating_cache = json.load(f)
+        except ValueError:
+            return {}
 
-        # Set default value
-        system_type = "unknown"
-        source_type = "unknown"
+    if heating_cache.get("version") != HEATING_CLASSIFIER_VERSION:
+        return {}
 
-        # If heating value exists
-        if not (pd.isnull(heating) and isinstance(heating, float)):
+    return {
+        heating: tuple(classes) for heating, classes in heating_cache["classes"].items()
+    }
+
+
+def load_heating_classes():
+    """Load persistent cache of heating classes per description.
+
+    The cache is only used if it was created with the current
+    HEATING_CLASSIFIER_VERSION.
+
+    Return
+    ---------
+    heating_classes : dict
+        Heating system and source (fine-grained) for every description."""
+
+    global _heating_classes
+
+    if _heating_classes is None:
+        _heating_classes = read_heating_classes()
+
+    return _heating_classes
+
+
+def save_heating_classes(heating_classes):
+    """Add heating classes to persistent cache.
+
+    The cache on disk is read, merged and written under a lock, so classes
+    saved by other processes in the meantime are kept. The file is written
+    to a unique temporary file in the same directory first and then moved.
+
+    Parameters
+    ----------
+    heating_classes : dict
+        Heating system and source (fine-grained) for every description.
+        Updated with the classes found on disk.
+
+    Return
+    ---------
+    None"""
+
+    with heating_classes_lock():
 
-            # Lowercase
-            heating = heating.lower()
+        merged_classes = read_heating_classes()
+        merged_classes.update(heating_classes)
+        heating_classes.update(merged_classes)
 
-            other_heating_system = [
-                ("boiler and radiator" in heating),
-                ("boiler & radiator" in heating),
-                ("boiler and underfloor" in heating),
-                ("boiler & underfloor" in heating),
-                ("community scheme" in heating),
-                ("heater" in heating),  # not specified heater
-            ]
+        heating_cache = {
+            "version": HEATING_CLASSIFIER_VERSION,
+            "classes": merged_classes,
+        }
 
-            # Different heat pump types
-            # --------------------------
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(HEATING_CLASSES_PATH), suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(heating_cache, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, HEATING_CLASSES_PATH)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
 
-            if "ground source heat pump" in heating:
-                system_type = "ground source heat pump"
-                source_type = "electric"
 
-            elif "air source heat pump" in heating:
-                system_type = "air source heat pump"
-                source_type = "electric"
+def update_heating_classes(heating_types):
+    """Classify heating descriptions not seen before and add them to the cache.
 
-            elif "water source heat pump" in heating:
-                system_type = "water source heat pump"
-                source_type = "electric"
+    Parameters
+    ----------
+    heating_types : iterable
+        Unique heating descriptions.
+
+    Return
+    ---------
+    heating_classes : dict
+        Heating system and source (fine-grained) for every description."""
 
-            elif "heat pump" in heating:
-                system_type = "heat pump"
-                source_type = "electric"
+    heating_classes = load_heating_classes()
+    new_heating_types = [
+        heating for heating in heating_types if heating not in heating_classes
+    ]
 
-            # Electric heaters
-            # --------------------------
+    # Classify heating types not seen before
+    if new_heating_types:
+        for heating in new_heating_types:
+            heating_classes[heating] = classify_heating(heating)
+        save_heating_classes(heating_classes)
 
-            elif "electric storage heaters" in heating:
-                system_type = "storage heater"
-                source_type = "electric"
+    return heating_classes
 
-            elif "electric underfloor heating" in heating:
-                system_type = "underfloor heating"
-                source_type = "electric"
 
-            # Warm air
-            # --------------------------
+def get_heating_features(df, fine_grained_HP_types=False):
+    """Get heating type category based on HEATING_TYPE category.
+    heating_system: heat pump, boiler, community scheme etc.
+    heating_source: oil, gas, LPC, electric.
+
+    Every distinct heating description is only classified once, and the
+    classes are kept in a persistent cache (HEATING_CLASSES_PATH) across runs.
 
-            elif "warm air" in heating:
-                system_type = "warm air"
-                source_type = "electric"
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Dataframe that is updated with heating features.
 
-            # Boiler and radiator / Boiler and underfloor / Community scheme / Heater (unspecified)
-            # --------------------------
+    fine_grained_HP_types : bool, default=False
+        If True, get different heat pump types (air sourced, ground sourced etc.).
+        If False, return "heat pump" as heating type category.
 
-            elif any(other_heating_system):
+    Return
+    ---------
+    df : pandas.DataFrame
+        Updated dataframe with heating system and source (categoricals)."""
 
-                # Set heating system dict
-                heating_system_dict = {
-                    "boiler and radiator": "boiler and radiator",
-                    "boiler & radiator": "boiler and radiator",
-                    "boiler and underfloor": "boiler and underfloor",
-                    "boiler & underfloor": "boiler and underfloor",
-                    "community scheme": "community scheme",
-                    "heater": "heater",  # not specified heater (otherwise handeld above)
-                }
+    # Get unique heating types
+    codes, heating_types = pd.factorize(df["MAINHEAT_DESCRIPTION"])
 
-                # Set heating source dict
-                heating_source_dict = {
-                    "gas": "gas",
-                    ", oil": "oil",  # with preceeding comma (!= "boiler")
-                    "lpg": "LPG",
-                    "electric": "electric",
-                }
+    heating_classes = update_heating_classes(heating_types)
 
-                # If heating system word is found, save respective system type
-                for word, system in heating_system_dict.items():
-                    if word in heating:
-                        system_type = system
+    system_types = [heating_classes[heating][0] for heating in heating_types]
+    source_types = [heating_classes[heating][1] for heating in heating_types]
 
-                # If heating source word is found, save respective source type
-                for word, source in heating_source_dict.items():
-                    if word in heating:
-                        source_type = source
+    # Don't differentiate between heat pump types
+    if not fine_grained_HP_types:
+        system_types = [
+            "heat pump" if "heat pump" in system_type else system_type
+            for system_type in system_types
+        ]
 
-        # Don't differentiate between heat pump types
-        if not fine_grained_HP_types:
-
-            if "heat pump" in system_type:
-                system_type = "heat pump"
-
-        # Save heating system type and source type
-        heating_system_types.append(system_type)
-        heating_source_types.append(source_type)
+    # Missing heating types (code -1) point to last entry
+    system_types = np.array(system_types + ["unknown"], dtype=object)
+    source_types = np.array(source_types + ["unknown"], dtype=object)
 
     # Add heating system and source to df
-    df["HEATING_SYSTEM"] = heating_system_types
-    df["HEATING_SOURCE"] = heating_source_types
+    df["HEATING_SYSTEM"] = pd.Categorical(system_types[codes])
+    df["HEATING_SOURCE"] = pd.Categorical(source_types[codes])
 
     return df
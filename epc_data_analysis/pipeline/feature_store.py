@@ -0,0 +1,352 @@
+# File: pipeline/feature_store.py
+"""Local feature store for engineered EPC data.
+
+Engineered dataframes are stored under FEATURE_STORE_PATH, keyed by a fingerprint
+of their input: the subset, the columns, the content hashes of the source files,
+the feature functions and FEATURE_VERSION. A later request with the same input
+reads the stored dataframe instead of recomputing it.
+
+The store is bounded in size: least recently used entries are evicted first.
+A lock file guards the store, so several notebook kernels can use it at once.
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+import hashlib
+import json
+import os
+
+from contextlib import contextmanager
+from functools import partial
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows, store is not locked
+    fcntl = None
+
+from epc_data_analysis import get_yaml_config, Path, PROJECT_DIR, logger
+from epc_data_analysis.getters import epc_data, util_data
+from epc_data_analysis.pipeline import enrichment, feature_engineering
+from epc_data_analysis.utils import caching
+
+# ---------------------------------------------------------------------------------
+
+# Load config file
+epc_data_config = get_yaml_config(
+    Path(str(PROJECT_DIR) + "/epc_data_analysis/config/base.yaml")
+)
+
+# Get path
+FEATURE_STORE_PATH = str(PROJECT_DIR) + epc_data_config["FEATURE_STORE_PATH"]
+
+# Increase when the feature functions change, invalidates all stored features
+FEATURE_VERSION = "1"
+
+# Maximum size of feature store in bytes
+MAX_STORE_BYTES = 10 * 2**30
+
+DEFAULT_FEATURE_FUNCTIONS = [
+    feature_engineering.get_new_EPC_rating_features,
+    feature_engineering.get_heating_features,
+]
+
+
+@contextmanager
+def store_lock(shared=False):
+    """Lock feature store across processes.
+
+    Parameters
+    ----------
+    shared : bool, default=False
+        Shared lock for reading, otherwise exclusive lock for writing.
+
+    Return
+    ---------
+    None"""
+
+    os.makedirs(FEATURE_STORE_PATH, exist_ok=True)
+
+    with open(FEATURE_STORE_PATH + ".lock", "a") as lock_file:
+
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def get_source_hash(file_path):
+    """Get content hash of source file, computed once per file version.
+
+    Hashes are kept in FEATURE_STORE_PATH/source_hashes.json with the file signature,
+    so a file is only hashed again when its size or modification time change.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to source file.
+
+    Return
+    ---------
+    file_hash : str
+        Hexadecimal SHA-256 hash."""
+
+    hashes_path = FEATURE_STORE_PATH + "source_hashes.json"
+    signature = caching.get_file_signature(file_path)
+
+    source_hashes = {}
+    if os.path.exists(hashes_path):
+        with open(hashes_path, "r") as f:
+            try:
+                source_hashes = json.load(f)
+            except ValueError:
+                source_hashes = {}
+
+    entry = source_hashes.get(file_path)
+    if entry is not None and entry["signature"] == signature:
+        return entry["hash"]
+
+    file_hash = caching.get_file_hash(file_path)
+
+    with store_lock():
+
+        # Re-read, another process may have added hashes meanwhile
+        if os.path.exists(hashes_path):
+            with open(hashes_path, "r") as f:
+                try:
+                    source_hashes = json.load(f)
+                except ValueError:
+                    source_hashes = {}
+
+        source_hashes[file_path] = {"signature": signature, "hash": file_hash}
+
+        with open(hashes_path + ".tmp", "w") as f:
+            json.dump(source_hashes, f, indent=1, sort_keys=True)
+        os.replace(hashes_path + ".tmp", hashes_path)
+
+    return file_hash
+
+
+def get_function_id(function):
+    """Get identifier for feature function, including arguments of partials.
+
+    Parameters
+    ----------
+    function : callable
+        Feature function, taking and returning a dataframe.
+
+    Return
+    ---------
+    function_id : str
+        Identifier for feature function."""
+
+    if isinstance(function, partial):
+        return "{}({})".format(
+            get_function_id(function.func),
+            ", ".join(
+                [repr(arg) for arg in function.args]
+                + [
+                    "{}={!r}".format(key, value)
+                    for key, value in sorted(function.keywords.items())
+                ]
+            ),
+        )
+
+    return "{}.{}".format(function.__module__, function.__qualname__)
+
+
+def get_fingerprint(subset, usecols, feature_functions, source_paths, version):
+    """Get fingerprint of feature store input.
+
+    Parameters
+    ----------
+    subset : {'all', 'Wales', 'England'}
+        EPC certificate area subset.
+
+    usecols : list, None
+        Columns loaded from EPC dataset.
+
+    feature_functions : list
+        Feature functions applied in order.
+
+    source_paths : list
+        Source files (EPC certificates, lookup tables).
+
+    version : str
+        Version of the feature functions.
+
+    Return
+    ---------
+    fingerprint : str
+        Hexadecimal SHA-256 fingerprint.
+
+    fingerprint_input : dict
+        Input the fingerprint was computed from."""
+
+    fingerprint_input = {
+        "subset": subset,
+        "usecols": list(usecols) if usecols is not None else None,
+        "feature_functions": [
+            get_function_id(function) for function in feature_functions
+        ],
+        "sources": {
+            os.path.relpath(path, str(PROJECT_DIR)): get_source_hash(path)
+            for path in source_paths
+        },
+        "version": version,
+    }
+
+    fingerprint = hashlib.sha256(
+        json.dumps(fingerprint_input, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+    return fingerprint, fingerprint_input
+
+
+def get_entry_path(fingerprint):
+    """Get path to stored features for given fingerprint."""
+
+    return FEATURE_STORE_PATH + fingerprint + ".parquet"
+
+
+def evict_entries(max_bytes=MAX_STORE_BYTES, keep=None):
+    """Evict least recently used entries until store fits into max_bytes.
+
+    Must be called while holding the exclusive store lock.
+
+    Parameters
+    ----------
+    max_bytes : int, default=MAX_STORE_BYTES
+        Maximum size of feature store in bytes.
+
+    keep : str, default=None
+        Path of entry never to evict (e.g. the one just written).
+
+    Return
+    ---------
+    evicted_paths : list
+        Paths of evicted entries."""
+
+    entries = []
+
+    for file_name in os.listdir(FEATURE_STORE_PATH):
+        if not file_name.endswith(".parquet"):
+            continue
+
+        entry_path = FEATURE_STORE_PATH + file_name
+        entry_stats = os.stat(entry_path)
+        entries.append((entry_stats.st_mtime_ns, entry_stats.st_size, entry_path))
+
+    total_bytes = sum(n_bytes for _, n_bytes, _ in entries)
+    evicted_paths = []
+
+    # Oldest access first
+    for _, n_bytes, entry_path in sorted(entries):
+        if total_bytes <= max_bytes:
+            break
+
+        if entry_path == keep:
+            continue
+
+        for path in [entry_path, caching.get_sidecar_path(entry_path)]:
+            if os.path.exists(path):
+                os.remove(path)
+
+        total_bytes -= n_bytes
+        evicted_paths.append(entry_path)
+
+    if evicted_paths:
+        logger.info("Evicted {} entries from feature store".format(len(evicted_paths)))
+
+    return evicted_paths
+
+
+def get_features(
+    subset="all",
+    usecols=None,
+    feature_functions=None,
+    with_wimd=False,
+    version=FEATURE_VERSION,
+    max_bytes=MAX_STORE_BYTES,
+):
+    """Get engineered EPC data from feature store, computing it on a miss.
+
+    Parameters
+    ----------
+    subset : {'all', 'Wales', 'England'}, default='all'
+        EPC certificate area subset.
+
+    usecols : list, default=None
+        List of features/columns to load from EPC dataset.
+
+    feature_functions : list, default=None
+        Feature functions to apply in order, each taking and returning a dataframe.
+        If None, use DEFAULT_FEATURE_FUNCTIONS.
+
+    with_wimd : bool, default=False
+        Add WIMD data (only keeping samples with WIMD data), see enrichment.enrich().
+
+    version : str, default=FEATURE_VERSION
+        Version of the feature functions.
+
+    max_bytes : int, default=MAX_STORE_BYTES
+        Maximum size of feature store in bytes.
+
+    Return
+    ---------
+    epc_df : pandas.DataFrame
+        Engineered EPC data, with a RangeIndex."""
+
+    feature_functions = list(
+        DEFAULT_FEATURE_FUNCTIONS if feature_functions is None else feature_functions
+    )
+
+    source_paths = [
+        epc_data.epc_data_path + directory + "/certificates.csv"
+        for directory in epc_data.get_epc_directories(subset)
+    ]
+
+    if with_wimd:
+        feature_functions.append(
+            partial(enrichment.enrich, with_location=False, how="inner")
+        )
+        source_paths.append(util_data.WIMD_PATH)
+
+    fingerprint, fingerprint_input = get_fingerprint(
+        subset, usecols, feature_functions, source_paths, version
+    )
+    entry_path = get_entry_path(fingerprint)
+
+    # Read stored features
+    with store_lock(shared=True):
+        if caching.is_cache_valid(entry_path, fingerprint_input):
+
+            # Mark as recently used
+            os.utime(entry_path)
+
+            logger.info("Reading features from feature store")
+            return caching.read_cache(entry_path)
+
+    # Compute features
+    epc_df = epc_data.load_epc_data(subset=subset, usecols=usecols)
+
+    for feature_function in feature_functions:
+        epc_df = feature_function(epc_df)
+
+    # Same RangeIndex as when reading from the store
+    epc_df = epc_df.reset_index(drop=True)
+
+    # Store features
+    with store_lock():
+        caching.write_cache(epc_df, entry_path, fingerprint_input)
+        evict_entries(max_bytes=max_bytes, keep=entry_path)
+
+    return epc_df
@@ -0,0 +1,377 @@
+# File: pipeline/ingest.py
+"""Incremental ingestion of EPC releases into a processed data store.
+
+The processed store holds one Parquet file per local authority directory.
+An ingest state file records the content hash of every ingested certificates.csv,
+so a new release only reprocesses the directories that are new or have changed.
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+import json
+import os
+
+from functools import partial
+
+import pandas as pd
+
+from epc_data_analysis import get_yaml_config, Path, PROJECT_DIR, logger
+from epc_data_analysis.getters import epc_data
+from epc_data_analysis.pipeline import feature_engineering, feature_store
+from epc_data_analysis.utils import caching
+
+# ---------------------------------------------------------------------------------
+
+# Load config file
+epc_data_config = get_yaml_config(
+    Path(str(PROJECT_DIR) + "/epc_data_analysis/config/base.yaml")
+)
+
+# Get path
+PROCESSED_DATA_PATH = str(PROJECT_DIR) + epc_data_config["PROCESSED_DATA_PATH"]
+
+
+def process_certificates(df):
+    """Default processing: add EPC rating and heating features.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        EPC certificates for one local authority.
+
+    Return
+    ---------
+    df : pandas.DataFrame
+        Processed EPC certificates."""
+
+    df = feature_engineering.get_new_EPC_rating_features(df)
+    df = feature_engineering.get_heating_features(df)
+
+    return df
+
+
+def get_processing_id(process_function, usecols, version):
+    """Get identifier for processing, stored in the ingest state.
+
+    If the identifier changes, all directories have to be reprocessed.
+
+    Parameters
+    ----------
+    process_function : callable
+        Function processing the certificates of one local authority.
+        For partials, the bound arguments are part of the identifier.
+
+    usecols : list, None
+        Columns loaded from EPC dataset.
+
+    version : str
+        Version of the processing, to be increased when process_function changes.
+
+    Return
+    ---------
+    processing_id : str
+        Identifier for processing."""
+
+    return "{}|{}|{}".format(
+        feature_store.get_function_id(process_function),
+        ",".join(usecols) if usecols is not None else "all",
+        version,
+    )
+
+
+def get_certificates_hash(directory, from_zip=False, zip_members=None):
+    """Get content hash of certificates.csv of given local authority directory.
+
+    For members of the EPC bulk download ZIP, the CRC-32 stored in the ZIP
+    is used, so the member does not have to be decompressed.
+
+    Parameters
+    ----------
+    directory : str
+        Local authority directory, e.g. 'domestic-W06000015-Cardiff'.
+
+    from_zip : bool, default=False
+        Get hash of member in the EPC bulk download ZIP at EPC_ZIP_PATH.
+
+    zip_members : dict, default=None
+        ZIP members of certificates.csv by directory, see epc_data.read_zip_members().
+        If None and from_zip is True, read them from the ZIP.
+
+    Return
+    ---------
+    file_hash : str
+        SHA-256 hash of file or CRC-32 of ZIP member."""
+
+    if not from_zip:
+        return caching.get_file_hash(
+            epc_data.epc_data_path + directory + "/certificates.csv"
+        )
+
+    if zip_members is None:
+        zip_members = epc_data.read_zip_members()
+
+    return "crc32:{:08x}".format(zip_members[directory].CRC)
+
+
+def get_ingest_state_path():
+    """Get path to ingest state file."""
+
+    return PROCESSED_DATA_PATH + "ingest_state.json"
+
+
+def get_processed_path(directory):
+    """Get path to processed data for given local authority directory."""
+
+    return PROCESSED_DATA_PATH + directory + ".parquet"
+
+
+def load_ingest_state():
+    """Load state of the last ingest.
+
+    Return
+    ---------
+    ingest_state : dict
+        Processing identifier and, for every ingested directory,
+        signature and content hash of its certificates.csv."""
+
+    state_path = get_ingest_state_path()
+
+    if not os.path.exists(state_path):
+        return {"processing_id": None, "directories": {}}
+
+    with open(state_path, "r") as f:
+        return json.load(f)
+
+
+def save_ingest_state(ingest_state):
+    """Save ingest state, writing to temporary file first.
+
+    Parameters
+    ----------
+    ingest_state : dict
+        Ingest state as returned by load_ingest_state().
+
+    Return
+    ---------
+    None"""
+
+    os.makedirs(PROCESSED_DATA_PATH, exist_ok=True)
+
+    state_path = get_ingest_state_path()
+    with open(state_path + ".tmp", "w") as f:
+        json.dump(ingest_state, f, indent=1, sort_keys=True)
+    os.replace(state_path + ".tmp", state_path)
+
+
+def process_directory(
+    directory, process_function, usecols=None, from_zip=False, zip_members=None
+):
+    """Load, process and store certificates of one local authority directory.
+
+    Parameters
+    ----------
+    directory : str
+        Local authority directory, e.g. 'domestic-W06000015-Cardiff'.
+
+    process_function : callable
+        Function processing the certificates of one local authority.
+
+    usecols : list, default=None
+        List of features/columns to load from EPC dataset.
+
+    from_zip : bool, default=False
+        Read certificates from the EPC bulk download ZIP at EPC_ZIP_PATH.
+
+    zip_members : dict, default=None
+        ZIP members of certificates.csv by directory, see epc_data.read_zip_members().
+
+    Return
+    ---------
+    n_rows : int
+        Number of processed rows stored."""
+
+    df = epc_data.read_certificates(
+        directory, usecols=usecols, from_zip=from_zip, zip_members=zip_members
+    )
+    df = process_function(df)
+
+    os.makedirs(PROCESSED_DATA_PATH, exist_ok=True)
+
+    processed_path = get_processed_path(directory)
+    df.to_parquet(processed_path + ".tmp", index=False)
+    os.replace(processed_path + ".tmp", processed_path)
+
+    return len(df)
+
+
+def ingest_epc_release(
+    subset="all",
+    process_function=process_certificates,
+    usecols=None,
+    version="1",
+    n_jobs=1,
+    force=False,
+    from_zip=False,
+):
+    """Ingest EPC release, only processing directories that are new or changed.
+
+    A directory is unchanged if its certificates.csv has the same size and
+    modification time as in the last ingest or, failing that, the same content hash.
+    Processed data for directories removed from the release is deleted.
+
+    Parameters
+    ----------
+    subset : {'all', 'Wales', 'England'}, default='all'
+        EPC certificate area subset.
+
+    process_function : callable, default=process_certificates
+        Function processing the certificates of one local authority.
+        Has to be defined at module level if n_jobs > 1.
+
+    usecols : list, default=None
+        List of features/columns to load from EPC dataset.
+
+    version : str, default="1"
+        Version of the processing. Changing the version, process_function
+        or usecols reprocesses all directories.
+
+    n_jobs : int, default=1
+        Number of processes for processing directories. If -1, use all CPUs.
+
+    force : bool, default=False
+        Reprocess all directories.
+
+    from_zip : bool, default=False
+        Ingest release from the EPC bulk download ZIP at EPC_ZIP_PATH
+        instead of the extracted directories. Switching between the two
+        reprocesses all directories, as their content hashes differ.
+
+    Return
+    ---------
+    ingest_summary : dict
+        Lists of 'new', 'changed', 'unchanged' and 'removed' directories."""
+
+    ingest_state = load_ingest_state()
+    processing_id = get_processing_id(process_function, usecols, version)
+
+    # Reprocess everything if processing has changed
+    if force or ingest_state["processing_id"] != processing_id:
+        ingest_state = {"processing_id": processing_id, "directories": {}}
+
+    zip_members = epc_data.read_zip_members() if from_zip else None
+    directories = epc_data.get_epc_directories(
+        subset, from_zip=from_zip, zip_members=zip_members
+    )
+    ingested_states = ingest_state["directories"]
+
+    ingest_summary = {"new": [], "changed": [], "unchanged": [], "removed": []}
+    current_states = {}
+
+    for directory in directories:
+
+        signature = epc_data.get_certificates_signature(
+            directory, from_zip=from_zip, zip_members=zip_members
+        )
+        previous_state = ingested_states.get(directory)
+
+        # Quick check: same size and modification time
+        if previous_state is not None and previous_state["signature"] == signature:
+            ingest_summary["unchanged"].append(directory)
+            continue
+
+        # Otherwise compare content hash
+        file_hash = get_certificates_hash(
+            directory, from_zip=from_zip, zip_members=zip_members
+        )
+        current_states[directory] = {"signature": signature, "hash": file_hash}
+
+        if previous_state is None:
+            ingest_summary["new"].append(directory)
+        elif previous_state["hash"] != file_hash:
+            ingest_summary["changed"].append(directory)
+        else:
+            ingest_summary["unchanged"].append(directory)
+            ingested_states[directory] = current_states[directory]
+
+    # Directories of subset no longer in release
+    start_with_dict = {"Wales": "domestic-W", "England": "domestic-E"}
+    for directory in list(ingested_states):
+        if directory not in directories and directory.startswith(
+            start_with_dict.get(subset, "")
+        ):
+            ingest_summary["removed"].append(directory)
+            del ingested_states[directory]
+
+            if os.path.exists(get_processed_path(directory)):
+                os.remove(get_processed_path(directory))
+
+    # Process new and changed directories
+    to_process = ingest_summary["new"] + ingest_summary["changed"]
+
+    logger.info(
+        "Ingesting EPC release: {} new, {} changed, {} unchanged, {} removed".format(
+            *[len(ingest_summary[status]) for status in ingest_summary]
+        )
+    )
+
+    epc_data.map_directories(
+        partial(
+            process_directory,
+            process_function=process_function,
+            usecols=usecols,
+            from_zip=from_zip,
+            zip_members=zip_members,
+        ),
+        to_process,
+        n_jobs=n_jobs,
+    )
+
+    for directory in to_process:
+        ingested_states[directory] = current_states[directory]
+
+    save_ingest_state(ingest_state)
+
+    return ingest_summary
+
+
+def load_processed_data(subset="all", columns=None):
+    """Load processed EPC data from the processed data store.
+
+    Parameters
+    ----------
+    subset : {'all', 'Wales', 'England'}, default='all'
+        EPC certificate area subset.
+
+    columns : list, default=None
+        Columns to load. If None, load all columns.
+
+    Return
+    ---------
+    processed_df : pandas.DataFrame
+        Processed EPC data for all ingested directories of given subset."""
+
+    # Directories from ingest state, as release may have been ingested from ZIP
+    start_with_dict = {
+        "all": "domestic-",
+        "Wales": "domestic-W",
+        "England": "domestic-E",
+    }
+    if subset not in start_with_dict:
+        raise IOError("'{}' is not a valid subset of the EPC dataset.".format(subset))
+
+    directories = sorted(
+        directory
+        for directory in load_ingest_state()["directories"]
+        if directory.startswith(start_with_dict[subset])
+    )
+
+    frames = [
+        pd.read_parquet(get_processed_path(directory), columns=columns)
+        for directory in directories
+    ]
+
+    return epc_data.concat_epc_frames(frames)
@@ -0,0 +1,675 @@
+# File: pipeline/parallel_features.py
+"""Parallel feature engineering on row blocks with shared memory.
+
+The input columns are placed in shared memory once: numeric columns as they are,
+text columns as factorised codes (the few unique values are sent to every worker
+process once). Worker processes run the feature functions on row blocks and
+write the outputs into preallocated shared arrays, so no dataframe is pickled.
+Text outputs are written as codes per block and remapped to common categories.
+
+Only row-preserving feature functions can be used, e.g.
+get_new_EPC_rating_features(drop_invalid=False) and get_heating_features().
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+import multiprocessing
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from epc_data_analysis import logger
+from epc_data_analysis.pipeline import feature_engineering
+
+try:
+    from multiprocessing import resource_tracker
+except ImportError:
+    resource_tracker = None
+
+# ---------------------------------------------------------------------------------
+
+DEFAULT_FEATURE_FUNCTIONS = [
+    partial(feature_engineering.get_new_EPC_rating_features, drop_invalid=False),
+    feature_engineering.get_heating_features,
+]
+
+# Shared arrays and settings in worker process, see init_worker()
+_worker_state = {}
+
+
+def share_array(array, shared_memories):
+    """Copy array into new shared memory block.
+
+    Parameters
+    ----------
+    array : numpy.ndarray
+        Array to share (1-dimensional).
+
+    shared_memories : list
+        List to add shared memory block to, for cleaning up.
+
+    Return
+    ---------
+    array_spec : tuple
+        Name of shared memory block, dtype and length."""
+
+    array = np.ascontiguousarray(array)
+
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    shared_memories.append(shm)
+
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+
+    return (shm.name, array.dtype.str, len(array))
+
+
+def allocate_array(length, dtype, shared_memories):
+    """Allocate zero-filled array in new shared memory block.
+
+    Parameters
+    ----------
+    length : int
+        Length of array.
+
+    dtype : numpy.dtype
+        Dtype of array.
+
+    shared_memories : list
+        List to add shared memory block to, for cleaning up.
+
+    Return
+    ---------
+    array_spec : tuple
+        Name of shared memory block, dtype and length."""
+
+    return share_array(np.zeros(length, dtype=dtype), shared_memories)
+
+
+def attach_array(array_spec, attached_memories):
+    """Get array in existing shared memory block.
+
+    Parameters
+    ----------
+    array_spec : tuple
+        Name of shared memory block, dtype and length.
+
+    attached_memories : list
+        List to add shared memory block to, keeping it open.
+
+    Return
+    ---------
+    array : numpy.ndarray
+        Array backed by shared memory."""
+
+    name, dtype, length = array_spec
+
+    shm = shared_memory.SharedMemory(name=name)
+    attached_memories.append(shm)
+
+    # Only the parent process may unlink the block. Forked workers share the
+    # resource tracker of the parent, others have to unregister the block.
+    if (
+        resource_tracker is not None
+        and os.getpid() != _worker_state.get("parent_pid")
+        and multiprocessing.get_start_method() != "fork"
+    ):
+        resource_tracker.unregister(shm._name, "shared_memory")
+
+    return np.ndarray((length,), dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def is_integer_column(dtype):
+    """Check whether dtype is a (nullable) integer or boolean dtype."""
+
+    return pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_bool_dtype(dtype)
+
+
+def get_numpy_dtype(dtype):
+    """Get numpy dtype of (nullable) numeric dtype."""
+
+    return getattr(dtype, "numpy_dtype", dtype)
+
+
+def is_nullable(dtype):
+    """Check whether dtype is a pandas extension dtype with missing values mask."""
+
+    return isinstance(dtype, pd.api.extensions.ExtensionDtype)
+
+
+def to_masked_array(values, mask, nullable):
+    """Get nullable integer or boolean array, or values if dtype is not nullable."""
+
+    if not nullable:
+        return values
+
+    if values.dtype == bool:
+        return pd.arrays.BooleanArray(values, mask)
+
+    return pd.arrays.IntegerArray(values, mask)
+
+
+def share_column(series, shared_memories):
+    """Place input column in shared memory.
+
+    Parameters
+    ----------
+    series : pandas.Series
+        Input column.
+
+    shared_memories : list
+        List to add shared memory blocks to, for cleaning up.
+
+    Return
+    ---------
+    column_spec : dict
+        Kind of column with shared arrays and categories/uniques."""
+
+    dtype = series.dtype
+
+    if isinstance(dtype, pd.CategoricalDtype):
+        return {
+            "kind": "categorical",
+            "codes": share_array(series.cat.codes.to_numpy(np.int32), shared_memories),
+            "categories": series.cat.categories,
+        }
+
+    if is_integer_column(dtype):
+        return {
+            "kind": "masked",
+            "nullable": is_nullable(dtype),
+            "values": share_array(
+                series.to_numpy(get_numpy_dtype(dtype), na_value=0), shared_memories
+            ),
+            "mask": share_array(series.isna().to_numpy(), shared_memories),
+        }
+
+    if pd.api.types.is_float_dtype(dtype) or pd.api.types.is_datetime64_dtype(dtype):
+        return {
+            "kind": "numpy",
+            "values": share_array(series.to_numpy(), shared_memories),
+        }
+
+    # Text columns as factorised codes
+    codes, uniques = pd.factorize(series)
+
+    return {
+        "kind": "factorized",
+        "codes": share_array(codes.astype(np.int32), shared_memories),
+        "uniques": np.append(np.asarray(uniques, dtype=object), np.nan),
+    }
+
+
+def read_block(column_spec, arrays, start, stop):
+    """Get input column for row block from shared arrays.
+
+    Parameters
+    ----------
+    column_spec : dict
+        Column spec, see share_column().
+
+    arrays : dict
+        Attached shared arrays of column.
+
+    start : int
+        First row of block.
+
+    stop : int
+        Row after last row of block.
+
+    Return
+    ---------
+    values : numpy.ndarray, pandas.api.extensions.ExtensionArray
+        Column values for block."""
+
+    kind = column_spec["kind"]
+
+    if kind == "categorical":
+        return pd.Categorical.from_codes(
+            arrays["codes"][start:stop], categories=column_spec["categories"]
+        )
+
+    if kind == "masked":
+        return to_masked_array(
+            arrays["values"][start:stop].copy(),
+            arrays["mask"][start:stop].copy(),
+            column_spec["nullable"],
+        )
+
+    if kind == "numpy":
+        return arrays["values"][start:stop].copy()
+
+    # Code -1 (missing) points to the last entry
+    return column_spec["uniques"][arrays["codes"][start:stop]]
+
+
+def get_output_spec(series, shared_memories):
+    """Preallocate shared arrays for output column, based on a sample.
+
+    Parameters
+    ----------
+    series : pandas.Series
+        Output column computed on sample block.
+
+    shared_memories : list
+        List to add shared memory blocks to, for cleaning up.
+
+    Return
+    ---------
+    output_spec : dict
+        Kind and dtype of output column and (after allocation) its shared arrays."""
+
+    dtype = series.dtype
+
+    if is_integer_column(dtype):
+        return {
+            "kind": "masked",
+            "dtype": np.dtype(get_numpy_dtype(dtype)),
+            "nullable": is_nullable(dtype),
+            "sample_dtype": dtype,
+        }
+
+    if pd.api.types.is_float_dtype(dtype):
+        return {
+            "kind": "numpy",
+            "dtype": np.dtype(get_numpy_dtype(dtype)),
+            "sample_dtype": dtype,
+        }
+
+    return {"kind": "codes", "dtype": np.dtype(np.int32)}
+
+
+def check_output_dtype(series, spec, column, block):
+    """Check that output column of block has the dtype found in the sample.
+
+    Output arrays are allocated based on a sample, so a block with another dtype
+    (e.g. float with NaN instead of integers) cannot be written without loss.
+
+    Parameters
+    ----------
+    series : pandas.Series
+        Output column computed on block.
+
+    spec : dict
+        Output spec, see get_output_spec().
+
+    column : str
+        Output column.
+
+    block : tuple
+        First row and row after last row of block.
+
+    Return
+    ---------
+    None"""
+
+    dtype = series.dtype
+
+    if spec["kind"] == "codes":
+        is_valid = not (is_integer_column(dtype) or pd.api.types.is_float_dtype(dtype))
+    else:
+        is_valid = dtype == spec["sample_dtype"]
+
+    if not is_valid:
+        raise IOError(
+            "Output '{}' has dtype {} in rows {} to {}, but {} in the sample. "
+            "Feature functions have to return the same dtype for every block.".format(
+                column,
+                dtype,
+                *block,
+                spec.get("sample_dtype", "text"),
+            )
+        )
+
+
+def init_worker(input_specs, output_specs, feature_functions, parent_pid):
+    """Attach shared arrays in worker process.
+
+    Parameters
+    ----------
+    input_specs : dict
+        Spec for every input column, see share_column().
+
+    output_specs : dict
+        Spec for every output column, see get_output_spec().
+
+    feature_functions : list
+        Feature functions to apply in order.
+
+    parent_pid : int
+        Process ID of parent process, which owns the shared memory.
+
+    Return
+    ---------
+    None"""
+
+    _worker_state["parent_pid"] = parent_pid
+    _worker_state["attached_memories"] = []
+    _worker_state["feature_functions"] = feature_functions
+    _worker_state["input_specs"] = input_specs
+    _worker_state["output_specs"] = output_specs
+
+    attached_memories = _worker_state["attached_memories"]
+
+    for specs, key in [(input_specs, "input_arrays"), (output_specs, "output_arrays")]:
+        _worker_state[key] = {
+            column: {
+                name: attach_array(array_spec, attached_memories)
+                for name, array_spec in spec["arrays"].items()
+            }
+            for column, spec in specs.items()
+        }
+
+
+def process_block(block):
+    """Run feature functions on row block and write outputs to shared arrays.
+
+    Parameters
+    ----------
+    block : tuple
+        First row and row after last row of block.
+
+    Return
+    ---------
+    block_categories : dict
+        Categories of the codes written for every text output column."""
+
+    start, stop = block
+
+    block_df = pd.DataFrame(
+        {
+            column: read_block(spec, _worker_state["input_arrays"][column], start, stop)
+            for column, spec in _worker_state["input_specs"].items()
+        },
+        index=pd.RangeIndex(start, stop),
+    )
+
+    for feature_function in _worker_state["feature_functions"]:
+        block_df = feature_function(block_df)
+
+    if len(block_df) != stop - start:
+        raise IOError(
+            "Feature functions have to preserve rows ({} rows instead of {}).".format(
+                len(block_df), stop - start
+            )
+        )
+
+    output_columns = [
+        column
+        for column in block_df.columns
+        if column not in _worker_state["input_specs"]
+    ]
+    if set(output_columns) != set(_worker_state["output_specs"]):
+        raise IOError(
+            "Outputs {} in rows {} to {} differ from outputs {} in the sample.".format(
+                sorted(output_columns),
+                start,
+                stop,
+                sorted(_worker_state["output_specs"]),
+            )
+        )
+
+    block_categories = {}
+
+    for column, spec in _worker_state["output_specs"].items():
+        arrays = _worker_state["output_arrays"][column]
+        series = block_df[column]
+        check_output_dtype(series, spec, column, block)
+
+        if spec["kind"] == "masked":
+            arrays["values"][start:stop] = series.to_numpy(spec["dtype"], na_value=0)
+            arrays["mask"][start:stop] = series.isna().to_numpy()
+
+        elif spec["kind"] == "numpy":
+            arrays["values"][start:stop] = series.to_numpy(
+                spec["dtype"], na_value=np.nan
+            )
+
+        else:
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes, categories = series.cat.codes.to_numpy(), series.cat.categories
+            else:
+                codes, categories = pd.factorize(series)
+
+            arrays["codes"][start:stop] = codes
+            block_categories[column] = np.asarray(categories, dtype=object)
+
+    return block_categories
+
+
+def sort_categories(categories):
+    """Sort categories, keeping their order if they cannot be compared."""
+
+    try:
+        return categories.sort_values()
+    except TypeError:
+        return categories
+
+
+def get_output_values(series):
+    """Get output column of serial run with the dtype of the parallel run.
+
+    Parameters
+    ----------
+    series : pandas.Series
+        Output column computed on whole dataframe.
+
+    Return
+    ---------
+    values : numpy.ndarray, pandas.api.extensions.ExtensionArray
+        Numeric output as numpy or nullable array, other output as categorical
+        with sorted categories."""
+
+    dtype = series.dtype
+
+    if is_integer_column(dtype):
+        return series.array if is_nullable(dtype) else series.to_numpy()
+
+    if pd.api.types.is_float_dtype(dtype):
+        return series.to_numpy(get_numpy_dtype(dtype), na_value=np.nan)
+
+    if isinstance(dtype, pd.CategoricalDtype):
+        categories = series.cat.categories
+    else:
+        categories = pd.Index(pd.unique(series.dropna()))
+
+    return pd.Categorical(series.astype(object), categories=sort_categories(categories))
+
+
+def collect_output(spec, arrays, blocks, block_categories, column):
+    """Copy output column out of shared memory, remapping codes to common categories.
+
+    Parameters
+    ----------
+    spec : dict
+        Output spec, see get_output_spec().
+
+    arrays : dict
+        Shared arrays of output column.
+
+    blocks : list
+        Row blocks (first row, row after last row).
+
+    block_categories : list
+        Categories of every block, as returned by process_block().
+
+    column : str
+        Output column.
+
+    Return
+    ---------
+    values : numpy.ndarray, pandas.api.extensions.ExtensionArray
+        Output column."""
+
+    if spec["kind"] == "masked":
+        return to_masked_array(
+            arrays["values"].copy(), arrays["mask"].copy(), spec["nullable"]
+        )
+
+    if spec["kind"] == "numpy":
+        return arrays["values"].copy()
+
+    # Common categories of all blocks
+    categories = sort_categories(
+        pd.Index(
+            np.concatenate([categories[column] for categories in block_categories])
+        ).unique()
+    )
+
+    codes = arrays["codes"].copy()
+
+    for (start, stop), categories_in_block in zip(blocks, block_categories):
+
+        # Code -1 (missing) points to the last entry
+        code_lut = np.append(
+            categories.get_indexer(categories_in_block[column]), -1
+        ).astype(np.int32)
+        codes[start:stop] = code_lut[codes[start:stop]]
+
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def run_feature_functions(
+    df, feature_functions=None, columns=None, n_jobs=-1, block_size=None
+):
+    """Run row-preserving feature functions in parallel on row blocks.
+
+    New columns are added to df in place, also if n_jobs is 1. Numeric outputs
+    keep their dtype, other outputs become categoricals. Changes to existing
+    columns are not carried over. Output dtypes are taken from a sample of rows;
+    if a block returns another dtype or other columns, an IOError is raised.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        EPC dataframe.
+
+    feature_functions : list, default=None
+        Row-preserving feature functions to apply in order, taking and returning
+        a dataframe. Have to be defined at module level (or be partials thereof).
+        If None, use DEFAULT_FEATURE_FUNCTIONS.
+
+    columns : list, default=None
+        Input columns the feature functions need. If None, share all columns.
+
+    n_jobs : int, default=-1
+        Number of worker processes. If -1, use all CPUs.
+        If 1, run feature functions on whole dataframe without workers.
+
+    block_size : int, default=None
+        Number of rows per block. If None, four blocks per worker.
+
+    Return
+    ---------
+    df : pandas.DataFrame
+        EPC dataframe with new features."""
+
+    feature_functions = (
+        DEFAULT_FEATURE_FUNCTIONS if feature_functions is None else feature_functions
+    )
+    columns = list(df.columns) if columns is None else list(columns)
+    n_jobs = os.cpu_count() if n_jobs == -1 else n_jobs
+    n_rows = len(df)
+
+    if n_jobs == 1 or n_rows == 0:
+        result_df = df[columns].copy()
+        for feature_function in feature_functions:
+            result_df = feature_function(result_df)
+        if len(result_df) != n_rows:
+            raise IOError("Feature functions have to preserve rows.")
+
+        for column in result_df.columns:
+            if column not in columns:
+                df[column] = get_output_values(result_df[column])
+
+        return df
+
+    if block_size is None:
+        block_size = max(1, -(-n_rows // (4 * n_jobs)))
+
+    blocks = [
+        (start, min(start + block_size, n_rows))
+        for start in range(0, n_rows, block_size)
+    ]
+
+    # Classify all heating descriptions once, so workers only read the cache
+    if "MAINHEAT_DESCRIPTION" in columns:
+        feature_engineering.update_heating_classes(
+            pd.unique(df["MAINHEAT_DESCRIPTION"].dropna().to_numpy(dtype=object))
+        )
+
+    # Get output columns and dtypes from a small sample
+    sample_df = df[columns].iloc[: min(n_rows, 1000)].copy()
+    for feature_function in feature_functions:
+        sample_df = feature_function(sample_df)
+    output_columns = [column for column in sample_df.columns if column not in columns]
+
+    shared_memories = []
+
+    try:
+        input_specs = {}
+        for column in columns:
+            spec = share_column(df[column], shared_memories)
+            spec["arrays"] = {
+                name: spec.pop(name)
+                for name in ["codes", "values", "mask"]
+                if name in spec
+            }
+            input_specs[column] = spec
+
+        output_specs = {}
+        for column in output_columns:
+            spec = get_output_spec(sample_df[column], shared_memories)
+            names = {"masked": ["values", "mask"], "numpy": ["values"]}.get(
+                spec["kind"], ["codes"]
+            )
+            spec["arrays"] = {
+                name: allocate_array(
+                    n_rows, bool if name == "mask" else spec["dtype"], shared_memories
+                )
+                for name in names
+            }
+            output_specs[column] = spec
+
+        _worker_state["parent_pid"] = os.getpid()
+
+        with ProcessPoolExecutor(
+            max_workers=n_jobs,
+            initializer=init_worker,
+            initargs=(input_specs, output_specs, feature_functions, os.getpid()),
+        ) as executor:
+            block_categories = list(executor.map(process_block, blocks))
+
+        # Collect outputs before shared memory is released
+        attached_memories = []
+        for column, spec in output_specs.items():
+            arrays = {
+                name: attach_array(array_spec, attached_memories)
+                for name, array_spec in spec["arrays"].items()
+            }
+            df[column] = collect_output(spec, arrays, blocks, block_categories, column)
+            del arrays
+
+        for shm in attached_memories:
+            shm.close()
+
+    finally:
+        for shm in shared_memories:
+            shm.close()
+            shm.unlink()
+
+    logger.info(
+        "Computed {} features on {} blocks with {} processes".format(
+            len(output_columns), len(blocks), n_jobs
+        )
+    )
+
+    return df
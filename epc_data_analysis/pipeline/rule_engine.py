@@ -0,0 +1,336 @@
+# File: pipeline/rule_engine.py
+"""Declarative rule engine for extracting features from *_DESCRIPTION columns.
+
+Rules are defined in config/description_rules.yaml. The rules for a feature
+are compiled into an alternation of lookaheads, one per rule, each capturing
+its rule in a named group. Alternatives are tried in order, so the first matching
+rule wins. The alternations of all features of a column are combined into
+a single anchored expression, so every column is classified for all its features
+in one vectorised pass over its unique values.
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from epc_data_analysis import get_yaml_config, Path, PROJECT_DIR
+
+# ---------------------------------------------------------------------------------
+
+# Load config file
+epc_data_config = get_yaml_config(
+    Path(str(PROJECT_DIR) + "/epc_data_analysis/config/base.yaml")
+)
+
+# Get path
+DESCRIPTION_RULES_PATH = str(PROJECT_DIR) + epc_data_config["DESCRIPTION_RULES_PATH"]
+
+RULE_STATS_COLUMNS = [
+    "COLUMN",
+    "FEATURE",
+    "RULE",
+    "PATTERN",
+    "LABEL",
+    "N_HITS",
+    "SHARE",
+]
+
+
+def load_rules(rules_path=None):
+    """Load description rules from YAML file.
+
+    Parameters
+    ----------
+    rules_path : str, default=None
+        Path to rules file. If None, use DESCRIPTION_RULES_PATH.
+
+    Return
+    ---------
+    rules : dict
+        Features with default and ordered rules for every description column."""
+
+    rules_path = DESCRIPTION_RULES_PATH if rules_path is None else rules_path
+    rules = get_yaml_config(Path(rules_path))
+
+    if rules is None:
+        raise IOError("Rules file '{}' does not exist.".format(rules_path))
+
+    return rules
+
+
+def compile_feature_rules(feature_rules, group_prefix="r"):
+    """Compile the ordered rules for one feature into a regular expression.
+
+    The expression (?:(?=.*?(?P<r0>pattern0))|(?=.*?(?P<r1>pattern1))|...|)
+    succeeds with the first rule whose pattern is found anywhere in the description,
+    and only the group of that rule is set. The final empty alternative lets it
+    succeed without any group set if no rule matches.
+
+    Parameters
+    ----------
+    feature_rules : dict
+        Default and ordered rules (pattern and label) for one feature.
+
+    group_prefix : str, default="r"
+        Prefix of the group names, unique for every feature of a column.
+
+    Return
+    ---------
+    compiled_feature : dict
+        Expression, its group names, rule patterns and labels and default."""
+
+    rules = feature_rules["rules"]
+
+    for rule in rules:
+        # Check every pattern on its own for a helpful error message
+        try:
+            re.compile(rule["pattern"])
+        except re.error as error:
+            raise IOError(
+                "Invalid pattern '{}': {}".format(rule["pattern"], error)
+            ) from error
+
+    groups = ["{}{}".format(group_prefix, i) for i in range(len(rules))]
+
+    compiled_feature = {
+        "pattern": "(?:{}|)".format(
+            "|".join(
+                "(?=.*?(?P<{}>{}))".format(group, rule["pattern"])
+                for group, rule in zip(groups, rules)
+            )
+        ),
+        "groups": groups,
+        "patterns": [
+            re.compile(rule["pattern"], flags=re.IGNORECASE | re.DOTALL)
+            for rule in rules
+        ],
+        "labels": [str(rule["label"]) for rule in rules],
+        "default": str(feature_rules.get("default", "unknown")),
+    }
+
+    return compiled_feature
+
+
+def compile_column_rules(column_rules):
+    """Compile the rules for all features of one column into a single expression.
+
+    The expressions of the features are zero-width and always succeed, so
+    concatenated after ^ they classify a description for all features at once.
+
+    Parameters
+    ----------
+    column_rules : dict
+        Default and ordered rules for every feature of the column.
+
+    Return
+    ---------
+    compiled_column : dict
+        Combined expression and compiled rules for every feature."""
+
+    features = {
+        feature: compile_feature_rules(feature_rules, "f{}_r".format(i))
+        for i, (feature, feature_rules) in enumerate(column_rules.items())
+    }
+
+    combined_pattern = "^" + "".join(
+        compiled_feature["pattern"] for compiled_feature in features.values()
+    )
+
+    compiled_column = {
+        "regex": re.compile(combined_pattern, flags=re.IGNORECASE | re.DOTALL),
+        "features": features,
+    }
+
+    return compiled_column
+
+
+def compile_rules(rules):
+    """Compile rules for all description columns.
+
+    Parameters
+    ----------
+    rules : dict
+        Rules as returned by load_rules().
+
+    Return
+    ---------
+    compiled_rules : dict
+        Compiled rules for every description column."""
+
+    return {
+        column: compile_column_rules(column_rules)
+        for column, column_rules in rules.items()
+    }
+
+
+def get_feature_labels(descriptions, rule_matches, compiled_feature):
+    """Get labels of one feature from the groups matched for its rules.
+
+    Parameters
+    ----------
+    descriptions : pandas.Index
+        Unique descriptions (without missing values).
+
+    rule_matches : pandas.DataFrame
+        Text matched by every group of the column expression,
+        NaN for groups that are not set.
+
+    compiled_feature : dict
+        Compiled rules, see compile_feature_rules().
+
+    Return
+    ---------
+    labels : numpy.ndarray
+        Feature value for every description.
+
+    rule_ids : numpy.ndarray
+        Winning rule for every description. -1 if no rule matched."""
+
+    # Only the group of the winning rule is set
+    is_matched = rule_matches[compiled_feature["groups"]].notna().to_numpy()
+    rule_ids = np.full(len(descriptions), -1)
+    if is_matched.shape[1] > 0:
+        rule_ids = np.where(is_matched.any(axis=1), is_matched.argmax(axis=1), -1)
+
+    # Rule labels, default label last (rule_id -1)
+    labels = np.array(
+        compiled_feature["labels"] + [compiled_feature["default"]], dtype=object
+    )[rule_ids]
+
+    # Labels with text matched by the rule
+    for rule_id, label in enumerate(compiled_feature["labels"]):
+        if "{match}" not in label:
+            continue
+
+        pattern = compiled_feature["patterns"][rule_id]
+
+        for i in np.flatnonzero(rule_ids == rule_id):
+            match = pattern.search(descriptions[i])
+            matched_text = match.group(1) if pattern.groups > 0 else match.group(0)
+            labels[i] = label.format(match=matched_text)
+
+    return labels, rule_ids
+
+
+def classify_descriptions(descriptions, compiled_column):
+    """Classify unique descriptions with the compiled rules of one column.
+
+    The descriptions are scanned once with the combined expression,
+    for all features of the column.
+
+    Parameters
+    ----------
+    descriptions : pandas.Index
+        Unique descriptions (without missing values).
+
+    compiled_column : dict
+        Compiled rules, see compile_column_rules().
+
+    Return
+    ---------
+    feature_labels : dict
+        Labels and winning rules for every description, see get_feature_labels(),
+        by feature."""
+
+    if compiled_column["regex"].groups == 0:
+        rule_matches = pd.DataFrame(index=range(len(descriptions)))
+    else:
+        rule_matches = pd.Series(descriptions, dtype=object).str.extract(
+            compiled_column["regex"]
+        )
+
+    return {
+        feature: get_feature_labels(descriptions, rule_matches, compiled_feature)
+        for feature, compiled_feature in compiled_column["features"].items()
+    }
+
+
+def apply_description_rules(df, rules=None, columns=None, return_stats=False):
+    """Add features extracted from description columns by rules, in place.
+
+    Every column is factorised and its unique descriptions are classified
+    for all features in a single pass.
+    The features are added as categoricals.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        EPC dataframe with description columns.
+
+    rules : dict, default=None
+        Rules as returned by load_rules(). If None, load DESCRIPTION_RULES_PATH.
+
+    columns : list, default=None
+        Description columns to process. If None, all columns with rules
+        that are in df.
+
+    return_stats : bool, default=False
+        Also return hit statistics for every rule.
+
+    Return
+    ---------
+    df : pandas.DataFrame
+        EPC dataframe with new features.
+
+    rule_stats : pandas.DataFrame
+        Number and share of rows matched by every rule, with RULE -1 for the
+        rows that got the default value. Only returned if return_stats is True."""
+
+    compiled_rules = compile_rules(load_rules() if rules is None else rules)
+
+    if columns is None:
+        columns = [column for column in compiled_rules if column in df.columns]
+
+    rule_stats = []
+
+    for column in columns:
+
+        codes, descriptions = pd.factorize(df[column])
+        descriptions = pd.Index(descriptions, dtype=object)
+
+        compiled_column = compiled_rules[column]
+        feature_labels = classify_descriptions(descriptions, compiled_column)
+
+        for feature, compiled_feature in compiled_column["features"].items():
+
+            labels, rule_ids = feature_labels[feature]
+
+            # Missing descriptions (code -1) get the default
+            labels = np.append(labels, compiled_feature["default"])
+            rule_ids = np.append(rule_ids, -1)
+
+            df[feature] = pd.Categorical(labels[codes])
+
+            # Hits per rule, default (rule -1) counted last
+            n_rules = len(compiled_feature["labels"])
+            n_hits = np.bincount(rule_ids[codes] % (n_rules + 1), minlength=n_rules + 1)
+
+            rule_patterns = [
+                pattern.pattern for pattern in compiled_feature["patterns"]
+            ]
+            rule_labels = compiled_feature["labels"] + [compiled_feature["default"]]
+
+            for rule_id in list(range(n_rules)) + [-1]:
+                rule_stats.append(
+                    {
+                        "COLUMN": column,
+                        "FEATURE": feature,
+                        "RULE": rule_id,
+                        "PATTERN": rule_patterns[rule_id] if rule_id != -1 else None,
+                        "LABEL": rule_labels[rule_id],
+                        "N_HITS": int(n_hits[rule_id]),
+                        "SHARE": n_hits[rule_id] / len(df) if len(df) > 0 else np.nan,
+                    }
+                )
+
+    if return_stats:
+        return df, pd.DataFrame(rule_stats, columns=RULE_STATS_COLUMNS)
+
+    return df
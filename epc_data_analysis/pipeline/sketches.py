@@ -0,0 +1,637 @@
+# File: pipeline/sketches.py
+"""Approximate quantiles and distinct counts for national-scale distributions.
+
+KLLSketch keeps a small weighted sample of a numeric feature (Karnin, Lang and
+Liberty, 2016). With k=200, the rank error of a quantile is below 1.7% with
+99% probability, e.g. the estimated median lies between the exact 48.3% and
+51.7% quantiles. The memory is about 3k values, independent of the number of rows.
+
+HyperLogLog counts distinct values, e.g. BUILDING_REFERENCE_NUMBER, using 2^p
+one-byte registers (Flajolet et al., 2007, with the estimator by Ertl, 2017).
+The relative standard error is 1.04 / sqrt(2^p), i.e. 0.8% for the default p=14
+(16 KB per sketch).
+
+Both sketches can be updated chunk by chunk, merged across processes and
+serialised to JSON. The accumulators have the same interface as the ones in
+pipeline/accumulators.py, so they can be passed to accumulate_epc_data().
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+import base64
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from epc_data_analysis.pipeline import accumulators
+
+# ---------------------------------------------------------------------------------
+
+# Ratio of capacities of neighbouring KLL levels
+KLL_CAPACITY_RATIO = 2 / 3
+
+DEFAULT_QUANTILES = [0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99]
+
+
+class KLLSketch:
+    """Mergeable quantile sketch for numeric values.
+
+    Parameters
+    ----------
+    k : int, default=200
+        Capacity of the top level. Higher values are more accurate.
+
+    seed : int, default=None
+        Seed for the random compactions."""
+
+    def __init__(self, k=200, seed=None):
+
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0, dtype=np.float64)]
+        self.rng = np.random.default_rng(seed)
+
+    def get_capacity(self, level):
+        """Get number of values a level can hold before it is compacted."""
+
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * KLL_CAPACITY_RATIO**depth)))
+
+    def compress(self):
+        """Compact levels until all values fit into the sketch.
+
+        A compaction sorts a level and promotes every other value
+        (starting at random) to the next level, with twice the weight."""
+
+        while sum(len(values) for values in self.levels) > sum(
+            self.get_capacity(level) for level in range(len(self.levels))
+        ):
+
+            # Compact lowest level over capacity
+            level = next(
+                level
+                for level in range(len(self.levels))
+                if len(self.levels[level]) >= self.get_capacity(level)
+            )
+
+            if level == len(self.levels) - 1:
+                self.levels.append(np.empty(0, dtype=np.float64))
+
+            values = np.sort(self.levels[level])
+
+            # Keep one value at level if the number of values is odd
+            n_kept = len(values) % 2
+            offset = self.rng.integers(2)
+
+            self.levels[level] = values[:n_kept]
+            self.levels[level + 1] = np.concatenate(
+                [self.levels[level + 1], values[n_kept + offset :: 2]]
+            )
+
+    def update(self, values):
+        """Add values (missing values are skipped).
+
+        Parameters
+        ----------
+        values : array-like
+            Numeric values.
+
+        Return
+        ---------
+        self : KLLSketch
+            Updated sketch."""
+
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.compress()
+
+        return self
+
+    def merge(self, other):
+        """Add values of other sketch (e.g. from other process).
+
+        Parameters
+        ----------
+        other : KLLSketch
+            Sketch to merge.
+
+        Return
+        ---------
+        self : KLLSketch
+            Merged sketch."""
+
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+
+        for level, values in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], values])
+
+        self.n += other.n
+        self.compress()
+
+        return self
+
+    def get_weighted_values(self):
+        """Get sorted values with cumulative rank (0-1)."""
+
+        values = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [np.full(len(values), 2**level) for level, values in enumerate(self.levels)]
+        )
+
+        order = np.argsort(values, kind="mergesort")
+        ranks = np.cumsum(weights[order]) / weights.sum()
+
+        return values[order], ranks
+
+    def quantile(self, q):
+        """Get approximate quantile(s).
+
+        Parameters
+        ----------
+        q : float, list
+            Quantile(s) between 0 and 1.
+
+        Return
+        ---------
+        quantiles : float, numpy.ndarray
+            Approximate quantile(s), NaN if the sketch is empty."""
+
+        if self.n == 0:
+            return np.full(np.shape(q), np.nan)[()]
+
+        values, ranks = self.get_weighted_values()
+        positions = np.searchsorted(ranks, q, side="left")
+
+        return values[np.minimum(positions, len(values) - 1)]
+
+    def to_dict(self):
+        """Get sketch as JSON-serialisable dict."""
+
+        return {
+            "k": self.k,
+            "n": self.n,
+            "levels": [values.tolist() for values in self.levels],
+        }
+
+    @classmethod
+    def from_dict(cls, sketch_dict):
+        """Get sketch from dict, see to_dict()."""
+
+        sketch = cls(k=sketch_dict["k"])
+        sketch.n = sketch_dict["n"]
+        sketch.levels = [
+            np.asarray(values, dtype=np.float64) for values in sketch_dict["levels"]
+        ]
+
+        return sketch
+
+
+def get_sigma(x):
+    """Sigma function of the HyperLogLog estimator by Ertl (2017)."""
+
+    if x == 1:
+        return np.inf
+
+    y, z = 1.0, x
+    while True:
+        x = x * x
+        previous_z = z
+        z += x * y
+        y += y
+        if z == previous_z:
+            return z
+
+
+def get_tau(x):
+    """Tau function of the HyperLogLog estimator by Ertl (2017)."""
+
+    if x == 0 or x == 1:
+        return 0.0
+
+    y, z = 1.0, 1 - x
+    while True:
+        x = np.sqrt(x)
+        previous_z = z
+        y *= 0.5
+        z -= (1 - x) ** 2 * y
+        if z == previous_z:
+            return z / 3
+
+
+class HyperLogLog:
+    """Mergeable distinct count sketch.
+
+    Parameters
+    ----------
+    precision : int, default=14
+        Number of bits used for the register index (2^precision registers)."""
+
+    def __init__(self, precision=14):
+
+        self.precision = precision
+        self.registers = np.zeros(2**precision, dtype=np.uint8)
+
+    def update(self, values):
+        """Add values (missing values are skipped).
+
+        Parameters
+        ----------
+        values : array-like
+            Values of any type.
+
+        Return
+        ---------
+        self : HyperLogLog
+            Updated sketch."""
+
+        values = pd.Series(values).dropna().to_numpy()
+
+        # Same numbers hash the same, whether parsed as integers or floats
+        if values.dtype.kind in "iub":
+            values = values.astype(np.float64)
+
+        hashes = pd.util.hash_array(values)
+
+        # Highest bits select register, the position of the highest set bit
+        # in the remaining bits gives the rank
+        n_remaining_bits = 64 - self.precision
+        indices = (hashes >> np.uint64(n_remaining_bits)).astype(np.intp)
+        remaining = (hashes & np.uint64(2**n_remaining_bits - 1)).astype(np.float64)
+        bit_lengths = np.frexp(remaining)[1]
+        ranks = (n_remaining_bits - bit_lengths + 1).astype(np.uint8)
+
+        np.maximum.at(self.registers, indices, ranks)
+
+        return self
+
+    def merge(self, other):
+        """Add values of other sketch (e.g. from other process).
+
+        Parameters
+        ----------
+        other : HyperLogLog
+            Sketch with same precision.
+
+        Return
+        ---------
+        self : HyperLogLog
+            Merged sketch."""
+
+        if other.precision != self.precision:
+            raise IOError("Cannot merge HyperLogLog sketches of different precision.")
+
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+        return self
+
+    def count(self):
+        """Get approximate number of distinct values.
+
+        Uses the improved estimator by Ertl (2017), which has no bias
+        for small numbers of distinct values, unlike the original estimator.
+
+        Return
+        ---------
+        n_distinct : float
+            Estimated number of distinct values."""
+
+        m = len(self.registers)
+        q = 64 - self.precision
+
+        # Number of registers with every possible rank
+        rank_counts = np.bincount(self.registers, minlength=q + 2)
+
+        z = m * get_tau(1 - rank_counts[q + 1] / m)
+        for rank in range(q, 0, -1):
+            z = 0.5 * (z + rank_counts[rank])
+        z += m * get_sigma(rank_counts[0] / m)
+
+        return m**2 / (2 * np.log(2) * z)
+
+    def to_dict(self):
+        """Get sketch as JSON-serialisable dict."""
+
+        return {
+            "precision": self.precision,
+            "registers": base64.b64encode(self.registers.tobytes()).decode("ascii"),
+        }
+
+    @classmethod
+    def from_dict(cls, sketch_dict):
+        """Get sketch from dict, see to_dict()."""
+
+        sketch = cls(precision=sketch_dict["precision"])
+        sketch.registers = np.frombuffer(
+            base64.b64decode(sketch_dict["registers"]), dtype=np.uint8
+        ).copy()
+
+        return sketch
+
+
+class SketchAccumulator:
+    """Sketch of a feature, optionally one per value of a grouping feature.
+
+    Parameters
+    ----------
+    feature : str
+        Feature to sketch.
+
+    by : str, default=None
+        Feature by which to group, e.g. "LOCAL_AUTHORITY".
+
+    **sketch_kwargs
+        Settings for sketch."""
+
+    sketch_class = None
+
+    def __init__(self, feature, by=None, **sketch_kwargs):
+
+        self.feature = feature
+        self.by = by
+        self.columns = [feature] if by is None else [feature, by]
+        self.sketch_kwargs = sketch_kwargs
+        self.sketches = {}
+
+    def get_sketch(self, group):
+        """Get sketch for group, creating it if needed."""
+
+        if group not in self.sketches:
+            self.sketches[group] = self.sketch_class(**self.sketch_kwargs)
+
+        return self.sketches[group]
+
+    def update(self, df):
+        """Add chunk of data.
+
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            Chunk of data, with feature (and grouping feature) as columns.
+
+        Return
+        ---------
+        self : SketchAccumulator
+            Updated accumulator."""
+
+        if self.by is None:
+            self.get_sketch("total").update(df[self.feature])
+            return self
+
+        for group, values in df[self.feature].groupby(
+            df[self.by].to_numpy(), sort=False
+        ):
+            self.get_sketch(group).update(values)
+
+        return self
+
+    def merge(self, other):
+        """Add sketches of other accumulator (e.g. from other process).
+
+        Parameters
+        ----------
+        other : SketchAccumulator
+            Accumulator for same feature and grouping feature.
+
+        Return
+        ---------
+        self : SketchAccumulator
+            Merged accumulator."""
+
+        for group, sketch in other.sketches.items():
+            self.get_sketch(group).merge(sketch)
+
+        return self
+
+    def to_json(self):
+        """Get accumulator as JSON string."""
+
+        return json.dumps(
+            {
+                "feature": self.feature,
+                "by": self.by,
+                "sketch_kwargs": self.sketch_kwargs,
+                "groups": list(self.sketches.keys()),
+                "sketches": [sketch.to_dict() for sketch in self.sketches.values()],
+            }
+        )
+
+    @classmethod
+    def from_json(cls, json_string):
+        """Get accumulator from JSON string, see to_json()."""
+
+        accumulator_dict = json.loads(json_string)
+
+        accumulator = cls(
+            accumulator_dict["feature"],
+            by=accumulator_dict["by"],
+            **accumulator_dict["sketch_kwargs"]
+        )
+        accumulator.sketches = {
+            group: cls.sketch_class.from_dict(sketch_dict)
+            for group, sketch_dict in zip(
+                accumulator_dict["groups"], accumulator_dict["sketches"]
+            )
+        }
+
+        return accumulator
+
+
+class QuantileAccumulator(SketchAccumulator):
+    """Approximate quantiles of a numeric feature, see KLLSketch."""
+
+    sketch_class = KLLSketch
+
+    def result(self, quantiles=None):
+        """Get approximate quantiles.
+
+        Parameters
+        ----------
+        quantiles : list, default=None
+            Quantiles between 0 and 1. If None, use DEFAULT_QUANTILES.
+
+        Return
+        ---------
+        quantiles_df : pandas.DataFrame
+            Approximate quantiles (columns) for every group (rows)."""
+
+        quantiles = DEFAULT_QUANTILES if quantiles is None else quantiles
+
+        quantiles_df = pd.DataFrame.from_dict(
+            {
+                group: sketch.quantile(quantiles)
+                for group, sketch in self.sketches.items()
+            },
+            orient="index",
+            columns=quantiles,
+        )
+        quantiles_df.index.name = self.by
+
+        return accumulators.sort_index(quantiles_df)
+
+
+class DistinctCountAccumulator(SketchAccumulator):
+    """Approximate number of distinct values of a feature, see HyperLogLog."""
+
+    sketch_class = HyperLogLog
+
+    def result(self):
+        """Get approximate distinct counts.
+
+        Return
+        ---------
+        n_distinct : pandas.Series
+            Estimated number of distinct values for every group."""
+
+        n_distinct = pd.Series(
+            {group: sketch.count() for group, sketch in self.sketches.items()},
+            name=self.feature,
+            dtype=np.float64,
+        )
+        n_distinct.index.name = self.by
+
+        return accumulators.sort_index(n_distinct)
+
+
+def feed_in_chunks(accumulator, df, chunksize):
+    """Update accumulator with dataframe chunk by chunk and return it."""
+
+    for start in range(0, len(df), chunksize):
+        accumulator.update(df.iloc[start : start + chunksize])
+
+    return accumulator
+
+
+def compare_quantiles(df, feature, by=None, quantiles=None, k=200, chunksize=100000):
+    """Compare approximate quantiles from KLL sketch with exact pandas quantiles.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Dataframe with feature (and grouping feature).
+
+    feature : str
+        Numeric feature, e.g. "TOTAL_FLOOR_AREA".
+
+    by : str, default=None
+        Feature by which to group, e.g. "TENURE".
+
+    quantiles : list, default=None
+        Quantiles between 0 and 1. If None, use DEFAULT_QUANTILES.
+
+    k : int, default=200
+        Size of KLL sketch.
+
+    chunksize : int, default=100000
+        Number of rows per chunk fed to sketch.
+
+    Return
+    ---------
+    comparison : pandas.DataFrame
+        Exact and approximate quantile and rank error (exact rank of
+        approximate quantile minus quantile) for every group and quantile.
+        Runtimes are stored in comparison.attrs."""
+
+    quantiles = DEFAULT_QUANTILES if quantiles is None else quantiles
+    values = pd.to_numeric(df[feature], errors="coerce")
+    groups = pd.Series("total", index=df.index) if by is None else df[by]
+
+    start_time = time.time()
+    exact = values.groupby(groups.to_numpy()).quantile(quantiles).unstack()
+    exact_seconds = time.time() - start_time
+
+    start_time = time.time()
+    accumulator = feed_in_chunks(
+        QuantileAccumulator(feature, by=by, k=k), df, chunksize
+    )
+    approximate = accumulator.result(quantiles)
+    sketch_seconds = time.time() - start_time
+
+    comparisons = []
+
+    for group, group_values in values.groupby(groups.to_numpy()):
+
+        group_values = np.sort(group_values.dropna().to_numpy())
+
+        for quantile in quantiles:
+            approximate_quantile = approximate.loc[group, quantile]
+            rank = np.searchsorted(group_values, approximate_quantile, side="right")
+
+            comparisons.append(
+                {
+                    "GROUP": group,
+                    "QUANTILE": quantile,
+                    "EXACT": exact.loc[group, quantile],
+                    "APPROXIMATE": approximate_quantile,
+                    "RANK_ERROR": rank / len(group_values) - quantile,
+                }
+            )
+
+    comparison = pd.DataFrame(comparisons)
+    comparison.attrs = {
+        "exact_seconds": exact_seconds,
+        "sketch_seconds": sketch_seconds,
+    }
+
+    return comparison
+
+
+def compare_distinct_counts(df, feature, by=None, precision=14, chunksize=100000):
+    """Compare approximate distinct counts from HyperLogLog with exact pandas counts.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Dataframe with feature (and grouping feature).
+
+    feature : str
+        Feature, e.g. "BUILDING_REFERENCE_NUMBER".
+
+    by : str, default=None
+        Feature by which to group, e.g. "LOCAL_AUTHORITY".
+
+    precision : int, default=14
+        Precision of HyperLogLog sketch.
+
+    chunksize : int, default=100000
+        Number of rows per chunk fed to sketch.
+
+    Return
+    ---------
+    comparison : pandas.DataFrame
+        Exact and approximate distinct count and relative error for every group.
+        Runtimes are stored in comparison.attrs."""
+
+    groups = pd.Series("total", index=df.index) if by is None else df[by]
+
+    start_time = time.time()
+    exact = df[feature].groupby(groups.to_numpy()).nunique()
+    exact_seconds = time.time() - start_time
+
+    start_time = time.time()
+    accumulator = feed_in_chunks(
+        DistinctCountAccumulator(feature, by=by, precision=precision), df, chunksize
+    )
+    approximate = accumulator.result()
+    sketch_seconds = time.time() - start_time
+
+    comparison = pd.DataFrame(
+        {"EXACT": exact, "APPROXIMATE": approximate.reindex(exact.index)}
+    )
+    comparison["RELATIVE_ERROR"] = comparison["APPROXIMATE"] / comparison["EXACT"] - 1
+    comparison.index.name = by
+    comparison.attrs = {
+        "exact_seconds": exact_seconds,
+        "sketch_seconds": sketch_seconds,
+    }
+
+    return comparison
@@ -0,0 +1,251 @@
+# File: pipeline/spatial_join.py
+"""Spatial join of geocoded certificates with their nearest WIMD record.
+
+The WIMD points are converted to 3D unit vectors and indexed in a
+scipy.spatial.cKDTree, so nearest neighbours in straight-line (chord)
+distance are also nearest on the sphere. The tree is pickled under
+WIMD_TREE_PATH and rebuilt when the WIMD data changes.
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from epc_data_analysis import get_yaml_config, Path, PROJECT_DIR, logger
+from epc_data_analysis.getters import util_data
+from epc_data_analysis.utils import caching
+
+# ---------------------------------------------------------------------------------
+
+# Load config file
+data_config = get_yaml_config(
+    Path(str(PROJECT_DIR) + "/epc_data_analysis/config/base.yaml")
+)
+
+# Get path
+WIMD_TREE_PATH = str(PROJECT_DIR) + data_config["WIMD_TREE_PATH"]
+
+# Mean earth radius in km
+EARTH_RADIUS = 6371.0
+
+
+def get_unit_vectors(latitudes, longitudes):
+    """Convert latitudes and longitudes to 3D unit vectors.
+
+    Parameters
+    ----------
+    latitudes : numpy.ndarray
+        Latitudes in degrees.
+
+    longitudes : numpy.ndarray
+        Longitudes in degrees.
+
+    Return
+    ---------
+    unit_vectors : numpy.ndarray
+        Unit vector (x, y, z) for every point, shape (n, 3)."""
+
+    latitudes = np.radians(np.asarray(latitudes, dtype=np.float64))
+    longitudes = np.radians(np.asarray(longitudes, dtype=np.float64))
+
+    cos_latitudes = np.cos(latitudes)
+
+    return np.column_stack(
+        [
+            cos_latitudes * np.cos(longitudes),
+            cos_latitudes * np.sin(longitudes),
+            np.sin(latitudes),
+        ]
+    )
+
+
+def km_to_chord(distances):
+    """Convert great-circle distances in km to chord lengths on the unit sphere."""
+
+    return 2 * np.sin(np.asarray(distances) / (2 * EARTH_RADIUS))
+
+
+def chord_to_km(chords):
+    """Convert chord lengths on the unit sphere to great-circle distances in km."""
+
+    return 2 * EARTH_RADIUS * np.arcsin(np.clip(np.asarray(chords) / 2, 0, 1))
+
+
+def build_wimd_tree():
+    """Build KD-tree over WIMD points and store it under WIMD_TREE_PATH.
+
+    WIMD records without coordinates are not included.
+
+    Return
+    ---------
+    wimd_tree : scipy.spatial.cKDTree
+        KD-tree over unit vectors of WIMD points.
+
+    wimd_positions : numpy.ndarray
+        Row in WIMD data for every point in tree."""
+
+    signature = caching.get_file_signature(util_data.WIMD_PATH)
+    wimd_df = util_data.get_WIMD_data()
+
+    has_coordinates = (
+        wimd_df["LATITUDE"].notna() & wimd_df["LONGITUDE"].notna()
+    ).to_numpy()
+    wimd_positions = np.flatnonzero(has_coordinates)
+
+    wimd_tree = cKDTree(
+        get_unit_vectors(
+            wimd_df["LATITUDE"].to_numpy()[wimd_positions],
+            wimd_df["LONGITUDE"].to_numpy()[wimd_positions],
+        )
+    )
+
+    os.makedirs(os.path.dirname(WIMD_TREE_PATH), exist_ok=True)
+
+    # Remove sidecar first so tree is invalid while being written
+    sidecar_path = caching.get_sidecar_path(WIMD_TREE_PATH)
+    if os.path.exists(sidecar_path):
+        os.remove(sidecar_path)
+
+    with open(WIMD_TREE_PATH + ".tmp", "wb") as f:
+        pickle.dump((wimd_tree, wimd_positions), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(WIMD_TREE_PATH + ".tmp", WIMD_TREE_PATH)
+
+    caching.write_cache_metadata(WIMD_TREE_PATH, signature, ["LATITUDE", "LONGITUDE"])
+
+    return wimd_tree, wimd_positions
+
+
+def load_wimd_tree(rebuild=False):
+    """Load KD-tree over WIMD points, building it if necessary.
+
+    Parameters
+    ----------
+    rebuild : bool, default=False
+        Rebuild tree even if it is up to date.
+
+    Return
+    ---------
+    wimd_tree : scipy.spatial.cKDTree
+        KD-tree over unit vectors of WIMD points.
+
+    wimd_positions : numpy.ndarray
+        Row in WIMD data for every point in tree."""
+
+    signature = caching.get_file_signature(util_data.WIMD_PATH)
+
+    if rebuild or not caching.is_cache_valid(WIMD_TREE_PATH, signature):
+        return build_wimd_tree()
+
+    with open(WIMD_TREE_PATH, "rb") as f:
+        return pickle.load(f)
+
+
+def query_nearest(tree, latitudes, longitudes, max_distance=1.0):
+    """Find nearest tree point for every point, in a single batch query.
+
+    Parameters
+    ----------
+    tree : scipy.spatial.cKDTree
+        KD-tree over unit vectors, see get_unit_vectors().
+
+    latitudes : numpy.ndarray
+        Latitudes in degrees. Points with NaN coordinates are not matched.
+
+    longitudes : numpy.ndarray
+        Longitudes in degrees.
+
+    max_distance : float, default=1.0
+        Maximum distance in km. Points further away from any tree point are not matched.
+
+    Return
+    ---------
+    tree_positions : numpy.ndarray
+        Position of nearest tree point for every point. -1 if not matched.
+
+    distances : numpy.ndarray
+        Distance in km to nearest tree point (float32). NaN if not matched."""
+
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+
+    tree_positions = np.full(len(latitudes), -1, dtype=np.int64)
+    distances = np.full(len(latitudes), np.nan, dtype=np.float32)
+
+    has_coordinates = ~(np.isnan(latitudes) | np.isnan(longitudes))
+
+    chords, positions = tree.query(
+        get_unit_vectors(latitudes[has_coordinates], longitudes[has_coordinates]),
+        k=1,
+        distance_upper_bound=km_to_chord(max_distance),
+    )
+
+    # Points without neighbour within distance get position tree.n
+    is_matched = positions < tree.n
+    matched_rows = np.flatnonzero(has_coordinates)[is_matched]
+
+    tree_positions[matched_rows] = positions[is_matched]
+    distances[matched_rows] = chord_to_km(chords[is_matched])
+
+    return tree_positions, distances
+
+
+def add_nearest_wimd_features(epc_df, max_distance=1.0):
+    """Add features of nearest WIMD record to geocoded certificates, in place.
+
+    Columns already in the EPC dataframe (e.g. LATITUDE and LONGITUDE)
+    are not added again. WIMD_DISTANCE holds the distance in km
+    to the WIMD record.
+
+    Parameters
+    ----------
+    epc_df : pandas.DataFrame
+        EPC dataframe with LATITUDE and LONGITUDE.
+
+    max_distance : float, default=1.0
+        Maximum distance in km to nearest WIMD record.
+
+    Return
+    ---------
+    is_matched : numpy.ndarray
+        True for every row with a WIMD record within max_distance."""
+
+    # Imported here, as enrichment imports this module
+    from epc_data_analysis.pipeline import enrichment
+
+    wimd_df = util_data.get_WIMD_data()
+    wimd_tree, wimd_positions = load_wimd_tree()
+
+    tree_positions, distances = query_nearest(
+        wimd_tree,
+        epc_df["LATITUDE"].to_numpy(),
+        epc_df["LONGITUDE"].to_numpy(),
+        max_distance=max_distance,
+    )
+
+    is_matched = tree_positions != -1
+    positions = np.where(is_matched, wimd_positions[tree_positions], -1)
+
+    for column in wimd_df.columns:
+        if column == "POSTCODE" or column in epc_df.columns:
+            continue
+
+        epc_df[column] = enrichment.take_rows(wimd_df[column].array, positions)
+
+    epc_df["WIMD_DISTANCE"] = distances
+
+    logger.info(
+        "Median distance to nearest WIMD record: {:.2f} km".format(
+            np.nanmedian(distances) if is_matched.any() else np.nan
+        )
+    )
+
+    return is_matched
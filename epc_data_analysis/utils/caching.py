@@ -0,0 +1,361 @@
+# File: utils/caching.py
+"""Persistent columnar (Parquet) cache for parsed CSV files.
+
+Every cache file comes with a small JSON sidecar that records
+the signature (size and modification time) of the source file
+it was built from. If the source changes, the cache is invalid
+and gets rebuilt on the next read.
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+# ---------------------------------------------------------------------------------
+
+
+def get_file_signature(file_path):
+    """Get signature (size and modification time) of given file.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to file.
+
+    Return
+    ---------
+    signature : dict
+        File size in bytes and modification time in nanoseconds."""
+
+    file_stats = os.stat(file_path)
+
+    signature = {"size": file_stats.st_size, "mtime": file_stats.st_mtime_ns}
+
+    return signature
+
+
+def get_file_hash(file_path, block_size=2**20):
+    """Get SHA-256 hash of file content, reading the file block by block.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to file.
+
+    block_size : int, default=2**20
+        Number of bytes to read at once.
+
+    Return
+    ---------
+    file_hash : str
+        Hexadecimal SHA-256 hash."""
+
+    file_hash = hashlib.sha256()
+
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            file_hash.update(block)
+
+    return file_hash.hexdigest()
+
+
+def get_sidecar_path(cache_path):
+    """Get path to JSON sidecar holding the cache metadata.
+
+    Parameters
+    ----------
+    cache_path : str
+        Path to cache file.
+
+    Return
+    ---------
+    sidecar_path : str
+        Path to sidecar file."""
+
+    return cache_path + ".json"
+
+
+def read_cache_metadata(cache_path):
+    """Read the metadata stored with given cache file.
+
+    Parameters
+    ----------
+    cache_path : str
+        Path to cache file.
+
+    Return
+    ---------
+    metadata : dict, None
+        Cache metadata (source signature, columns and optionally dtypes).
+        None if cache or metadata does not exist."""
+
+    sidecar_path = get_sidecar_path(cache_path)
+
+    if not (os.path.exists(cache_path) and os.path.exists(sidecar_path)):
+        return None
+
+    with open(sidecar_path, "r") as f:
+        try:
+            return json.load(f)
+        except ValueError:
+            # Half-written sidecar, treat as missing
+            return None
+
+
+def is_cache_valid(cache_path, signature):
+    """Check whether cache exists and was built from source with given signature.
+
+    Parameters
+    ----------
+    cache_path : str
+        Path to cache file.
+
+    signature : dict
+        Signature of source file, as returned by get_file_signature().
+
+    Return
+    ---------
+    is_valid : bool
+        True if cache can be used, False if it needs to be (re)built."""
+
+    metadata = read_cache_metadata(cache_path)
+
+    if metadata is None:
+        return False
+
+    return metadata["signature"] == signature
+
+
+def write_cache(df, cache_path, signature, row_group_size=None, dtypes=None):
+    """Write dataframe to columnar cache and store source signature.
+
+    Files are written to a temporary location first and then moved,
+    so an interrupted write never leaves a seemingly valid cache.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Dataframe to cache.
+
+    cache_path : str
+        Path to cache file.
+
+    signature : dict
+        Signature of source file, as returned by get_file_signature().
+
+    row_group_size : int, default=None
+        Maximum number of rows per Parquet row group.
+        Smaller row groups allow reading rows by position without reading
+        the whole file, see read_cache_rows(). If None, use the pyarrow default.
+
+    dtypes : dict, default=None
+        Dtypes of columns stored in another type, e.g. as text.
+        Stored in the metadata, so readers can restore them.
+
+    Return
+    ---------
+    None"""
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+
+    # Remove sidecar first so cache is invalid while being written
+    sidecar_path = get_sidecar_path(cache_path)
+    if os.path.exists(sidecar_path):
+        os.remove(sidecar_path)
+
+    tmp_cache_path = cache_path + ".tmp"
+    df.to_parquet(tmp_cache_path, index=False, row_group_size=row_group_size)
+    os.replace(tmp_cache_path, cache_path)
+
+    write_cache_metadata(cache_path, signature, list(df.columns), dtypes=dtypes)
+
+
+def write_cache_metadata(cache_path, signature, columns, dtypes=None):
+    """Write metadata for given cache file, making the cache valid.
+
+    Only call once the cache file itself has been written completely.
+
+    Parameters
+    ----------
+    cache_path : str
+        Path to cache file.
+
+    signature : dict
+        Signature of source file, as returned by get_file_signature().
+
+    columns : list
+        Columns stored in cache.
+
+    dtypes : dict, default=None
+        Dtypes of columns stored in another type, see write_cache().
+
+    Return
+    ---------
+    None"""
+
+    sidecar_path = get_sidecar_path(cache_path)
+    metadata = {"signature": signature, "columns": columns}
+    if dtypes:
+        metadata["dtypes"] = dtypes
+
+    tmp_sidecar_path = sidecar_path + ".tmp"
+    with open(tmp_sidecar_path, "w") as f:
+        json.dump(metadata, f)
+    os.replace(tmp_sidecar_path, sidecar_path)
+
+
+def read_cache(cache_path, columns=None, dictionary_columns=None):
+    """Read dataframe from columnar cache.
+
+    Parameters
+    ----------
+    cache_path : str
+        Path to cache file.
+
+    columns : list, default=None
+        Columns to read. Only these columns are loaded from disk.
+        If None, load all columns.
+
+    dictionary_columns : list, default=None
+        Columns to read as categoricals directly from the Parquet dictionary encoding,
+        without creating a Python string per row.
+
+    Return
+    ---------
+    df : pandas.DataFrame
+        Cached dataframe. Columns are returned in the order of the
+        source file, as pandas.read_csv(usecols=...) would."""
+
+    columns, dictionary_columns = get_read_columns(
+        cache_path, columns=columns, dictionary_columns=dictionary_columns
+    )
+
+    if dictionary_columns:
+        return pd.read_parquet(
+            cache_path, columns=columns, read_dictionary=dictionary_columns
+        )
+
+    return pd.read_parquet(cache_path, columns=columns)
+
+
+def get_read_columns(cache_path, columns=None, dictionary_columns=None):
+    """Check columns to read from cache and put them in order of source file.
+
+    Parameters
+    ----------
+    cache_path : str
+        Path to cache file.
+
+    columns : list, default=None
+        Columns to read. If None, all columns.
+
+    dictionary_columns : list, default=None
+        Columns to read as categoricals.
+
+    Return
+    ---------
+    columns : list
+        Columns to read in order of source file, None for all columns.
+
+    dictionary_columns : list
+        Dictionary columns among columns to read, None if there are none given."""
+
+    metadata = read_cache_metadata(cache_path)
+
+    if columns is not None:
+
+        missing_columns = set(columns) - set(metadata["columns"])
+        if missing_columns:
+            raise ValueError(
+                "Columns {} not found in cache '{}'.".format(
+                    sorted(missing_columns), cache_path
+                )
+            )
+
+        # Keep order of source file
+        columns = [col for col in metadata["columns"] if col in set(columns)]
+
+    if dictionary_columns:
+        read_columns = metadata["columns"] if columns is None else columns
+        dictionary_columns = [col for col in read_columns if col in dictionary_columns]
+
+    return columns, dictionary_columns
+
+
+def read_cache_rows(cache_path, positions, columns=None, dictionary_columns=None):
+    """Read rows by position from columnar cache.
+
+    Only the Parquet row groups holding the given rows are read.
+
+    Parameters
+    ----------
+    cache_path : str
+        Path to cache file.
+
+    positions : numpy.ndarray
+        Row positions to read, in the order they are returned.
+
+    columns : list, default=None
+        Columns to read. If None, load all columns.
+
+    dictionary_columns : list, default=None
+        Columns to read as categoricals directly from the Parquet dictionary encoding.
+
+    Return
+    ---------
+    df : pandas.DataFrame
+        Rows at given positions, with a RangeIndex."""
+
+    columns, dictionary_columns = get_read_columns(
+        cache_path, columns=columns, dictionary_columns=dictionary_columns
+    )
+
+    parquet_file = pq.ParquetFile(cache_path, read_dictionary=dictionary_columns)
+    metadata = parquet_file.metadata
+
+    # Row range of every row group
+    row_group_sizes = np.array(
+        [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)],
+        dtype=np.int64,
+    )
+    row_group_stops = np.cumsum(row_group_sizes)
+    row_group_starts = row_group_stops - row_group_sizes
+
+    positions = np.asarray(positions, dtype=np.int64)
+    if len(positions) > 0 and (
+        positions.min() < 0 or positions.max() >= metadata.num_rows
+    ):
+        raise IndexError(
+            "Row positions out of range for cache '{}' with {} rows.".format(
+                cache_path, metadata.num_rows
+            )
+        )
+
+    # Row group of every position and row groups to read
+    position_row_groups = np.searchsorted(row_group_stops, positions, side="right")
+    row_groups = np.unique(position_row_groups)
+
+    # Positions within the table of the read row groups
+    read_sizes = row_group_sizes[row_groups]
+    read_starts = np.cumsum(read_sizes) - read_sizes
+    table_positions = (
+        read_starts[np.searchsorted(row_groups, position_row_groups)]
+        + positions
+        - row_group_starts[position_row_groups]
+    )
+
+    table = parquet_file.read_row_groups(
+        row_groups.tolist(), columns=columns, use_pandas_metadata=True
+    )
+
+    return table.take(table_positions).to_pandas()
@@ -0,0 +1,196 @@
+# File: utils/instrumentation.py
+"""Timing, throughput and memory records for data loading.
+
+Every load step (parsing one file, concatenating, ...) is recorded with
+its number of rows and bytes, duration, throughput and the peak resident
+set size (RSS) so far. Records are logged as JSON through the
+'epc_data_analysis.load_stats' logger, so they end up in info.log
+via the logging.yaml setup, and are collected in a load stats dataframe.
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+import json
+import logging
+import sys
+import time
+
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+# ---------------------------------------------------------------------------------
+
+# Child of the package logger, so it uses the handlers from logging.yaml
+stats_logger = logging.getLogger("epc_data_analysis.load_stats")
+
+LOAD_STATS_COLUMNS = [
+    "LOAD",
+    "STEP",
+    "SOURCE",
+    "N_ROWS",
+    "N_BYTES",
+    "SECONDS",
+    "ROWS_PER_S",
+    "MB_PER_S",
+    "PEAK_RSS_MB",
+]
+
+
+def get_peak_rss():
+    """Get peak resident set size of this process and its finished child processes.
+
+    Return
+    ---------
+    peak_rss : float
+        Peak RSS in MB. NaN if not available on this platform."""
+
+    if resource is None:
+        return np.nan
+
+    peak_rss = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+
+    # Bytes on macOS, kilobytes on Linux
+    if sys.platform == "darwin":
+        return peak_rss / 1e6
+
+    return peak_rss * 1024 / 1e6
+
+
+def get_load_record(step, source, n_rows, n_bytes, seconds):
+    """Get record for a single load step.
+
+    Parameters
+    ----------
+    step : str
+        Load step, e.g. 'parse' or 'concat'.
+
+    source : str
+        Source of step, e.g. local authority directory or file name.
+
+    n_rows : int
+        Number of rows loaded.
+
+    n_bytes : int
+        Number of bytes of source (NaN if unknown).
+
+    seconds : float
+        Duration of step in seconds.
+
+    Return
+    ---------
+    load_record : dict
+        Load record with throughput and peak RSS."""
+
+    load_record = {
+        "STEP": step,
+        "SOURCE": source,
+        "N_ROWS": n_rows,
+        "N_BYTES": n_bytes,
+        "SECONDS": seconds,
+        "ROWS_PER_S": n_rows / seconds if seconds > 0 else np.nan,
+        "MB_PER_S": n_bytes / 1e6 / seconds if seconds > 0 else np.nan,
+        "PEAK_RSS_MB": get_peak_rss(),
+    }
+
+    return load_record
+
+
+@contextmanager
+def timed_step(load_records, step, source, n_bytes=np.nan):
+    """Time the enclosed step and append its load record.
+
+    The number of rows is taken from the 'N_ROWS' key of the yielded dict,
+    which the enclosed code is expected to set. The enclosed code may also set
+    'N_BYTES' if the number of bytes read is only known afterwards.
+
+    Parameters
+    ----------
+    load_records : list
+        List to append load record to.
+
+    step : str
+        Load step, e.g. 'parse' or 'concat'.
+
+    source : str
+        Source of step, e.g. local authority directory or file name.
+
+    n_bytes : int, default=NaN
+        Number of bytes of source.
+
+    Return
+    ---------
+    step_info : dict
+        Dict to set 'N_ROWS' (and 'N_BYTES') in."""
+
+    step_info = {"N_ROWS": 0, "N_BYTES": n_bytes}
+    start = time.perf_counter()
+
+    yield step_info
+
+    load_records.append(
+        get_load_record(
+            step,
+            source,
+            step_info["N_ROWS"],
+            step_info["N_BYTES"],
+            time.perf_counter() - start,
+        )
+    )
+
+
+def get_load_stats(load, load_records):
+    """Collect load records in dataframe and log them.
+
+    Single records are logged at DEBUG level, the summary at INFO level.
+
+    Parameters
+    ----------
+    load : str
+        Name of load, e.g. 'load_epc_data'.
+
+    load_records : list
+        Load records as returned by get_load_record().
+
+    Return
+    ---------
+    load_stats : pandas.DataFrame
+        One row per load step, with columns LOAD_STATS_COLUMNS."""
+
+    load_stats = pd.DataFrame(load_records, columns=LOAD_STATS_COLUMNS[1:])
+    load_stats.insert(0, "LOAD", load)
+
+    for load_record in load_stats.to_dict(orient="records"):
+        stats_logger.debug(json.dumps(load_record, default=float))
+
+    seconds_per_step = load_stats.groupby("STEP", sort=False)["SECONDS"].sum()
+    peak_rss = load_stats["PEAK_RSS_MB"].max()
+    stats_logger.info(
+        json.dumps(
+            {
+                "LOAD": load,
+                "N_SOURCES": int((load_stats["STEP"] == "parse").sum()),
+                "N_ROWS": int(
+                    load_stats.loc[load_stats["STEP"] == "parse", "N_ROWS"].sum()
+                ),
+                "SECONDS": seconds_per_step.round(3).to_dict(),
+                "PEAK_RSS_MB": None if np.isnan(peak_rss) else float(peak_rss),
+            }
+        )
+    )
+
+    return load_stats
@@ -0,0 +1,248 @@
+# File: tests/conftest.py
+"""Shared fixtures: a small EPC dataset shaped like the bulk download.
+
+Every local authority directory holds a certificates.csv and recommendations.csv,
+with the quirks of the real data: columns whose inferred type differs between
+local authorities (FLOOR_LEVEL), an all-empty column (MAINS_GAS_FLAG in Westminster),
+invalid ratings, missing values and several recommendations per certificate.
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+import os
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from epc_data_analysis.getters import epc_data, postcode_index, util_data
+from epc_data_analysis.pipeline import spatial_join
+
+# ---------------------------------------------------------------------------------
+
+# Local authority code, name, number of certificates and FLOOR_LEVEL values
+LOCAL_AUTHORITIES = [
+    ("W06000015", "Cardiff", 900, ["0", "1", "2", "3"]),
+    ("W06000011", "Swansea", 700, ["Ground", "1st", "2nd", "NODATA!"]),
+    ("E09000033", "Westminster", 500, ["Basement", "Ground", "1st", "mid floor"]),
+]
+
+POSTCODES = [
+    "CF10 1AA",
+    "CF10 2BB",
+    "CF24 3CC",
+    "SA1 1DD",
+    "SA1 2EE",
+    "SW1A 1AA",
+    "SW1A 2BB",
+    "W1K 3CC",
+]
+
+HEATING_DESCRIPTIONS = [
+    "Boiler and radiators, mains gas",
+    "Boiler and radiators, oil",
+    "Air source heat pump, radiators, electric",
+    "Electric storage heaters",
+    "Community scheme",
+    None,
+]
+
+QUALITIES = ["Very Good", "Good", "Average", "Poor", "Very Poor", "N/A", None]
+
+# Postcode, latitude and longitude in the location data (ukpostcodes.csv).
+# W1K 3CC is missing and CF10 1AA appears twice, SA99 is not a valid postcode.
+LOCATIONS = [
+    ("AB10 1XG", 57.144165, -2.114848),
+    ("CF10 1AA", 51.481583, -3.179090),
+    ("CF10 2BB", 51.476200, -3.176800),
+    ("CF24 3CC", 51.488700, -3.165300),
+    ("CF10 1AA", 51.000000, -3.000000),
+    ("SA1 1DD", 51.619500, -3.943600),
+    ("SA1 2EE", 51.622100, -3.939000),
+    ("SA99", 99.999999, 0.000000),
+    ("SW1A 1AA", 51.501009, -0.141588),
+    ("SW1A 2BB", 51.503500, -0.127700),
+]
+
+IMPROVEMENTS = [
+    "Cavity wall insulation",
+    "Solar water heating",
+    "Low energy lighting",
+    "Replace boiler with new condensing boiler",
+]
+
+
+def make_certificates(code, name, n_rows, floor_levels, rng):
+    """Make certificates of one local authority."""
+
+    ratings = np.array(list("ABCDEFG") + ["INVALID!"], dtype=object)
+    rating_weights = np.array([2, 5, 20, 30, 25, 10, 7, 1]) / 100
+    lodgement_dates = pd.to_datetime(
+        rng.integers(1.2e9, 1.65e9, n_rows), unit="s"
+    ).strftime("%Y-%m-%d")
+
+    mains_gas = rng.choice(np.array(["Y", "N"], dtype=object), n_rows)
+    if name == "Westminster":
+        mains_gas[:] = None
+
+    certificates = pd.DataFrame(
+        {
+            "LMK_KEY": ["{}-{}".format(code, i) for i in range(n_rows)],
+            "POSTCODE": rng.choice(np.array(POSTCODES + [None], dtype=object), n_rows),
+            "BUILDING_REFERENCE_NUMBER": rng.integers(1, 10**6, n_rows),
+            "CURRENT_ENERGY_RATING": rng.choice(ratings, n_rows, p=rating_weights),
+            "POTENTIAL_ENERGY_RATING": rng.choice(ratings[:4], n_rows),
+            "CURRENT_ENERGY_EFFICIENCY": rng.integers(1, 100, n_rows),
+            "PROPERTY_TYPE": rng.choice(["House", "Flat", "Bungalow"], n_rows),
+            "LOCAL_AUTHORITY": code,
+            "LODGEMENT_DATE": lodgement_dates,
+            "CO2_EMISSIONS_CURRENT": rng.gamma(2, 2, n_rows).round(1),
+            "TOTAL_FLOOR_AREA": rng.gamma(5, 18, n_rows).round(2),
+            "NUMBER_HABITABLE_ROOMS": np.where(
+                rng.random(n_rows) < 0.1, np.nan, rng.integers(1, 8, n_rows)
+            ),
+            "MAINS_GAS_FLAG": mains_gas,
+            "FLOOR_LEVEL": rng.choice(floor_levels, n_rows),
+            "MAINHEAT_DESCRIPTION": rng.choice(
+                np.array(HEATING_DESCRIPTIONS, dtype=object), n_rows
+            ),
+            "MAINHEAT_ENERGY_EFF": rng.choice(
+                np.array(QUALITIES, dtype=object), n_rows
+            ),
+            "WALLS_ENERGY_EFF": rng.choice(np.array(QUALITIES, dtype=object), n_rows),
+            "TENURE": rng.choice(
+                ["owner-occupied", "rental (social)", "rental (private)", "NO DATA!"],
+                n_rows,
+            ),
+            "LOCAL_AUTHORITY_LABEL": name,
+        }
+    )
+
+    return certificates
+
+
+def make_recommendations(lmk_keys, rng):
+    """Make recommendations for some certificates, several per certificate."""
+
+    n_recommendations = rng.integers(0, 4, len(lmk_keys))
+    recommendations = pd.DataFrame(
+        {
+            "LMK_KEY": np.repeat(lmk_keys, n_recommendations),
+            "IMPROVEMENT_ITEM": np.concatenate(
+                [np.arange(1, n + 1) for n in n_recommendations]
+            ),
+            "IMPROVEMENT_SUMMARY_TEXT": rng.choice(
+                IMPROVEMENTS, n_recommendations.sum()
+            ),
+            "IMPROVEMENT_ID": rng.integers(1, 60, n_recommendations.sum()),
+            "INDICATIVE_COST": rng.choice(
+                ["£500 - £1,500", "£4,000 - £6,000"], n_recommendations.sum()
+            ),
+        }
+    )
+
+    # Not sorted by LMK_KEY, as in the bulk download
+    return recommendations.sample(frac=1, random_state=0)
+
+
+@pytest.fixture
+def epc_dataset(tmp_path, monkeypatch):
+    """Write EPC dataset (directories and ZIP) and point epc_data at it.
+
+    Return
+    ---------
+    certificates : dict
+        Certificates (as written to certificates.csv) for every directory."""
+
+    rng = np.random.default_rng(42)
+    data_path = tmp_path / "EPC"
+    zip_path = tmp_path / "epc.zip"
+    certificates = {}
+
+    with zipfile.ZipFile(zip_path, "w") as zip_file:
+        for code, name, n_rows, floor_levels in LOCAL_AUTHORITIES:
+            directory = "domestic-{}-{}".format(code, name)
+            os.makedirs(data_path / directory)
+
+            certificates[directory] = make_certificates(
+                code, name, n_rows, floor_levels, rng
+            )
+            recommendations = make_recommendations(
+                certificates[directory]["LMK_KEY"].to_numpy()[::2], rng
+            )
+
+            for file_name, df in [
+                ("certificates.csv", certificates[directory]),
+                ("recommendations.csv", recommendations),
+            ]:
+                file_path = data_path / directory / file_name
+                df.to_csv(file_path, index=False)
+                zip_file.write(
+                    file_path, "all-domestic/{}/{}".format(directory, file_name)
+                )
+
+    (data_path / "LICENCE.txt").write_text("Open Government Licence")
+
+    monkeypatch.setattr(epc_data, "epc_data_path", str(data_path) + "/")
+    monkeypatch.setattr(epc_data, "EPC_ZIP_PATH", str(zip_path))
+    monkeypatch.setattr(epc_data, "EPC_CACHE_PATH", str(tmp_path / "cache") + "/")
+    monkeypatch.setattr(
+        epc_data, "EPC_MANIFEST_PATH", str(tmp_path / "cache" / "EPC_manifest.csv")
+    )
+
+    return certificates
+
+
+@pytest.fixture
+def lookup_data(tmp_path, monkeypatch):
+    """Write location and WIMD data and point util_data and the indexes at them.
+
+    The WIMD data covers the Welsh postcodes except SA1 2EE, plus a postcode
+    without EPC certificates and a record without coordinates.
+
+    Return
+    ---------
+    paths : dict
+        Path of location data ('location') and WIMD data ('WIMD')."""
+
+    paths = {
+        "location": str(tmp_path / "ukpostcodes.csv"),
+        "WIMD": str(tmp_path / "wimd_df.csv"),
+    }
+
+    location_df = pd.DataFrame(LOCATIONS, columns=["postcode", "latitude", "longitude"])
+    location_df.insert(0, "id", np.arange(1, len(location_df) + 1))
+    location_df.to_csv(paths["location"], index=False)
+
+    wimd_df = pd.DataFrame(
+        [
+            ("CF10 1AA", 51.481583, -3.179090, 1, 1),
+            ("CF10 2BB", 51.476200, -3.176800, 412, 3),
+            ("CF24 3CC", 51.488700, -3.165300, 1037, 6),
+            ("CF5 1AB", 51.483100, -3.214500, 1895, 10),
+            ("SA1 1DD", 51.619500, -3.943600, 230, 2),
+            ("SA2 0AA", np.nan, np.nan, 765, 5),
+        ],
+        columns=["POSTCODE", "LATITUDE", "LONGITUDE", "WIMD Rank", "WIMD Decile"],
+    )
+    wimd_df.to_csv(paths["WIMD"], index=False)
+
+    monkeypatch.setattr(util_data, "LOCATION_PATH", paths["location"])
+    monkeypatch.setattr(util_data, "WIMD_PATH", paths["WIMD"])
+    monkeypatch.setattr(
+        util_data, "UTIL_DATA_CACHE_PATH", str(tmp_path / "cache") + "/"
+    )
+    monkeypatch.setattr(util_data, "_loaded_data", {})
+    monkeypatch.setattr(
+        postcode_index, "POSTCODE_INDEX_PATH", str(tmp_path / "postcode_index") + "/"
+    )
+    monkeypatch.setattr(
+        spatial_join, "WIMD_TREE_PATH", str(tmp_path / "cache" / "wimd_tree.pkl")
+    )
+
+    return paths
@@ -0,0 +1,85 @@
+# File: tests/test_accumulators.py
+"""Tests for streaming accumulators.
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from epc_data_analysis.getters import epc_data
+from epc_data_analysis.pipeline import accumulators
+
+# ---------------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_accumulators_match_pandas(epc_dataset, n_jobs):
+    """Statistics over small chunks of all directories equal pandas on all rows."""
+
+    moments, grouped_moments, histogram = accumulators.accumulate_epc_data(
+        [
+            accumulators.MomentsAccumulator("CO2_EMISSIONS_CURRENT"),
+            accumulators.GroupedMomentsAccumulator("NUMBER_HABITABLE_ROOMS", "TENURE"),
+            accumulators.HistogramAccumulator("CURRENT_ENERGY_RATING"),
+        ],
+        chunksize=128,
+        n_jobs=n_jobs,
+    )
+
+    epc_df = pd.concat(epc_dataset.values(), ignore_index=True)
+
+    # Moments of all rows
+    emissions = epc_df["CO2_EMISSIONS_CURRENT"]
+    expected = emissions.agg(["count", "sum", "mean", "std", "var", "min", "max"])
+    pd.testing.assert_series_equal(
+        moments.result(), expected, check_names=False, rtol=1e-9
+    )
+
+    # Moments by tenure, with missing values
+    grouped = epc_df.groupby("TENURE")["NUMBER_HABITABLE_ROOMS"]
+    expected = pd.DataFrame(
+        {
+            "SUM": grouped.sum(),
+            "SHARE": grouped.sum() / epc_df["NUMBER_HABITABLE_ROOMS"].sum() * 100,
+            "MEAN": grouped.mean(),
+            "COUNT": grouped.count(),
+            "SIZE": grouped.size(),
+            "STD": grouped.std(),
+            "MIN": grouped.min(),
+            "MAX": grouped.max(),
+        }
+    )
+    pd.testing.assert_frame_equal(
+        grouped_moments.result(), expected, check_index_type=False, rtol=1e-9
+    )
+
+    # Value counts, as used for plotting
+    for normalize in [False, True]:
+        pd.testing.assert_series_equal(
+            histogram.result(normalize=normalize),
+            epc_df["CURRENT_ENERGY_RATING"].value_counts(normalize=normalize),
+            check_index_type=False,
+        )
+
+
+def test_empty_accumulators(epc_dataset):
+    """Accumulators without data give the statistics of an empty dataframe."""
+
+    moments, histogram = accumulators.accumulate_epc_data(
+        [
+            accumulators.MomentsAccumulator("CO2_EMISSIONS_CURRENT"),
+            accumulators.HistogramAccumulator("TENURE"),
+        ],
+        local_authorities=["W06999999"],
+    )
+
+    statistics = moments.result()
+    assert statistics["count"] == 0 and statistics["sum"] == 0
+    assert np.isnan(statistics["mean"])
+    assert len(histogram.result()) == 0
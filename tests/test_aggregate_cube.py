@@ -0,0 +1,100 @@
+# File: tests/test_aggregate_cube.py
+"""Tests for the aggregate cube.
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from epc_data_analysis.getters import epc_data
+from epc_data_analysis.pipeline import aggregate_cube
+
+# ---------------------------------------------------------------------------------
+
+DIMENSIONS = ["TENURE", "CURRENT_ENERGY_RATING", "PROPERTY_TYPE", "LOCAL_AUTHORITY"]
+MEASURES = ["CO2_EMISSIONS_CURRENT", "TOTAL_FLOOR_AREA", "NUMBER_HABITABLE_ROOMS"]
+
+
+@pytest.fixture
+def cube_and_df(epc_dataset, tmp_path, monkeypatch):
+    """Cube of all certificates, stored and loaded again, and the certificates."""
+
+    monkeypatch.setattr(aggregate_cube, "AGGREGATE_CUBE_PATH", str(tmp_path / "cubes"))
+
+    epc_df = epc_data.load_epc_data(usecols=DIMENSIONS + MEASURES)
+    aggregate_cube.get_cube(epc_df, "all", dimensions=DIMENSIONS, measures=MEASURES)
+
+    return aggregate_cube.load_cube("all"), epc_df
+
+
+@pytest.mark.parametrize(
+    "by, filters",
+    [
+        (["TENURE"], None),
+        (["PROPERTY_TYPE", "CURRENT_ENERGY_RATING"], {"LOCAL_AUTHORITY": "W06000015"}),
+        (["LOCAL_AUTHORITY"], {"TENURE": ["owner-occupied", "rental (private)"]}),
+    ],
+)
+def test_query_matches_groupby(cube_and_df, by, filters):
+    """Rolled-up cube equals grouping the certificates with pandas."""
+
+    cube, epc_df = cube_and_df
+    result = cube.query(by=by, filters=filters)
+
+    if filters is not None:
+        for dimension, values in filters.items():
+            epc_df = epc_df[epc_df[dimension].isin(np.atleast_1d(values))]
+    grouped = epc_df.groupby(by, observed=True)
+
+    for measure in MEASURES:
+        for stat in ["SUM", "MEAN", "STD"]:
+            expected = grouped[measure].agg(stat.lower())
+            np.testing.assert_allclose(
+                result[measure + "_" + stat].to_numpy(dtype=np.float64),
+                expected.to_numpy(dtype=np.float64),
+                rtol=1e-9,
+            )
+
+    assert list(result.index.to_flat_index()) == list(
+        grouped.size().index.to_flat_index()
+    )
+    assert list(result[aggregate_cube.COUNT]) == list(grouped.size())
+    np.testing.assert_allclose(
+        result["SHARE"], grouped.size() / len(epc_df) * 100, rtol=1e-12
+    )
+
+
+def test_counts_match_pandas(cube_and_df):
+    """Value counts and crosstabs equal those of pandas."""
+
+    cube, epc_df = cube_and_df
+
+    for normalize in [False, True]:
+        counts = cube.value_counts("TENURE", normalize=normalize)
+        expected = epc_df["TENURE"].value_counts(normalize=normalize)
+        assert counts.astype(float).to_dict() == pytest.approx(
+            expected.astype(float).to_dict()
+        )
+
+    crosstab = cube.crosstab(
+        "PROPERTY_TYPE", "CURRENT_ENERGY_RATING", filters={"TENURE": "NO DATA!"}
+    )
+    tenure_df = epc_df[epc_df["TENURE"] == "NO DATA!"].reset_index(drop=True)
+    expected = pd.crosstab(
+        tenure_df["PROPERTY_TYPE"], tenure_df["CURRENT_ENERGY_RATING"]
+    )
+
+    pd.testing.assert_frame_equal(
+        crosstab.astype(np.int64),
+        expected.astype(np.int64),
+        check_names=False,
+        check_categorical=False,
+        check_index_type=False,
+        check_column_type=False,
+    )
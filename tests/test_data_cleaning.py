@@ -0,0 +1,72 @@
+# File: tests/test_data_cleaning.py
+"""Tests for data cleaning.
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+import pandas as pd
+import pytest
+
+from epc_data_analysis.pipeline import data_cleaning
+
+# ---------------------------------------------------------------------------------
+
+
+def normalise_postcodes_rowwise(postcodes):
+    """Normalise every postcode separately, as before vectorisation."""
+
+    normalised = postcodes.str.upper().str.replace(r"\s+", "", regex=True)
+    parts = normalised.str.extract("^" + data_cleaning.POSTCODE_PATTERN + "$")
+
+    return pd.DataFrame(
+        {
+            "POSTCODE": normalised.where(parts[0].notna()),
+            "POSTCODE_AREA": parts[0],
+            "POSTCODE_DISTRICT": parts[0] + parts[1],
+            "POSTCODE_SECTOR": parts[0] + parts[1] + " " + parts[2],
+        }
+    )
+
+
+@pytest.mark.parametrize("as_category", [False, True])
+def test_normalise_postcodes_matches_rowwise(epc_dataset, as_category):
+    """Normalised postcodes of the certificates equal normalising row by row."""
+
+    for certificates in epc_dataset.values():
+
+        # Add lower case, spaced and invalid variants of the certificates' postcodes
+        postcodes = pd.concat(
+            [
+                certificates["POSTCODE"],
+                certificates["POSTCODE"].str.lower(),
+                certificates["POSTCODE"].str.replace(" ", "  "),
+                certificates["POSTCODE"].str[:-1],
+            ],
+            ignore_index=True,
+        )
+        if as_category:
+            postcodes = postcodes.astype("category")
+
+        postcode_features = data_cleaning.normalise_postcodes(postcodes)
+        expected = normalise_postcodes_rowwise(postcodes.astype(object))
+
+        for feature in data_cleaning.POSTCODE_FEATURES:
+            assert isinstance(postcode_features[feature].dtype, pd.CategoricalDtype)
+            pd.testing.assert_series_equal(
+                postcode_features[feature].astype(object),
+                expected[feature].astype(object),
+            )
+
+
+def test_normalise_postcodes_keeps_no_state():
+    """Results do not depend on postcodes normalised in earlier calls."""
+
+    first = data_cleaning.normalise_postcodes(pd.Series(["cf10 1aa", "SA1 1DD"]))
+    second = data_cleaning.normalise_postcodes(pd.Series(["SA1 1DD"]))
+
+    assert list(first["POSTCODE"].cat.categories) == ["CF101AA", "SA11DD"]
+    assert list(second["POSTCODE"].cat.categories) == ["SA11DD"]
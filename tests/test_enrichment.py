@@ -0,0 +1,82 @@
+# File: tests/test_enrichment.py
+"""Tests for enriching EPC data with location and WIMD data.
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from epc_data_analysis.getters import epc_data, util_data
+from epc_data_analysis.pipeline import data_cleaning, enrichment
+
+# ---------------------------------------------------------------------------------
+
+
+@pytest.fixture
+def wales_df(epc_dataset, lookup_data):
+    """Welsh certificates, as loaded in the WIMD notebook."""
+
+    return epc_data.load_epc_data(
+        "Wales", usecols=["LMK_KEY", "POSTCODE", "CURRENT_ENERGY_RATING", "TENURE"]
+    )
+
+
+@pytest.mark.parametrize("how", ["inner", "left"])
+def test_wimd_enrichment_matches_merge(wales_df, how):
+    """Enriched certificates equal merging with the WIMD data, as before."""
+
+    # As in the notebook before enrich()
+    wimd_df = util_data.get_WIMD_data()
+    expected = pd.merge(
+        data_cleaning.reformat_postcode(wales_df),
+        data_cleaning.reformat_postcode(wimd_df),
+        on=["POSTCODE"],
+        how=how,
+    )
+
+    epc_wimd_df, match_rates = enrichment.enrich(
+        wales_df.copy(), with_location=False, how=how, return_match_rates=True
+    )
+
+    assert list(epc_wimd_df.columns) == list(expected.columns)
+    assert match_rates["WIMD"] == pytest.approx(
+        wales_df["POSTCODE"].isin(wimd_df["POSTCODE"]).mean()
+    )
+
+    # POSTCODE is not reformatted and WIMD columns of unmatched rows are missing
+    pd.testing.assert_frame_equal(
+        epc_wimd_df.drop(columns="POSTCODE").reset_index(drop=True),
+        expected.drop(columns="POSTCODE"),
+        check_dtype=False,
+        check_categorical=False,
+    )
+    if how == "inner":
+        assert epc_wimd_df["WIMD Rank"].dtype == np.int64
+    else:
+        assert epc_wimd_df["WIMD Rank"].dtype == "Int64"
+
+
+def test_location_enrichment_matches_merge(wales_df, lookup_data):
+    """Coordinates from the postcode index equal merging with the location data."""
+
+    location_df = util_data.get_location_data()
+    location_df = data_cleaning.reformat_postcode(location_df).drop_duplicates(
+        "POSTCODE"
+    )
+    expected = pd.merge(
+        data_cleaning.reformat_postcode(wales_df), location_df, on=["POSTCODE"]
+    )
+
+    epc_df = enrichment.enrich(wales_df.copy(), with_wimd=False, how="inner")
+
+    pd.testing.assert_frame_equal(
+        epc_df[["LMK_KEY", "LATITUDE", "LONGITUDE"]].reset_index(drop=True),
+        expected[["LMK_KEY", "LATITUDE", "LONGITUDE"]],
+        check_dtype=False,
+    )
@@ -0,0 +1,154 @@
+# File: tests/test_epc_analysis.py
+"""Tests for EPC analysis helpers.
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from epc_data_analysis.getters import epc_data
+from epc_data_analysis.pipeline import epc_analysis
+
+# ---------------------------------------------------------------------------------
+
+
+@pytest.fixture
+def emissions_df(epc_dataset):
+    """Certificates with emissions per floor area, without social rentals."""
+
+    epc_df = epc_data.load_epc_data(
+        usecols=[
+            "PROPERTY_TYPE",
+            "CO2_EMISSIONS_CURRENT",
+            "TOTAL_FLOOR_AREA",
+            "NUMBER_HABITABLE_ROOMS",
+            "TENURE",
+        ]
+    )
+    epc_df["CO2_EMISS_CURR_PER_FLOOR_AREA"] = (
+        epc_df["CO2_EMISSIONS_CURRENT"] / epc_df["TOTAL_FLOOR_AREA"]
+    )
+    epc_df["TENURE"] = epc_df["TENURE"].astype("category")
+
+    # Category without rows
+    return epc_df[epc_df["TENURE"] != "rental (social)"]
+
+
+@pytest.mark.parametrize("group_feature", ["TENURE", "PROPERTY_TYPE"])
+def test_group_stats_match_groupby(emissions_df, group_feature):
+    """Group sums, means and counts equal groupby, also for unobserved categories."""
+
+    features = ["CO2_EMISSIONS_CURRENT", "NUMBER_HABITABLE_ROOMS"]
+    totals, group_stats = epc_analysis.get_group_stats(
+        emissions_df, features, [group_feature]
+    )
+
+    grouped = emissions_df.groupby(group_feature, observed=False)
+
+    for feature in features:
+        stats = group_stats[(feature, group_feature)]
+
+        assert totals[feature] == pytest.approx(emissions_df[feature].sum())
+        pd.testing.assert_series_equal(
+            stats["SUM"], grouped[feature].sum(), check_names=False
+        )
+        pd.testing.assert_series_equal(
+            stats["MEAN"], grouped[feature].mean(), check_names=False
+        )
+        pd.testing.assert_series_equal(
+            stats["COUNT"], grouped[feature].count(), check_names=False
+        )
+
+    if group_feature == "TENURE":
+        assert isinstance(stats.index, pd.CategoricalIndex)
+        assert stats.loc["rental (social)", "SIZE"] == 0
+
+
+def test_emissions_info_matches_groupby(emissions_df):
+    """Emission statistics equal those computed with groupby, as before."""
+
+    emissions_dict = epc_analysis.get_emissions_info(
+        emissions_df, "CO2_EMISSIONS_CURRENT", "TENURE"
+    )
+
+    emissions = emissions_df.groupby("TENURE", observed=False)["CO2_EMISSIONS_CURRENT"]
+    total = emissions_df["CO2_EMISSIONS_CURRENT"].sum()
+    expected = {
+        "relative emissions": emissions.sum() / total * 100,
+        "absolute emissions": emissions.sum(),
+        "mean emissions": emissions.mean(),
+    }
+
+    assert emissions_dict["total"] == pytest.approx(total)
+
+    for key, expected_series in expected.items():
+        pd.testing.assert_series_equal(emissions_dict[key], expected_series)
+
+    # Division by value_counts() aligns on the index
+    by_dwelling = emissions.sum() / emissions_df["TENURE"].value_counts()
+    pd.testing.assert_series_equal(
+        emissions_dict["emisisons by dwelling"],
+        by_dwelling.reindex(expected["absolute emissions"].index),
+        check_names=False,
+    )
+
+
+def bootstrap_with_pandas(df, feature, by, n_resamples, seed):
+    """Percentile intervals of group means from resampling rows with pandas."""
+
+    df = df.dropna(subset=[feature, by])
+    means = [
+        df.sample(frac=1, replace=True, random_state=seed + i)
+        .groupby(by, observed=True)[feature]
+        .mean()
+        for i in range(n_resamples)
+    ]
+
+    return pd.concat(means, axis=1).quantile([0.025, 0.975], axis=1).T
+
+
+@pytest.mark.parametrize(
+    "feature, method",
+    [
+        ("CO2_EMISSIONS_CURRENT", "rows"),
+        ("NUMBER_HABITABLE_ROOMS", "cells"),
+        ("NUMBER_HABITABLE_ROOMS", "rows"),
+    ],
+)
+def test_bootstrap_intervals_match_pandas(emissions_df, feature, method):
+    """Estimates equal groupby and intervals agree with resampling in pandas."""
+
+    intervals = epc_analysis.get_bootstrap_intervals(
+        emissions_df, feature, "TENURE", n_resamples=2000, seed=0, method=method
+    )
+
+    valid_df = emissions_df.dropna(subset=[feature])
+    grouped = valid_df.groupby("TENURE", observed=True)[feature]
+
+    # Unobserved category is left out, as by groupby
+    assert list(intervals.index) == list(grouped.mean().index)
+    np.testing.assert_allclose(intervals["MEAN"], grouped.mean(), rtol=1e-12)
+    np.testing.assert_array_equal(intervals["COUNT"], grouped.count())
+    np.testing.assert_allclose(
+        intervals["SHARE"], grouped.count() / len(valid_df) * 100, rtol=1e-12
+    )
+
+    for statistic in ["MEAN", "SHARE"]:
+        assert (intervals[statistic + "_CI_LOWER"] <= intervals[statistic]).all()
+        assert (intervals[statistic] <= intervals[statistic + "_CI_UPPER"]).all()
+
+    # Bounds within a fifth of the interval width of the pandas bootstrap
+    expected = bootstrap_with_pandas(emissions_df, feature, "TENURE", 500, seed=0)
+    width = expected[0.975] - expected[0.025]
+    np.testing.assert_array_less(
+        (intervals["MEAN_CI_LOWER"] - expected[0.025]).abs(), 0.2 * width
+    )
+    np.testing.assert_array_less(
+        (intervals["MEAN_CI_UPPER"] - expected[0.975]).abs(), 0.2 * width
+    )
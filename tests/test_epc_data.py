@@ -0,0 +1,373 @@
+# File: tests/test_epc_data.py
+"""Tests for loading EPC certificates.
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from epc_data_analysis.getters import epc_data, epc_schema
+
+# ---------------------------------------------------------------------------------
+
+CARDIFF = "domestic-W06000015-Cardiff"
+
+
+@pytest.fixture
+def empty_directory(epc_dataset):
+    """Add directory whose certificates.csv only has a header."""
+
+    directory = "domestic-W06000099-Empty"
+    os.makedirs(epc_data.epc_data_path + directory)
+
+    columns = epc_dataset[CARDIFF].columns
+    pd.DataFrame(columns=columns).to_csv(
+        epc_data.epc_data_path + directory + "/certificates.csv", index=False
+    )
+
+    return directory
+
+
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_filter_directory_without_certificates(empty_directory, use_cache):
+    """Filtering a directory without certificates gives an empty dataframe."""
+
+    # First read builds the cache
+    epc_data.read_certificates(empty_directory, use_cache=use_cache)
+
+    epc_certs = epc_data.read_certificates(
+        empty_directory,
+        usecols=["LMK_KEY", "TENURE"],
+        filters=[("TENURE", "!=", "NO DATA!")],
+        use_cache=use_cache,
+    )
+
+    assert len(epc_certs) == 0
+    assert list(epc_certs.columns) == ["LMK_KEY", "TENURE"]
+
+
+def test_concat_without_frames():
+    """Concatenating no frames gives an empty frame with the given columns."""
+
+    df = epc_data.concat_epc_frames([], columns=["LMK_KEY", "TENURE"])
+
+    assert len(df) == 0
+    assert list(df.columns) == ["LMK_KEY", "TENURE"]
+
+
+@pytest.mark.parametrize("compact_dtypes", [False, True])
+def test_load_without_matching_directories(epc_dataset, compact_dtypes):
+    """Date filters no directory can satisfy give all schema columns."""
+
+    epc_certs = epc_data.load_epc_data(
+        filters=[("LODGEMENT_DATE", "<", "1990-01-01")], compact_dtypes=compact_dtypes
+    )
+
+    assert len(epc_certs) == 0
+    assert list(epc_certs.columns) == epc_schema.get_columns()
+
+
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_load_with_filters_matches_pandas(epc_dataset, use_cache):
+    """Filtering while reading keeps the same rows as filtering afterwards."""
+
+    usecols = ["LMK_KEY", "CO2_EMISSIONS_CURRENT", "TENURE"]
+    filters = [("TENURE", "!=", "NO DATA!"), ("LODGEMENT_DATE", ">=", "2015-01-01")]
+
+    epc_certs = epc_data.load_epc_data(
+        usecols=usecols, filters=filters, use_cache=use_cache
+    )
+
+    expected = pd.concat(
+        [
+            certificates[
+                (certificates["TENURE"] != "NO DATA!")
+                & (certificates["LODGEMENT_DATE"] >= "2015-01-01")
+            ][usecols]
+            for _, certificates in sorted(epc_dataset.items())
+        ]
+    )
+
+    pd.testing.assert_frame_equal(
+        epc_certs.reset_index(drop=True), expected.reset_index(drop=True)
+    )
+
+
+def read_csv_baseline(directory, usecols=None):
+    """Read certificates.csv of directory with pandas defaults."""
+
+    return pd.read_csv(
+        epc_data.epc_data_path + directory + "/certificates.csv",
+        usecols=usecols,
+        low_memory=False,
+    )
+
+
+def test_cache_keeps_default_dtypes(epc_dataset):
+    """Certificates read from the cache equal pandas.read_csv(), per directory."""
+
+    for directory in sorted(epc_dataset):
+
+        # First read builds the cache, second one reads it
+        for _ in range(2):
+            epc_certs = epc_data.read_certificates(directory)
+            pd.testing.assert_frame_equal(epc_certs, read_csv_baseline(directory))
+
+        chunks = list(epc_data.read_certificate_chunks(directory, chunksize=128))
+        pd.testing.assert_frame_equal(pd.concat(chunks), read_csv_baseline(directory))
+
+
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_load_compact_dtypes(epc_dataset, use_cache):
+    """Compact dtypes hold the same values as the text in the CSV files."""
+
+    usecols = ["LMK_KEY", "CURRENT_ENERGY_RATING", "MAINS_GAS_FLAG", "FLOOR_LEVEL"]
+
+    # FLOOR_LEVEL holds numbers in Cardiff, MAINS_GAS_FLAG is empty in Westminster
+    epc_certs = epc_data.load_epc_data(
+        usecols=usecols, compact_dtypes=True, use_cache=use_cache
+    )
+
+    expected = pd.concat(
+        [
+            pd.read_csv(
+                epc_data.epc_data_path + directory + "/certificates.csv",
+                usecols=usecols,
+                dtype=str,
+            )
+            for directory in sorted(epc_dataset)
+        ]
+    ).reset_index(drop=True)
+
+    for col in usecols[1:]:
+        assert isinstance(epc_certs[col].dtype, pd.CategoricalDtype)
+        assert all(isinstance(value, str) for value in epc_certs[col].cat.categories)
+        assert list(epc_certs[col].astype(object).fillna("")) == list(
+            expected[col].fillna("")
+        )
+
+
+def test_union_categoricals_of_different_types():
+    """Categoricals with number and string categories are concatenated as strings."""
+
+    frames = [
+        pd.DataFrame({"FLOOR_LEVEL": pd.Categorical([0, 1, 2, 1])}),
+        pd.DataFrame({"FLOOR_LEVEL": pd.Categorical(["Ground", "1st", None])}),
+        pd.DataFrame({"FLOOR_LEVEL": pd.Categorical([np.nan, np.nan])}),
+    ]
+
+    df = epc_data.concat_epc_frames(frames)
+
+    assert list(df["FLOOR_LEVEL"].astype(object).fillna("")) == [
+        "0",
+        "1",
+        "2",
+        "1",
+        "Ground",
+        "1st",
+        "",
+        "",
+        "",
+    ]
+
+
+@pytest.mark.parametrize("operator_str", ["<", "<=", ">", ">="])
+def test_filter_ratings_with_compact_dtypes(epc_dataset, operator_str):
+    """Ordering filters on compacted ratings keep the same rows as on strings."""
+
+    filters = [("CURRENT_ENERGY_RATING", operator_str, "C")]
+
+    epc_certs = epc_data.load_epc_data(
+        usecols=["LMK_KEY", "CURRENT_ENERGY_RATING"],
+        filters=filters,
+        compact_dtypes=True,
+    )
+    expected = epc_data.load_epc_data(
+        usecols=["LMK_KEY", "CURRENT_ENERGY_RATING"], filters=filters
+    )
+
+    assert epc_certs["CURRENT_ENERGY_RATING"].cat.ordered
+    assert list(epc_certs["LMK_KEY"]) == list(expected["LMK_KEY"])
+    assert list(epc_certs["CURRENT_ENERGY_RATING"].astype(object)) == list(
+        expected["CURRENT_ENERGY_RATING"]
+    )
+
+
+def test_filter_ordered_categorical_with_unknown_value():
+    """Comparing an ordered categorical with a value not in its categories fails."""
+
+    df = epc_schema.apply_schema(pd.DataFrame({"CURRENT_ENERGY_RATING": ["A", "C"]}))
+
+    with pytest.raises(IOError, match="not a category"):
+        epc_data.apply_filters(df, [("CURRENT_ENERGY_RATING", "<", "H")])
+
+
+def test_cache_rebuilt_when_certificates_change(epc_dataset):
+    """A changed certificates.csv invalidates its cache, others are kept."""
+
+    csv_path = epc_data.epc_data_path + CARDIFF + "/certificates.csv"
+    cache_path = epc_data.get_cache_path(CARDIFF)
+
+    epc_data.load_epc_data(usecols=["LMK_KEY"])
+    assert os.path.exists(cache_path)
+
+    # New release: fewer certificates, later modification time
+    cache_mtimes = {
+        directory: os.path.getmtime(epc_data.get_cache_path(directory))
+        for directory in epc_dataset
+    }
+    epc_dataset[CARDIFF][:300].to_csv(csv_path, index=False)
+    os.utime(csv_path, ns=(os.stat(csv_path).st_mtime_ns + 10**9,) * 2)
+
+    epc_certs = epc_data.load_epc_data(usecols=["LMK_KEY"])
+    assert len(epc_certs) == sum(map(len, epc_dataset.values())) - 600
+
+    epc_certs = epc_data.read_certificates(CARDIFF)
+    pd.testing.assert_frame_equal(epc_certs, read_csv_baseline(CARDIFF))
+
+    for directory, cache_mtime in cache_mtimes.items():
+        is_rebuilt = os.path.getmtime(epc_data.get_cache_path(directory)) != cache_mtime
+        assert is_rebuilt == (directory == CARDIFF)
+
+
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_parallel_load_matches_serial(epc_dataset, use_cache):
+    """Loading directories in parallel gives the same dataframe as one by one."""
+
+    usecols = ["LMK_KEY", "CURRENT_ENERGY_RATING", "FLOOR_LEVEL", "MAINS_GAS_FLAG"]
+
+    parallel_certs = epc_data.load_epc_data(
+        usecols=usecols, n_jobs=2, use_cache=use_cache
+    )
+    serial_certs = epc_data.load_epc_data(
+        usecols=usecols, n_jobs=1, use_cache=use_cache
+    )
+
+    pd.testing.assert_frame_equal(parallel_certs, serial_certs)
+    pd.testing.assert_frame_equal(
+        parallel_certs.reset_index(drop=True),
+        pd.concat(
+            [read_csv_baseline(directory, usecols) for directory in sorted(epc_dataset)]
+        ).reset_index(drop=True),
+    )
+
+
+@pytest.mark.parametrize("read_ahead", [False, True])
+def test_chunks_match_certificates(epc_dataset, read_ahead):
+    """Chunks of at most chunksize rows add up to the filtered certificates."""
+
+    usecols = ["LMK_KEY", "CURRENT_ENERGY_RATING"]
+    filters = [("TENURE", "==", "owner-occupied")]
+
+    # Read CSV files, then the caches built in between
+    for use_cache in [False, True]:
+        chunks = {}
+        for directory, chunk in epc_data.iter_epc_data(
+            usecols=usecols,
+            chunksize=256,
+            use_cache=use_cache,
+            read_ahead=read_ahead,
+            filters=filters,
+        ):
+            assert list(chunk.columns) == usecols
+            chunks.setdefault(directory, []).append(chunk)
+
+        assert list(chunks) == sorted(epc_dataset)
+
+        for directory, certificates in epc_dataset.items():
+            # Filters are applied per chunk, so the number of chunks is kept
+            n_chunks = -(-len(certificates) // 256)
+            assert len(chunks[directory]) == n_chunks
+
+            expected = read_csv_baseline(directory)
+            expected = expected[expected["TENURE"] == "owner-occupied"][usecols]
+            pd.testing.assert_frame_equal(pd.concat(chunks[directory]), expected)
+
+        # Build caches
+        epc_data.load_epc_data(usecols=["LMK_KEY"])
+
+
+def test_manifest_plans_date_filtered_load(epc_dataset):
+    """Manifest statistics equal pandas, and out-of-range directories are skipped."""
+
+    manifest = epc_data.get_epc_manifest().set_index("DIRECTORY")
+
+    for directory, certificates in epc_dataset.items():
+        assert manifest.at[directory, "N_ROWS"] == len(certificates)
+        assert manifest.at[directory, "COLUMNS"] == "|".join(certificates.columns)
+        assert manifest.at[directory, "MIN_LODGEMENT_DATE"] == (
+            certificates["LODGEMENT_DATE"].min()
+        )
+        assert manifest.at[directory, "MAX_LODGEMENT_DATE"] == (
+            certificates["LODGEMENT_DATE"].max()
+        )
+
+    # Cardiff only has certificates lodged before 2012 in the new release
+    certificates = epc_dataset[CARDIFF]
+    certificates = certificates[certificates["LODGEMENT_DATE"] < "2012-01-01"]
+    csv_path = epc_data.epc_data_path + CARDIFF + "/certificates.csv"
+    certificates.to_csv(csv_path, index=False)
+    os.utime(csv_path, ns=(os.stat(csv_path).st_mtime_ns + 10**9,) * 2)
+
+    filters = [("LODGEMENT_DATE", ">=", "2012-01-01")]
+    assert epc_data.plan_epc_load(filters=filters) == sorted(
+        directory for directory in epc_dataset if directory != CARDIFF
+    )
+
+    epc_certs = epc_data.load_epc_data(usecols=["LMK_KEY"], filters=filters)
+    expected = epc_data.load_epc_data(
+        usecols=["LMK_KEY"], filters=filters, use_manifest=False
+    )
+    pd.testing.assert_frame_equal(epc_certs, expected)
+
+
+@pytest.mark.parametrize("compact_dtypes", [False, True])
+def test_zip_matches_directories(epc_dataset, compact_dtypes):
+    """Certificates read from the ZIP equal those read from the directories."""
+
+    zip_certs = epc_data.load_epc_data(from_zip=True, compact_dtypes=compact_dtypes)
+    directory_certs = epc_data.load_epc_data(compact_dtypes=compact_dtypes)
+
+    pd.testing.assert_frame_equal(zip_certs, directory_certs)
+
+    # Both sources have their own cache
+    zip_cache_path = epc_data.get_cache_path(CARDIFF, from_zip=True)
+    assert zip_cache_path != epc_data.get_cache_path(CARDIFF)
+    assert os.path.exists(zip_cache_path)
+
+    # Loading from the ZIP does not need the extracted directories
+    os.rename(epc_data.epc_data_path, epc_data.epc_data_path[:-1] + "_moved")
+
+    zip_certs = epc_data.load_epc_data(from_zip=True, compact_dtypes=compact_dtypes)
+    pd.testing.assert_frame_equal(zip_certs, directory_certs)
+
+
+def test_load_stats_record_every_directory(epc_dataset):
+    """Load stats hold rows and bytes of every certificates.csv and the concat."""
+
+    epc_certs, load_stats = epc_data.load_epc_data(
+        usecols=["LMK_KEY"], n_jobs=2, return_stats=True
+    )
+
+    assert list(load_stats["STEP"]) == ["parse"] * len(epc_dataset) + ["concat"]
+
+    parse_stats = load_stats[load_stats["STEP"] == "parse"].set_index("SOURCE")
+    for directory in epc_dataset:
+        csv_path = epc_data.epc_data_path + directory + "/certificates.csv"
+        assert parse_stats.at[directory, "N_ROWS"] == len(read_csv_baseline(directory))
+        assert parse_stats.at[directory, "N_BYTES"] == os.path.getsize(csv_path)
+
+    assert load_stats["N_ROWS"].iloc[-1] == len(epc_certs)
+    assert (load_stats["SECONDS"] >= 0).all()
+    assert np.allclose(
+        parse_stats["MB_PER_S"],
+        parse_stats["N_BYTES"] / 1e6 / parse_stats["SECONDS"],
+    )
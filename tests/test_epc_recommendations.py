@@ -0,0 +1,90 @@
+# File: tests/test_epc_recommendations.py
+"""Tests for loading and looking up EPC recommendations.
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from epc_data_analysis.getters import epc_data, epc_recommendations
+
+# ---------------------------------------------------------------------------------
+
+
+def read_all_recommendations(directories):
+    """Read recommendations.csv of all directories with pandas."""
+
+    return pd.concat(
+        [
+            pd.read_csv(epc_data.epc_data_path + directory + "/recommendations.csv")
+            for directory in directories
+        ],
+        ignore_index=True,
+    )
+
+
+def to_comparable(recommendations):
+    """Sort recommendations and turn compact dtypes into plain values."""
+
+    return (
+        recommendations.astype({"IMPROVEMENT_ID": np.float64})
+        .astype(object)
+        .sort_values(["LMK_KEY", "IMPROVEMENT_ITEM"])
+        .reset_index(drop=True)
+    )
+
+
+@pytest.mark.parametrize("from_zip", [False, True])
+def test_lookup_matches_merge(epc_dataset, from_zip):
+    """Indexed lookup gives the same recommendations as merging with pandas."""
+
+    certificates = pd.concat(epc_dataset.values(), ignore_index=True)
+    epc_df = certificates.sample(300, random_state=1)[["LMK_KEY", "TENURE"]]
+
+    # Certificate from another release, without recommendations
+    lmk_keys = list(epc_df["LMK_KEY"]) + ["W06000015-999999"]
+
+    recommendations_index = epc_recommendations.load_recommendations_index(
+        from_zip=from_zip
+    )
+    recommendations = epc_recommendations.get_recommendations(
+        lmk_keys, recommendations_index=recommendations_index, from_zip=from_zip
+    )
+
+    all_recommendations = read_all_recommendations(epc_dataset)
+    expected = epc_df[["LMK_KEY"]].merge(all_recommendations, on="LMK_KEY")
+
+    assert list(recommendations.columns) == list(all_recommendations.columns)
+    pd.testing.assert_frame_equal(
+        to_comparable(recommendations), to_comparable(expected)
+    )
+
+
+def test_load_recommendations_matches_pandas(epc_dataset):
+    """All recommendations of Wales equal the recommendations.csv files."""
+
+    directories = epc_data.get_epc_directories("Wales")
+
+    recommendations = epc_recommendations.load_epc_recommendations("Wales")
+
+    pd.testing.assert_frame_equal(
+        to_comparable(recommendations),
+        to_comparable(read_all_recommendations(directories)),
+    )
+
+    # Several lookups with the same index, also without any hits
+    recommendations_index = epc_recommendations.load_recommendations_index("Wales")
+    for lmk_keys in [["W06000011-0"], ["W06000015-1", "W06000011-2"], []]:
+        lookup = epc_recommendations.get_recommendations(
+            lmk_keys, recommendations_index=recommendations_index
+        )
+        assert set(lookup["LMK_KEY"]) <= set(lmk_keys)
+        assert list(lookup.dtypes.astype(str)) == list(
+            recommendations.dtypes.astype(str)
+        )
@@ -0,0 +1,169 @@
+# File: tests/test_feature_engineering.py
+"""Tests for feature engineering.
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+import json
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from epc_data_analysis.getters import epc_data
+from epc_data_analysis.pipeline import feature_engineering
+
+# ---------------------------------------------------------------------------------
+
+
+def get_descriptions(worker, n_descriptions=200):
+    """Get heating descriptions, distinct for every worker."""
+
+    return [
+        "Boiler and radiators, mains gas {} {}".format(worker, i)
+        for i in range(n_descriptions)
+    ]
+
+
+def classify_in_process(worker):
+    """Get heating features in a fresh process with a cold in-memory cache."""
+
+    feature_engineering._heating_classes = None
+    df = pd.DataFrame({"MAINHEAT_DESCRIPTION": get_descriptions(worker)})
+    feature_engineering.get_heating_features(df)
+
+    return worker
+
+
+def test_save_heating_classes_concurrently(tmp_path, monkeypatch):
+    """Processes saving heating classes at the same time keep all classes."""
+
+    monkeypatch.setattr(
+        feature_engineering,
+        "HEATING_CLASSES_PATH",
+        str(tmp_path / "heating_classes.json"),
+    )
+
+    n_workers = 8
+    context = multiprocessing.get_context("fork")
+    with context.Pool(n_workers) as pool:
+        pool.map(classify_in_process, range(n_workers))
+
+    with open(feature_engineering.HEATING_CLASSES_PATH) as f:
+        heating_cache = json.load(f)
+
+    expected = {
+        description
+        for worker in range(n_workers)
+        for description in get_descriptions(worker)
+    }
+    assert set(heating_cache["classes"]) == expected
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def classify_heating_rowwise(descriptions, fine_grained_HP_types):
+    """Classify every heating description separately, as before the cache."""
+
+    system_types, source_types = [], []
+    for heating in descriptions:
+        system_type, source_type = (
+            ("unknown", "unknown")
+            if pd.isnull(heating)
+            else feature_engineering.classify_heating(heating)
+        )
+        if not fine_grained_HP_types and "heat pump" in system_type:
+            system_type = "heat pump"
+        system_types.append(system_type)
+        source_types.append(source_type)
+
+    return system_types, source_types
+
+
+@pytest.mark.parametrize("fine_grained_HP_types", [False, True])
+def test_heating_features_match_rowwise(
+    epc_dataset, tmp_path, monkeypatch, fine_grained_HP_types
+):
+    """Heating features equal classifying row by row, with cold and warm cache."""
+
+    monkeypatch.setattr(
+        feature_engineering,
+        "HEATING_CLASSES_PATH",
+        str(tmp_path / "heating_classes.json"),
+    )
+    monkeypatch.setattr(feature_engineering, "_heating_classes", None)
+
+    for certificates in epc_dataset.values():
+
+        # Upper case variants are distinct descriptions with the same classes
+        df = pd.DataFrame(
+            {
+                "MAINHEAT_DESCRIPTION": pd.concat(
+                    [
+                        certificates["MAINHEAT_DESCRIPTION"],
+                        certificates["MAINHEAT_DESCRIPTION"].str.upper(),
+                    ],
+                    ignore_index=True,
+                )
+            }
+        )
+        system_types, source_types = classify_heating_rowwise(
+            df["MAINHEAT_DESCRIPTION"], fine_grained_HP_types
+        )
+
+        # Second run reads the classes saved by the first one
+        for _ in range(2):
+            heating_df = feature_engineering.get_heating_features(
+                df.copy(), fine_grained_HP_types=fine_grained_HP_types
+            )
+            assert list(heating_df["HEATING_SYSTEM"]) == system_types
+            assert list(heating_df["HEATING_SOURCE"]) == source_types
+            feature_engineering._heating_classes = None
+
+
+def test_map_quality_to_number_missing_values():
+    """Missing and unknown qualities are <NA> in a nullable Int8 column."""
+
+    df = pd.DataFrame(
+        {"MAINHEAT_ENERGY_EFF": ["Very Good", None, "Average", "N/A", "Very Poor"]}
+    )
+    expected = df["MAINHEAT_ENERGY_EFF"].map(feature_engineering.QUALITY_SCALE)
+
+    df = feature_engineering.map_quality_to_number(df, ["MAINHEAT_ENERGY_EFF"])
+
+    values = df["MAINHEAT_ENERGY_EFF_AS_NUM"]
+    assert values.dtype == "Int8"
+    np.testing.assert_array_equal(values.isna(), [False, True, False, True, False])
+    np.testing.assert_array_equal(
+        values.to_numpy(dtype=np.float64, na_value=np.nan), expected
+    )
+    assert values.mean() == expected.mean()
+
+
+@pytest.mark.parametrize("compact_dtypes", [False, True])
+def test_rating_features_match_pandas(epc_dataset, compact_dtypes):
+    """Rating features of text or ordered categorical ratings equal Series.map()."""
+
+    epc_df = epc_data.load_epc_data(
+        usecols=["CURRENT_ENERGY_RATING", "POTENTIAL_ENERGY_RATING"],
+        compact_dtypes=compact_dtypes,
+    )
+    epc_df = feature_engineering.get_new_EPC_rating_features(epc_df, drop_invalid=False)
+
+    current = epc_df["CURRENT_ENERGY_RATING"].astype(object)
+    potential = epc_df["POTENTIAL_ENERGY_RATING"].astype(object)
+    expected_current = current.map(feature_engineering.RATING_SCALE)
+    expected_diff = potential.map(feature_engineering.RATING_SCALE) - expected_current
+
+    for feature, expected in [
+        ("CURR_ENERGY_RATING_NUM", expected_current),
+        ("DIFF_POT_ENERGY_RATING", expected_diff),
+    ]:
+        assert epc_df[feature].dtype == "Int8"
+        np.testing.assert_array_equal(
+            epc_df[feature].to_numpy(dtype=np.float64, na_value=np.nan), expected
+        )
@@ -0,0 +1,94 @@
+# File: tests/test_feature_store.py
+"""Tests for the feature store.
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from epc_data_analysis.getters import epc_data
+from epc_data_analysis.pipeline import enrichment, feature_engineering, feature_store
+
+# ---------------------------------------------------------------------------------
+
+USECOLS = [
+    "LMK_KEY",
+    "POSTCODE",
+    "CURRENT_ENERGY_RATING",
+    "POTENTIAL_ENERGY_RATING",
+    "MAINHEAT_DESCRIPTION",
+]
+
+
+@pytest.fixture
+def store_path(tmp_path, monkeypatch):
+    """Point feature store and heating classes at temporary directory."""
+
+    monkeypatch.setattr(
+        feature_store, "FEATURE_STORE_PATH", str(tmp_path / "feature_store") + "/"
+    )
+    monkeypatch.setattr(
+        feature_engineering,
+        "HEATING_CLASSES_PATH",
+        str(tmp_path / "heating_classes.json"),
+    )
+    monkeypatch.setattr(feature_engineering, "_heating_classes", None)
+
+    return feature_store.FEATURE_STORE_PATH
+
+
+def compute_features(subset):
+    """Load certificates and apply the default feature functions and WIMD data."""
+
+    epc_df = epc_data.load_epc_data(subset=subset, usecols=USECOLS)
+    epc_df = feature_engineering.get_new_EPC_rating_features(epc_df)
+    epc_df = feature_engineering.get_heating_features(epc_df)
+    epc_df = enrichment.enrich(epc_df, with_location=False, how="inner")
+
+    return epc_df.reset_index(drop=True)
+
+
+def test_stored_features_match_computed(
+    epc_dataset, lookup_data, store_path, monkeypatch
+):
+    """Features read from the store equal computing them, until a source changes."""
+
+    expected = compute_features("Wales")
+
+    # Count how often the certificates are loaded by the store
+    load_epc_data = epc_data.load_epc_data
+    n_loads = []
+
+    def counting_load_epc_data(*args, **kwargs):
+        n_loads.append(1)
+        return load_epc_data(*args, **kwargs)
+
+    monkeypatch.setattr(epc_data, "load_epc_data", counting_load_epc_data)
+
+    # Miss, then hit
+    for _ in range(2):
+        epc_df = feature_store.get_features("Wales", usecols=USECOLS, with_wimd=True)
+        pd.testing.assert_frame_equal(epc_df, expected)
+
+    assert len(n_loads) == 1
+
+    # Changed WIMD data is a new entry
+    wimd_df = pd.read_csv(lookup_data["WIMD"])
+    wimd_df["WIMD Decile"] = 11 - wimd_df["WIMD Decile"]
+    wimd_df.to_csv(lookup_data["WIMD"], index=False)
+
+    epc_df = feature_store.get_features("Wales", usecols=USECOLS, with_wimd=True)
+
+    assert len(n_loads) == 2
+    assert list(epc_df["WIMD Decile"]) == list(11 - expected["WIMD Decile"])
+    pd.testing.assert_frame_equal(
+        epc_df.drop(columns="WIMD Decile"), expected.drop(columns="WIMD Decile")
+    )
+    assert len(list(Path(store_path).glob("*.parquet"))) == 2
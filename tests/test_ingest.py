@@ -0,0 +1,85 @@
+# File: tests/test_ingest.py
+"""Tests for incremental ingestion of EPC releases.
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+from functools import partial
+
+import pandas as pd
+import pytest
+
+from epc_data_analysis.getters import epc_data
+from epc_data_analysis.pipeline import ingest
+
+# ---------------------------------------------------------------------------------
+
+
+def keep_tenure(df, tenure):
+    """Keep certificates with given tenure."""
+
+    return df[df["TENURE"] == tenure]
+
+
+@pytest.fixture
+def processed_path(epc_dataset, tmp_path, monkeypatch):
+    """Point processed data store at temporary directory."""
+
+    monkeypatch.setattr(
+        ingest, "PROCESSED_DATA_PATH", str(tmp_path / "processed") + "/"
+    )
+
+
+@pytest.mark.parametrize("from_zip", [False, True])
+def test_ingest_matches_pandas(epc_dataset, processed_path, from_zip):
+    """Ingested data equals processing every certificates.csv with pandas."""
+
+    summary = ingest.ingest_epc_release(from_zip=from_zip)
+
+    assert summary["new"] == sorted(epc_dataset)
+
+    for directory in sorted(epc_dataset):
+        expected = ingest.process_certificates(
+            pd.read_csv(
+                epc_data.epc_data_path + directory + "/certificates.csv",
+                low_memory=False,
+            )
+        )
+        pd.testing.assert_frame_equal(
+            pd.read_parquet(ingest.get_processed_path(directory)),
+            expected.reset_index(drop=True),
+        )
+
+    # Nothing to do for the same release
+    summary = ingest.ingest_epc_release(from_zip=from_zip)
+    assert summary["unchanged"] == sorted(epc_dataset)
+
+    wales = ingest.load_processed_data("Wales", columns=["LMK_KEY"])
+    assert list(wales["LMK_KEY"].str[:3]) == ["W06"] * len(wales)
+
+
+def test_ingest_with_partial(epc_dataset, processed_path):
+    """Changing the arguments of a partial reprocesses all directories."""
+
+    for tenure in ["owner-occupied", "owner-occupied", "rental (social)"]:
+        summary = ingest.ingest_epc_release(
+            process_function=partial(keep_tenure, tenure=tenure)
+        )
+
+    assert summary["new"] == sorted(epc_dataset)
+
+    processed = ingest.load_processed_data(columns=["LMK_KEY", "TENURE"])
+    expected = pd.concat(
+        [
+            keep_tenure(certificates, "rental (social)")[["LMK_KEY", "TENURE"]]
+            for _, certificates in sorted(epc_dataset.items())
+        ]
+    )
+
+    pd.testing.assert_frame_equal(
+        processed.reset_index(drop=True), expected.reset_index(drop=True)
+    )
@@ -0,0 +1,133 @@
+# File: tests/test_parallel_features.py
+"""Tests for parallel feature engineering.
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from epc_data_analysis.getters import epc_data
+from epc_data_analysis.pipeline import feature_engineering, parallel_features
+
+# ---------------------------------------------------------------------------------
+
+
+def get_epc_df(n_rows=40000, n_descriptions=2000, seed=0):
+    """Get EPC dataframe with many distinct heating descriptions."""
+
+    rng = np.random.default_rng(seed)
+    descriptions = np.array(
+        [
+            "{}, {} {}".format(system, source, i)
+            for i, (system, source) in enumerate(
+                zip(
+                    rng.choice(
+                        ["Boiler and radiators", "Air source heat pump"], n_descriptions
+                    ),
+                    rng.choice(["mains gas", "oil", "electric"], n_descriptions),
+                )
+            )
+        ],
+        dtype=object,
+    )
+    ratings = np.array(list("ABCDEFG"), dtype=object)
+
+    return pd.DataFrame(
+        {
+            "CURRENT_ENERGY_RATING": rng.choice(ratings, n_rows),
+            "POTENTIAL_ENERGY_RATING": rng.choice(ratings, n_rows),
+            "MAINHEAT_DESCRIPTION": rng.choice(descriptions, n_rows),
+        }
+    )
+
+
+def test_run_feature_functions_with_cold_cache(tmp_path, monkeypatch):
+    """Parallel run with a cold heating class cache matches the serial run."""
+
+    monkeypatch.setattr(
+        feature_engineering,
+        "HEATING_CLASSES_PATH",
+        str(tmp_path / "heating_classes.json"),
+    )
+    monkeypatch.setattr(feature_engineering, "_heating_classes", None)
+
+    epc_df = get_epc_df()
+    parallel_df = parallel_features.run_feature_functions(epc_df.copy(), n_jobs=8)
+
+    serial_df = epc_df.copy()
+    for feature_function in parallel_features.DEFAULT_FEATURE_FUNCTIONS:
+        serial_df = feature_function(serial_df)
+
+    for column in ["CURR_ENERGY_RATING_NUM", "DIFF_POT_ENERGY_RATING"]:
+        np.testing.assert_array_equal(parallel_df[column], serial_df[column])
+
+    for column in ["ENERGY_RATING_CAT", "HEATING_SYSTEM", "HEATING_SOURCE"]:
+        np.testing.assert_array_equal(
+            parallel_df[column].astype(object), serial_df[column].astype(object)
+        )
+
+    assert (tmp_path / "heating_classes.json").exists()
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def get_floor_level_number(df):
+    """Get FLOOR_LEVEL as number, NaN for levels like 'Ground'."""
+
+    df["FLOOR_LEVEL_NUM"] = pd.to_numeric(df["FLOOR_LEVEL"], errors="coerce")
+
+    return df
+
+
+@pytest.fixture
+def heating_classes_path(tmp_path, monkeypatch):
+    """Point heating class cache at temporary file."""
+
+    monkeypatch.setattr(
+        feature_engineering,
+        "HEATING_CLASSES_PATH",
+        str(tmp_path / "heating_classes.json"),
+    )
+    monkeypatch.setattr(feature_engineering, "_heating_classes", None)
+
+
+def test_serial_and_parallel_run_match(epc_dataset, heating_classes_path):
+    """Serial and parallel runs add the same columns to df in place."""
+
+    usecols = [
+        "CURRENT_ENERGY_RATING",
+        "POTENTIAL_ENERGY_RATING",
+        "MAINHEAT_DESCRIPTION",
+    ]
+    epc_df = epc_data.load_epc_data(usecols=usecols)
+
+    results = {}
+    for n_jobs in [1, 2]:
+        df = epc_df.copy()
+        results[n_jobs] = parallel_features.run_feature_functions(
+            df, n_jobs=n_jobs, block_size=500
+        )
+
+        assert results[n_jobs] is df
+        pd.testing.assert_frame_equal(df[usecols], epc_df)
+
+    pd.testing.assert_frame_equal(results[1], results[2])
+
+
+def test_block_with_other_dtype_fails(epc_dataset):
+    """Outputs whose dtype differs from the sample's in some block raise an error."""
+
+    # FLOOR_LEVEL is only numeric in Cardiff, which the sample does not reach
+    epc_df = epc_data.load_epc_data(usecols=["LMK_KEY", "FLOOR_LEVEL"])
+    sample_df = get_floor_level_number(epc_df[:1000].copy())
+    assert sample_df["FLOOR_LEVEL_NUM"].dtype == np.float64
+
+    with pytest.raises(IOError, match="FLOOR_LEVEL_NUM"):
+        parallel_features.run_feature_functions(
+            epc_df, [get_floor_level_number], n_jobs=2, block_size=500
+        )
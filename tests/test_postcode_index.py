@@ -0,0 +1,67 @@
+# File: tests/test_postcode_index.py
+"""Tests for the binary postcode index.
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from epc_data_analysis.getters import postcode_index
+
+# ---------------------------------------------------------------------------------
+
+
+def test_lookup_matches_merge(epc_dataset, lookup_data):
+    """Index lookup gives the coordinates of merging with the location data."""
+
+    certificates = pd.concat(epc_dataset.values(), ignore_index=True)
+
+    # Postcodes as in the certificates, in lower case and without space
+    postcodes = pd.concat(
+        [
+            certificates["POSTCODE"],
+            certificates["POSTCODE"].str.lower(),
+            certificates["POSTCODE"].str.replace(" ", ""),
+        ],
+        ignore_index=True,
+    )
+
+    location_index = postcode_index.load_postcode_index()
+    latitudes, longitudes = location_index.lookup(postcodes)
+
+    # Merge on normalised postcodes, keeping the first entry for duplicates
+    location_df = pd.read_csv(lookup_data["location"])
+    location_df["KEY"] = location_df["postcode"].str.replace(" ", "")
+    location_df = location_df.drop_duplicates("KEY")
+    expected = (
+        postcodes.str.upper()
+        .str.replace(" ", "")
+        .rename("KEY")
+        .to_frame()
+        .merge(location_df, on="KEY", how="left")
+    )
+
+    np.testing.assert_array_equal(
+        latitudes, expected["latitude"].to_numpy(dtype=np.float32)
+    )
+    np.testing.assert_array_equal(
+        longitudes, expected["longitude"].to_numpy(dtype=np.float32)
+    )
+    is_unmatched = certificates["POSTCODE"].isna() | (
+        certificates["POSTCODE"] == "W1K 3CC"
+    )
+    assert np.isnan(latitudes).sum() == 3 * is_unmatched.sum()
+
+    # Stored index is reused until the location data changes
+    assert len(location_index) == len(location_df)
+    keys_path = postcode_index.get_index_array_path("keys")
+    modified = os.path.getmtime(keys_path)
+    postcode_index.load_postcode_index()
+    assert os.path.getmtime(keys_path) == modified
@@ -0,0 +1,111 @@
+# File: tests/test_rule_engine.py
+"""Tests for the description rule engine.
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from epc_data_analysis.pipeline import feature_engineering, rule_engine
+
+# ---------------------------------------------------------------------------------
+
+
+def get_hotwater_fuel(descriptions):
+    """Get HOTWATER_FUEL for hot water descriptions."""
+
+    df = pd.DataFrame({"HOTWATER_DESCRIPTION": descriptions})
+    rule_engine.apply_description_rules(df, columns=["HOTWATER_DESCRIPTION"])
+
+    return list(df["HOTWATER_FUEL"].astype(object))
+
+
+def test_hotwater_fuel_matches_heating_source():
+    """Hot water fuel agrees with the heating source from classify_heating()."""
+
+    fuels = ["mains gas", "LPG", "oil", "electric"]
+
+    hotwater_fuels = get_hotwater_fuel(
+        ["From main system, {}".format(fuel) for fuel in fuels]
+    )
+    heating_sources = [
+        feature_engineering.classify_heating("Boiler and radiators, {}".format(fuel))[1]
+        for fuel in fuels
+    ]
+
+    assert hotwater_fuels == heating_sources
+
+
+def test_hotwater_fuel_bottled_gas():
+    """Bottled gas is LPG, not mains gas."""
+
+    assert get_hotwater_fuel(
+        ["From main system, bottled gas", "Gas multipoint", "Gas range cooker"]
+    ) == ["LPG", "gas", "gas"]
+
+
+WALLS_DESCRIPTIONS = [
+    "Cavity wall, as built, no insulation (assumed)",
+    "Cavity wall, filled cavity",
+    "Solid brick, as built, insulated (assumed)",
+    "Timber frame, as built, partial insulation (assumed)",
+    "Average thermal transmittance 0.35 W/m²K",
+    "System built, with external insulation",
+    "Park home wall",
+    None,
+]
+
+
+def classify_rowwise(descriptions, feature_rules):
+    """Label every description by the first rule whose pattern it contains."""
+
+    labels = []
+    for description in descriptions:
+        label = str(feature_rules.get("default", "unknown"))
+
+        for rule in feature_rules["rules"] if description is not None else []:
+            match = re.search(rule["pattern"], description, flags=re.IGNORECASE)
+            if match is not None:
+                matched_text = match.group(1) if match.re.groups else match.group(0)
+                label = str(rule["label"]).format(match=matched_text)
+                break
+
+        labels.append(label)
+
+    return labels
+
+
+def test_column_scanned_once_for_all_features(monkeypatch):
+    """All features of a column are extracted in one pass, as rule by rule."""
+
+    string_methods = type(pd.Series([], dtype=object).str)
+    extract = string_methods.extract
+    n_extracts = []
+
+    def counting_extract(self, *args, **kwargs):
+        n_extracts.append(1)
+        return extract(self, *args, **kwargs)
+
+    monkeypatch.setattr(string_methods, "extract", counting_extract)
+
+    rng = np.random.default_rng(0)
+    descriptions = list(rng.choice(np.array(WALLS_DESCRIPTIONS, dtype=object), 200))
+    df = pd.DataFrame({"WALLS_DESCRIPTION": descriptions})
+
+    rules = rule_engine.load_rules()
+    rule_engine.apply_description_rules(df, rules=rules)
+
+    assert len(rules["WALLS_DESCRIPTION"]) > 1
+    assert len(n_extracts) == 1
+
+    for feature, feature_rules in rules["WALLS_DESCRIPTION"].items():
+        assert list(df[feature].astype(object)) == classify_rowwise(
+            descriptions, feature_rules
+        )
@@ -0,0 +1,62 @@
+# File: tests/test_sketches.py
+"""Tests for quantile and distinct count sketches.
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+
+from epc_data_analysis.pipeline import accumulators, sketches
+
+# ---------------------------------------------------------------------------------
+
+
+def test_sketches_match_pandas(epc_dataset):
+    """Sketches merged over directories and chunks are close to exact pandas values."""
+
+    quantiles, distinct_counts = accumulators.accumulate_epc_data(
+        [
+            sketches.QuantileAccumulator("TOTAL_FLOOR_AREA", k=50, seed=0),
+            sketches.DistinctCountAccumulator(
+                "BUILDING_REFERENCE_NUMBER", by="LOCAL_AUTHORITY"
+            ),
+        ],
+        chunksize=100,
+        n_jobs=2,
+    )
+
+    # Sketches survive the round trip through JSON
+    quantiles = sketches.QuantileAccumulator.from_json(quantiles.to_json())
+    distinct_counts = sketches.DistinctCountAccumulator.from_json(
+        distinct_counts.to_json()
+    )
+
+    epc_df = pd.concat(epc_dataset.values(), ignore_index=True)
+
+    # Rank of approximate quantiles among all floor areas
+    rank_error = 0.05
+    quantile_values = np.array(sketches.DEFAULT_QUANTILES)
+    floor_areas = np.sort(epc_df["TOTAL_FLOOR_AREA"].to_numpy())
+    approximate = quantiles.result().loc["total"].to_numpy()
+    ranks = np.searchsorted(floor_areas, approximate, side="right")
+
+    np.testing.assert_allclose(
+        ranks / len(floor_areas), quantile_values, atol=rank_error
+    )
+
+    # Between the exact quantiles at the rank error bound
+    lower = np.quantile(floor_areas, np.clip(quantile_values - rank_error, 0, 1))
+    upper = np.quantile(floor_areas, np.clip(quantile_values + rank_error, 0, 1))
+    assert ((lower <= approximate) & (approximate <= upper)).all()
+
+    # Distinct building references per local authority
+    expected = epc_df.groupby("LOCAL_AUTHORITY")["BUILDING_REFERENCE_NUMBER"].nunique()
+    n_distinct = distinct_counts.result()
+
+    assert list(n_distinct.index) == list(expected.index)
+    np.testing.assert_allclose(n_distinct, expected, rtol=3 * 1.04 / np.sqrt(2**14))
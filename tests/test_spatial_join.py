@@ -0,0 +1,70 @@
+# File: tests/test_spatial_join.py
+"""Tests for the spatial join between certificates and WIMD records.
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from epc_data_analysis.getters import epc_data, util_data
+from epc_data_analysis.pipeline import enrichment, spatial_join
+
+# ---------------------------------------------------------------------------------
+
+
+def get_haversine_distances(latitudes, longitudes, other_latitudes, other_longitudes):
+    """Great-circle distance in km between every point and every other point."""
+
+    lat_1, lon_1 = np.radians(latitudes)[:, None], np.radians(longitudes)[:, None]
+    lat_2, lon_2 = np.radians(other_latitudes), np.radians(other_longitudes)
+
+    a = (
+        np.sin((lat_2 - lat_1) / 2) ** 2
+        + np.cos(lat_1) * np.cos(lat_2) * np.sin((lon_2 - lon_1) / 2) ** 2
+    )
+
+    return 2 * spatial_join.EARTH_RADIUS * np.arcsin(np.sqrt(a))
+
+
+@pytest.mark.parametrize("max_distance", [0.1, 1.0, 500.0])
+def test_nearest_wimd_matches_brute_force(epc_dataset, lookup_data, max_distance):
+    """Nearest WIMD record of every certificate equals a brute-force search."""
+
+    epc_df = epc_data.load_epc_data(usecols=["LMK_KEY", "POSTCODE"])
+    epc_df = enrichment.enrich(epc_df, wimd_join="spatial", max_distance=max_distance)
+
+    # Compare distances to all WIMD records with coordinates
+    wimd_df = util_data.get_WIMD_data().dropna(subset=["LATITUDE", "LONGITUDE"])
+    distances = get_haversine_distances(
+        epc_df["LATITUDE"].to_numpy(dtype=np.float64),
+        epc_df["LONGITUDE"].to_numpy(dtype=np.float64),
+        wimd_df["LATITUDE"].to_numpy(dtype=np.float64),
+        wimd_df["LONGITUDE"].to_numpy(dtype=np.float64),
+    )
+    has_coordinates = epc_df["LATITUDE"].notna().to_numpy()
+    nearest = np.argmin(np.where(has_coordinates[:, None], distances, np.inf), axis=1)
+    nearest_distances = np.where(
+        has_coordinates, distances[np.arange(len(epc_df)), nearest], np.inf
+    )
+    is_matched = nearest_distances <= max_distance
+
+    expected_rank = pd.Series(
+        wimd_df["WIMD Rank"].to_numpy()[nearest], dtype="Int64"
+    ).where(is_matched)
+
+    pd.testing.assert_series_equal(
+        epc_df["WIMD Rank"].reset_index(drop=True).astype("Int64"),
+        expected_rank,
+        check_names=False,
+    )
+    np.testing.assert_allclose(
+        epc_df["WIMD_DISTANCE"].to_numpy(dtype=np.float64),
+        np.where(is_matched, nearest_distances, np.nan),
+        atol=1e-3,
+    )
@@ -0,0 +1,39 @@
+# File: tests/test_util_data.py
+"""Tests for loading location and WIMD data.
+
+Created October 2026
+@author: Julia Suter
+Last updated on 17/10/2026
+"""
+
+# ---------------------------------------------------------------------------------
+
+import os
+
+import pandas as pd
+
+from epc_data_analysis.getters import util_data
+
+# ---------------------------------------------------------------------------------
+
+
+def test_WIMD_data_matches_pandas(lookup_data):
+    """Cached WIMD data equals the CSV, and callers get independent copies."""
+
+    expected = pd.read_csv(lookup_data["WIMD"], dtype=util_data.WIMD_DTYPES)
+
+    # Build cache, reuse data loaded in this session, then read cache
+    n_bytes = []
+    for _ in range(3):
+        wimd_df, load_stats = util_data.get_WIMD_data(return_stats=True)
+        pd.testing.assert_frame_equal(wimd_df, expected)
+        n_bytes.append(load_stats["N_BYTES"].iloc[0])
+
+        wimd_df.loc[0, "WIMD Decile"] = -1
+        wimd_df["LATITUDE"] = 0.0
+        if len(n_bytes) == 2:
+            util_data._loaded_data.clear()
+
+    assert n_bytes[0] == os.path.getsize(lookup_data["WIMD"])
+    assert n_bytes[1] == 0
+    assert 0 < n_bytes[2] != n_bytes[0]